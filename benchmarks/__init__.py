@@ -0,0 +1 @@
+"""Бенчмарки Primitive Database."""
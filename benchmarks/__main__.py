@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Запуск набора бенчмарков и сравнение с сохраненными результатами.
+
+    python3 -m benchmarks                      # все наборы, 10k/100k/1M записей
+    python3 -m benchmarks --sizes 10000 --output baseline.jsonl
+    python3 -m benchmarks --sizes 10000 --compare baseline.jsonl
+
+С --compare замеры сопоставляются с базовыми по совпадающим параметрам;
+если какой-то замер медленнее базового больше чем на --tolerance,
+регрессии печатаются в stderr и код возврата равен 1. Код возврата
+равен 1 и тогда, когда набор startup превышает бюджет холодного старта.
+"""
+
+import argparse
+import io
+import json
+import platform
+import sys
+
+from . import crud, parallel_scan, parsing, startup
+from .common import DEFAULT_SIZES, emit
+
+SUITES = ("crud", "parallel_scan", "parsing", "startup")
+# Поля-измерения; остальные поля результата задают параметры замера
+MEASURED_FIELDS = {"seconds", "ops", "ops_per_sec", "speedup", "matched"}
+
+
+class Recorder(io.TextIOBase):
+    """Пишет вывод в stdout и запоминает строки результатов."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lines = []
+
+    def write(self, text):
+        self.stream.write(text)
+        self.lines.extend(line for line in text.splitlines() if line)
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def result_key(result):
+    """Параметры замера, по которым сопоставляются результаты."""
+    return tuple(sorted(
+        (name, value) for name, value in result.items()
+        if name not in MEASURED_FIELDS
+    ))
+
+
+def find_regressions(results, baseline, tolerance):
+    """
+    Сравнивает время замеров с базовыми.
+
+    Args:
+        results: Текущие результаты
+        baseline: Базовые результаты
+        tolerance: Допустимое относительное замедление
+
+    Returns:
+        list: (результат, базовое время) для замедлившихся замеров
+    """
+    baseline_seconds = {
+        result_key(result): result["seconds"]
+        for result in baseline if "seconds" in result
+    }
+    regressions = []
+    for result in results:
+        base = baseline_seconds.get(result_key(result))
+        if base and result.get("seconds", 0) > base * (1 + tolerance):
+            regressions.append((result, base))
+    return regressions
+
+
+def read_results(path):
+    """Читает результаты из файла JSON-строк."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def build_parser():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--suite", nargs="+", choices=SUITES, default=list(SUITES)
+    )
+    arg_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES)
+    )
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--output", metavar="FILE")
+    arg_parser.add_argument("--compare", metavar="FILE")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25)
+    return arg_parser
+
+
+def main(argv=None):
+    options = build_parser().parse_args(argv)
+    repeat = ["--repeat", str(options.repeat)]
+
+    within_budget = True
+    recorder = Recorder(sys.stdout)
+    sys.stdout = recorder
+    try:
+        emit("environment", python=platform.python_version(),
+             platform=platform.platform())
+        if "crud" in options.suite:
+            crud.main(
+                ["--sizes", *map(str, options.sizes), *repeat]
+            )
+        if "parsing" in options.suite:
+            parsing.main(repeat)
+        if "startup" in options.suite:
+            within_budget = startup.main(repeat)
+        if "parallel_scan" in options.suite:
+            parallel_scan.main(
+                ["--rows", str(max(options.sizes)), *repeat]
+            )
+    finally:
+        sys.stdout = recorder.stream
+
+    results = [json.loads(line) for line in recorder.lines]
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            f.writelines(f"{line}\n" for line in recorder.lines)
+
+    regressions = []
+    if options.compare:
+        regressions = find_regressions(
+            results, read_results(options.compare), options.tolerance
+        )
+        for result, base in regressions:
+            print(
+                f"Регрессия: {json.dumps(result, ensure_ascii=False)} "
+                f"(было {base:.6f} с)",
+                file=sys.stderr,
+            )
+    if regressions or not within_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Общие части бенчмарков: синтетические таблицы, замер времени и вывод.
+
+Каждый результат - одна JSON-строка в stdout, чтобы результаты разных
+запусков можно было сохранять и сравнивать (python3 -m benchmarks --compare).
+"""
+
+import json
+import os
+import time
+
+from src.primitive_db import binary
+from src.primitive_db.columnar import ColumnarTable
+from src.primitive_db.constants import (
+    BINARY_STORAGE,
+    COLUMNAR_STORAGE,
+    META_COLUMNS_KEY,
+    META_SEQUENCE_KEY,
+    META_STORAGE_KEY,
+    ROW_STORAGE,
+)
+
+TABLE_NAME = "bench"
+COLUMNS = ["ID:int", "age:int", "name:str", "active:bool"]
+STORAGES = (ROW_STORAGE, COLUMNAR_STORAGE, BINARY_STORAGE)
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def make_records(row_count):
+    """Генерирует записи синтетической таблицы."""
+    return [
+        {"ID": i, "age": i % 100, "name": f"user{i % 1000}", "active": i % 3 == 0}
+        for i in range(1, row_count + 1)
+    ]
+
+
+def make_metadata(row_count, storage):
+    """Метаданные синтетической таблицы в формате хранения storage."""
+    return {
+        TABLE_NAME: {
+            META_COLUMNS_KEY: list(COLUMNS),
+            META_SEQUENCE_KEY: row_count + 1,
+            META_STORAGE_KEY: storage,
+        }
+    }
+
+
+class TableFactory:
+    """
+    Строит свежие копии синтетической таблицы в заданном формате.
+
+    Записи генерируются один раз; бинарная таблица пишется в файл
+    и каждый раз заново отображается через mmap.
+    """
+
+    def __init__(self, row_count, workdir):
+        self.row_count = row_count
+        self.records = make_records(row_count)
+        self._columnar = ColumnarTable.from_records(COLUMNS, self.records)
+        self._binary_path = os.path.join(workdir, f"{row_count}.bin")
+        binary.write_table(self._binary_path, self._columnar)
+
+    def table(self, storage):
+        """
+        Возвращает новую копию таблицы, которую можно изменять.
+
+        Args:
+            storage: Формат хранения (rows, columnar или binary)
+        """
+        if storage == ROW_STORAGE:
+            return [dict(record) for record in self.records]
+        if storage == COLUMNAR_STORAGE:
+            return ColumnarTable.from_records(COLUMNS, self.records)
+        return binary.BinaryTable.open(self._binary_path)
+
+
+def best_of(func, repeat, setup=None):
+    """
+    Лучшее время выполнения func из repeat запусков.
+
+    Args:
+        func: Измеряемая функция; получает результат setup (если задан)
+        repeat: Число запусков
+        setup: Подготовка перед каждым запуском (в замер не входит)
+
+    Returns:
+        tuple: (лучшее время в секундах, результат последнего запуска)
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def emit(benchmark, **fields):
+    """Печатает результат одной JSON-строкой."""
+    if "seconds" in fields:
+        fields["seconds"] = round(fields["seconds"], 6)
+    print(json.dumps(
+        {"benchmark": benchmark, **fields}, ensure_ascii=False
+    ), flush=True)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк основных операций над таблицами (core.py, utils.py).
+
+Для каждого размера синтетической таблицы и каждого формата хранения
+измеряются: вставка, точечный select по ID (со сканированием и через
+хэш-индекс), select с полным сканированием, "order by ... limit" (кучей
+и по сортированному индексу), update, delete, сохранение
+и загрузка снимка, а также холодный старт консоли со скриптом из одного
+запроса. Результаты выводятся построчно в JSON:
+
+    python3 -m benchmarks.crud --sizes 10000 100000
+"""
+
+import argparse
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+
+from src.primitive_db import core, index, parser, utils
+from src.primitive_db.decorators import set_confirmation
+
+from .common import (
+    COLUMNS,
+    DEFAULT_SIZES,
+    STORAGES,
+    TABLE_NAME,
+    TableFactory,
+    best_of,
+    emit,
+    make_metadata,
+)
+
+INSERT_COUNT = 1000
+POINT_LOOKUPS = 100
+# Без индекса каждый поиск - полное сканирование, поэтому поисков меньше
+SCAN_LOOKUPS = 10
+SCAN_CONDITION = "age = 42"
+# "Последние ORDER_LIMIT записей": order by ID desc limit ORDER_LIMIT
+ORDER_LIMIT = 20
+STARTUP_SCRIPT = f"select from {TABLE_NAME} where ID = 1\nexit\n"
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def where(condition):
+    """Разбирает и компилирует условие под столбцы синтетической таблицы."""
+    return parser.parse_where_clause(condition).compile(COLUMNS)
+
+
+def bench_insert(factory, storage, repeat):
+    """Вставка INSERT_COUNT записей по одной в конец таблицы."""
+    metadata = make_metadata(factory.row_count, storage)
+    values = [30, "new user", True]
+
+    def run(table_data):
+        for _ in range(INSERT_COUNT):
+            core.insert(metadata, TABLE_NAME, values, table_data)
+
+    seconds, _ = best_of(run, repeat, lambda: factory.table(storage))
+    return {"seconds": seconds, "ops": INSERT_COUNT,
+            "ops_per_sec": round(INSERT_COUNT / seconds)}
+
+
+def bench_point_select(factory, storage, repeat, indexed):
+    """Запросы "ID = k" по равномерно разбросанным ключам."""
+    table_data = factory.table(storage)
+    indexes = {"ID": index.build_index(table_data, "ID")} if indexed else None
+    lookups = POINT_LOOKUPS if indexed else SCAN_LOOKUPS
+    step = max(1, factory.row_count // lookups)
+    conditions = [
+        where(f"ID = {key}")
+        for key in range(1, factory.row_count + 1, step)[:lookups]
+    ]
+
+    def run():
+        for condition in conditions:
+            list(core.select(table_data, condition, indexes))
+
+    seconds, _ = best_of(run, repeat)
+    return {"seconds": seconds, "ops": len(conditions),
+            "ops_per_sec": round(len(conditions) / seconds)}
+
+
+def bench_full_scan(factory, storage, repeat):
+    """Select по неиндексированному столбцу с материализацией результата."""
+    table_data = factory.table(storage)
+    condition = where(SCAN_CONDITION)
+    seconds, found = best_of(
+        lambda: list(core.select(table_data, condition)), repeat
+    )
+    return {"seconds": seconds, "matched": len(found)}
+
+
+def bench_order_by(factory, storage, repeat, indexed):
+    """Последние ORDER_LIMIT записей: кучей по всей таблице или по индексу."""
+    table_data = factory.table(storage)
+    indexes = (
+        {"ID": index.build_sorted_index(table_data, "ID")} if indexed else None
+    )
+    seconds, found = best_of(
+        lambda: list(core.select(
+            table_data, indexes=indexes, limit=ORDER_LIMIT,
+            order_by=("ID", True),
+        )),
+        repeat,
+    )
+    return {"seconds": seconds, "matched": len(found)}
+
+
+def bench_update(factory, storage, repeat):
+    """Update одного столбца у записей, найденных полным сканированием."""
+    condition = where(SCAN_CONDITION)
+    seconds, result = best_of(
+        lambda table_data: core.update(
+            table_data, {"name": "renamed"}, condition
+        ),
+        repeat, lambda: factory.table(storage),
+    )
+    return {"seconds": seconds, "matched": len(result[1])}
+
+
+def bench_delete(factory, storage, repeat):
+    """Delete записей, найденных полным сканированием."""
+    condition = where(SCAN_CONDITION)
+    seconds, result = best_of(
+        lambda table_data: core.delete(table_data, condition),
+        repeat, lambda: factory.table(storage),
+    )
+    return {"seconds": seconds, "matched": factory.row_count - len(result)}
+
+
+def bench_save_load(factory, storage, repeat, data_dir):
+    """Сохранение снимка таблицы и его загрузка (utils.save_table/load_table)."""
+    table_data = factory.table(storage)
+    save_seconds, _ = best_of(
+        lambda: utils.save_table(TABLE_NAME, table_data, {}, data_dir), repeat
+    )
+    load_seconds, loaded = best_of(
+        lambda: utils.load_table(TABLE_NAME, data_dir), repeat
+    )
+    assert len(loaded[0]) == factory.row_count
+    return {"seconds": save_seconds}, {"seconds": load_seconds}
+
+
+def bench_startup(factory, storage, repeat, workdir):
+    """Холодный старт консоли: загрузка таблицы и один точечный запрос."""
+    utils.commit_changes(
+        metadata=make_metadata(factory.row_count, storage),
+        snapshots={TABLE_NAME: (factory.table(storage), {})},
+        data_dir=os.path.join(workdir, "data"),
+        meta_path=os.path.join(workdir, "db_meta.json"),
+    )
+    env = {**os.environ, "PYTHONPATH": PROJECT_ROOT}
+    command = [sys.executable, "-m", "src.primitive_db.main"]
+
+    def run():
+        subprocess.run(
+            command, input=STARTUP_SCRIPT, text=True, cwd=workdir, env=env,
+            stdout=subprocess.DEVNULL, check=True,
+        )
+
+    seconds, _ = best_of(run, repeat)
+    return {"seconds": seconds}
+
+
+def measure_size(row_count, storages, repeat):
+    """
+    Запускает все замеры для таблицы из row_count записей.
+
+    Returns:
+        list: Результаты (словари с полями для emit)
+    """
+    measurements = []
+    with tempfile.TemporaryDirectory() as workdir:
+        factory = TableFactory(row_count, workdir)
+        for storage in storages:
+            storage_dir = os.path.join(workdir, storage)
+            results = {
+                "insert": bench_insert(factory, storage, repeat),
+                "point_select": bench_point_select(
+                    factory, storage, repeat, indexed=False
+                ),
+                "point_select_indexed": bench_point_select(
+                    factory, storage, repeat, indexed=True
+                ),
+                "full_scan": bench_full_scan(factory, storage, repeat),
+                "order_by_limit": bench_order_by(
+                    factory, storage, repeat, indexed=False
+                ),
+                "order_by_limit_indexed": bench_order_by(
+                    factory, storage, repeat, indexed=True
+                ),
+                "update": bench_update(factory, storage, repeat),
+                "delete": bench_delete(factory, storage, repeat),
+            }
+            results["save"], results["load"] = bench_save_load(
+                factory, storage, repeat, os.path.join(storage_dir, "data")
+            )
+            results["startup"] = bench_startup(
+                factory, storage, repeat, os.path.join(storage_dir, "cli")
+            )
+            for operation, fields in results.items():
+                measurements.append({
+                    "operation": operation, "storage": storage,
+                    "rows": row_count, **fields,
+                })
+    return measurements
+
+
+def build_parser():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES)
+    )
+    arg_parser.add_argument(
+        "--storages", nargs="+", choices=STORAGES, default=list(STORAGES)
+    )
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    return arg_parser
+
+
+def main(argv=None):
+    options = build_parser().parse_args(argv)
+
+    # Сообщения команд и подтверждения не должны попадать в результаты
+    set_confirmation(False)
+    with open(os.devnull, "w") as devnull:
+        for row_count in options.sizes:
+            with contextlib.redirect_stdout(devnull):
+                measurements = measure_size(
+                    row_count, options.storages, options.repeat
+                )
+            for fields in measurements:
+                emit("crud", **fields)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк параллельного сканирования (parallel.py).
+
+Строит синтетическую таблицу в каждом формате хранения и измеряет время
+полного сканирования по условию WHERE при 1, 2, 4, ... процессах
+(до числа ядер). Результаты выводятся построчно в JSON:
+
+    python3 -m benchmarks.parallel_scan --rows 1000000
+"""
+
+import argparse
+import os
+import tempfile
+
+from src.primitive_db import core, parallel, parser
+
+from .common import COLUMNS, STORAGES, TableFactory, best_of, emit
+
+CONDITIONS = ["age = 42", "age > 90 and active = true"]
+
+
+def worker_counts(max_workers):
+    """1, 2, 4, ... до max_workers включительно."""
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def measure(table_data, where_clause, workers, repeat):
+    """Лучшее время сканирования из repeat запусков."""
+    def run():
+        if workers > 1:
+            return parallel.scan(table_data, where_clause, workers)
+        return list(core._iter_matches(table_data, where_clause))
+
+    best, found = best_of(run, repeat)
+    return best, len(found)
+
+
+def build_parser():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rows", type=int, default=1_000_000)
+    arg_parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    return arg_parser
+
+
+def main(argv=None):
+    options = build_parser().parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        factory = TableFactory(options.rows, workdir)
+        for storage in STORAGES:
+            table_data = factory.table(storage)
+            for condition in CONDITIONS:
+                where_clause = parser.parse_where_clause(condition)
+                where_clause.compile(COLUMNS)
+                baseline = None
+                for workers in worker_counts(options.max_workers):
+                    elapsed, matched = measure(
+                        table_data, where_clause, workers, options.repeat
+                    )
+                    baseline = baseline or elapsed
+                    emit(
+                        "parallel_scan",
+                        storage=storage,
+                        rows=options.rows,
+                        where=condition,
+                        workers=workers,
+                        seconds=elapsed,
+                        speedup=round(baseline / elapsed, 2),
+                        matched=matched,
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк разбора команд (engine.parse_command, engine.command_plan).
+
+Для типичных команд измеряется токенизация сама по себе (shlex.split,
+которым команды разбирались раньше, и parser.tokenize), полный разбор
+без кэша (токенизация и разбор аргументов), повторный разбор того же
+текста через кэш планов и выполнение подготовленного выражения
+(подстановка параметров в план).
+Результаты выводятся построчно в JSON:
+
+    python3 -m benchmarks.parsing --count 100000
+"""
+
+import argparse
+import shlex
+
+from src.primitive_db import engine, parser, plans
+
+from .common import TABLE_NAME, best_of, emit
+
+STATEMENTS = {
+    "insert": f"insert into {TABLE_NAME} values (42, 'user 42', true)",
+    "select": (
+        f"select name, age from {TABLE_NAME} "
+        "where age >= 18 and name != 'bob' limit 10"
+    ),
+    "update": f"update {TABLE_NAME} set age = 43 where ID = 42",
+    "delete": f"delete from {TABLE_NAME} where ID = 42",
+}
+PREPARED = {
+    "insert": (f"insert into {TABLE_NAME} values (?, ?, ?)",
+               (42, "user 42", True)),
+    "select": (
+        f"select name, age from {TABLE_NAME} where age >= ? and name != ? "
+        "limit 10",
+        (18, "bob"),
+    ),
+    "update": (f"update {TABLE_NAME} set age = ? where ID = ?", (43, 42)),
+    "delete": (f"delete from {TABLE_NAME} where ID = ?", (42,)),
+}
+
+
+def parse_uncached(text):
+    """Полный разбор команды в обход кэша планов."""
+    command, *args = parser.tokenize(text)
+    return engine.PLAN_PARSERS[command](args)
+
+
+def parse_cached(text):
+    """Разбор команды через кэш планов (как в консоли)."""
+    command, args = engine.parse_command(text)
+    return engine.command_plan(command, args)
+
+
+def measure(func, argument, count, repeat):
+    """Лучшее время count вызовов func(argument)."""
+    def run():
+        for _ in range(count):
+            func(argument)
+
+    seconds, _ = best_of(run, repeat)
+    return seconds
+
+
+def build_parser():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--count", type=int, default=100_000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    return arg_parser
+
+
+def main(argv=None):
+    options = build_parser().parse_args(argv)
+    count = options.count
+
+    for command, text in STATEMENTS.items():
+        for mode, func in (("shlex", shlex.split),
+                           ("tokenize", parser.tokenize),
+                           ("uncached", parse_uncached),
+                           ("cached", parse_cached)):
+            seconds = measure(func, text, count, options.repeat)
+            emit("parsing", command=command, mode=mode, seconds=seconds,
+                 ops=count, ops_per_sec=round(count / seconds))
+
+        template, params = PREPARED[command]
+        command_name, template_args = engine.parse_command(template)
+        statement = plans.PreparedStatement(
+            command_name, *plans.number_params(template_args)
+        )
+
+        def execute(params, statement=statement):
+            return engine.command_plan(
+                statement.command, statement.args, params
+            )
+
+        seconds = measure(execute, params, count, options.repeat)
+        emit("parsing", command=command, mode="prepared", seconds=seconds,
+             ops=count, ops_per_sec=round(count / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк холодного старта точки входа (src.primitive_db.main).
+
+Измеряются время импорта точки входа по python -X importtime с готовым
+байт-кодом (import, как у установленного пакета) и без него
+(import_source, с компиляцией исходников), время запуска интерпретатора
+без БД и полный старт консоли с командой exit в пустой директории.
+Для замера import байт-код пишется во временный каталог
+(PYTHONPYCACHEPREFIX), поэтому он не зависит от PYTHONDONTWRITEBYTECODE
+и не оставляет файлов; import_source запускается с -B без этого
+каталога (байт-код стандартной библиотеки берется из установки Python).
+
+Импорт с байт-кодом проверяется по бюджету: если он дольше --budget-ms
+миллисекунд или при запуске импортируется модуль, который должен
+загружаться лениво (DEFERRED_MODULES), нарушение печатается в stderr
+и код возврата равен 1:
+
+    python3 -m benchmarks.startup --budget-ms 60
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from .common import best_of, emit
+
+ENTRY_MODULE = "src.primitive_db.main"
+DEFAULT_BUDGET_MS = 40
+# Модули, которые нужны только отдельным командам и не должны
+# импортироваться при запуске
+DEFERRED_MODULES = (
+    "prettytable", "multiprocessing", "concurrent.futures", "cProfile",
+    "pstats", "src.primitive_db.aggregates", "src.primitive_db.binary",
+    "src.primitive_db.join", "src.primitive_db.parallel",
+)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(env, bytecode=True):
+    """
+    Импортирует точку входа в новом процессе под -X importtime.
+
+    Args:
+        env: Окружение процесса
+        bytecode: False - не читать и не писать байт-код (-B)
+
+    Returns:
+        dict: {модуль: суммарное время импорта в секундах}
+    """
+    flags = [] if bytecode else ["-B"]
+    completed = subprocess.run(
+        [sys.executable, *flags, "-X", "importtime", "-c",
+         f"import {ENTRY_MODULE}"],
+        env=env, stderr=subprocess.PIPE, text=True, check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        # import time: <собственное, мкс> | <суммарное, мкс> | <модуль>
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        times[fields[2].strip()] = int(fields[1]) / 1_000_000
+    return times
+
+
+def best_import(env, repeat, bytecode=True):
+    """
+    Лучшее время импорта точки входа из repeat запусков.
+
+    Returns:
+        tuple: (секунды, отложенные модули, импортированные при запуске)
+    """
+    best = None
+    eager = set()
+    for _ in range(repeat):
+        times = import_times(env, bytecode)
+        seconds = times[ENTRY_MODULE]
+        best = seconds if best is None else min(best, seconds)
+        eager.update(module for module in DEFERRED_MODULES if module in times)
+    return best, eager
+
+
+def run_process(command, workdir, env):
+    """Запускает процесс с командой exit на стандартном вводе."""
+    subprocess.run(
+        command, input="exit\n", text=True, cwd=workdir, env=env,
+        stdout=subprocess.DEVNULL, check=True,
+    )
+
+
+def build_parser():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument(
+        "--budget-ms", type=float, default=DEFAULT_BUDGET_MS
+    )
+    return arg_parser
+
+
+def main(argv=None):
+    """
+    Returns:
+        bool: True, если импорт укладывается в бюджет
+    """
+    options = build_parser().parse_args(argv)
+    source_env = {**os.environ, "PYTHONPATH": PROJECT_ROOT}
+    source_env.pop("PYTHONPYCACHEPREFIX", None)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = {
+            **os.environ, "PYTHONPATH": PROJECT_ROOT,
+            "PYTHONPYCACHEPREFIX": os.path.join(workdir, "pycache"),
+        }
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        # Первый запуск компилирует и сохраняет байт-код
+        import_times(env)
+
+        import_seconds, eager = best_import(env, options.repeat)
+        emit("startup", mode="import", seconds=import_seconds,
+             budget_ms=options.budget_ms)
+        source_seconds, _ = best_import(
+            source_env, options.repeat, bytecode=False
+        )
+        emit("startup", mode="import_source", seconds=source_seconds)
+
+        for mode, command in (
+            ("interpreter", [sys.executable, "-c", "pass"]),
+            ("cold_start", [sys.executable, "-m", ENTRY_MODULE]),
+        ):
+            seconds, _ = best_of(
+                lambda: run_process(command, workdir, env), options.repeat
+            )
+            emit("startup", mode=mode, seconds=seconds)
+
+    within_budget = True
+    if import_seconds * 1000 > options.budget_ms:
+        print(
+            f"Бюджет запуска превышен: импорт {import_seconds * 1000:.1f} мс "
+            f"(бюджет {options.budget_ms:g} мс)",
+            file=sys.stderr,
+        )
+        within_budget = False
+    if eager:
+        print(
+            f"При запуске импортируются: {', '.join(sorted(eager))}",
+            file=sys.stderr,
+        )
+        within_budget = False
+    return within_budget
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
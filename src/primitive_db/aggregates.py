@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Агрегатные функции SELECT: count, sum, min, max, avg и group by.
+
+Агрегация выполняется за один проход по записям: для каждой группы
+(значения столбца group by) в словаре хранится состояние каждой функции.
+"""
+
+from .constants import (
+    AGGREGATE_AVG,
+    AGGREGATE_COUNT,
+    AGGREGATE_MIN,
+    AGGREGATE_PATTERN,
+    AGGREGATE_SUM,
+    SELECT_ALL_COLUMNS,
+)
+
+
+class Aggregate:
+    """Агрегатная функция над столбцом (или над записями для count(*))."""
+
+    def __init__(self, func, column=None):
+        """
+        Args:
+            func: Имя функции (count, sum, min, max, avg)
+            column: Имя столбца или None для count(*)
+        """
+        self.func = func
+        self.column = column
+
+    @property
+    def name(self):
+        """Заголовок столбца результата, например "sum(age)"."""
+        return f"{self.func}({self.column or SELECT_ALL_COLUMNS})"
+
+    def new_state(self):
+        """Начальное состояние: [число значений, накопленное значение]."""
+        return [0, None]
+
+    def step(self, state, value):
+        """Учитывает в состоянии очередное значение."""
+        state[0] += 1
+        if self.func == AGGREGATE_COUNT:
+            return
+        if state[1] is None:
+            state[1] = value
+        elif self.func in (AGGREGATE_SUM, AGGREGATE_AVG):
+            state[1] += value
+        elif self.func == AGGREGATE_MIN:
+            if value < state[1]:
+                state[1] = value
+        elif value > state[1]:
+            state[1] = value
+
+    def result(self, state):
+        """Итоговое значение функции (None для пустой группы)."""
+        count, value = state
+        if self.func == AGGREGATE_COUNT:
+            return count
+        if self.func == AGGREGATE_AVG and count:
+            return value / count
+        return value
+
+    def __repr__(self):
+        return self.name
+
+
+def parse_aggregate(expr):
+    """
+    Распознает агрегатную функцию в элементе списка SELECT.
+
+    Args:
+        expr: Элемент списка столбцов, например "count(*)" или "sum(age)"
+
+    Returns:
+        Aggregate: Функция или None, если это обычный столбец
+    """
+    match = AGGREGATE_PATTERN.match(expr)
+    if not match:
+        return None
+
+    func, column = match.group(1).lower(), match.group(2)
+    if column == SELECT_ALL_COLUMNS:
+        if func != AGGREGATE_COUNT:
+            return None
+        column = None
+    return Aggregate(func, column)
+
+
+def aggregate_records(records, items, group_by=None):
+    """
+    Вычисляет агрегаты за один проход по записям (хеш-агрегация).
+
+    Args:
+        records: Итератор записей (достаточно столбцов, нужных запросу)
+        items: Элементы SELECT: Aggregate или имя столбца group by
+        group_by: Столбец группировки или None
+
+    Returns:
+        list: Записи результата, по одной на группу
+    """
+    aggregates = [item for item in items if isinstance(item, Aggregate)]
+    groups = {}
+
+    for record in records:
+        key = record[group_by] if group_by else None
+        states = groups.get(key)
+        if states is None:
+            states = [aggregate.new_state() for aggregate in aggregates]
+            groups[key] = states
+        for aggregate, state in zip(aggregates, states):
+            value = record[aggregate.column] if aggregate.column else None
+            aggregate.step(state, value)
+
+    if not groups and group_by is None:
+        groups[None] = [aggregate.new_state() for aggregate in aggregates]
+
+    return [
+        result_row(items, key, states) for key, states in groups.items()
+    ]
+
+
+def result_row(items, key, states):
+    """
+    Собирает запись результата для одной группы.
+
+    Args:
+        items: Элементы SELECT
+        key: Значение столбца группировки
+        states: Состояния агрегатов группы (в порядке items)
+
+    Returns:
+        dict: {заголовок: значение}
+    """
+    row = {}
+    states = iter(states)
+    for item in items:
+        if isinstance(item, Aggregate):
+            row[item.name] = item.result(next(states))
+        else:
+            row[item] = key
+    return row
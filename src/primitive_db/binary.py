@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Компактный бинарный формат таблиц с чтением через mmap.
+
+Структура файла:
+    заголовок: сигнатура, порядок байт, число записей, описание столбцов
+    int-столбец: число записей * 8 байт (int64)
+    bool-столбец: битовая карта, 1 бит на запись
+    str-столбец: (число записей + 1) смещений int64 и куча строк в UTF-8
+
+Блоки столбцов выровнены по 8 байт. Файл открывается через mmap, и столбцы
+читаются по требованию: info и выборка по одному столбцу не разбирают
+таблицу целиком. Столбец копируется в память только при первом изменении.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from .columnar import INT_ARRAY_TYPECODE, Bitmap, ColumnarTable, new_column
+from .constants import BINARY_FILE_MAGIC
+
+_BYTE_ORDER_MARKS = {"little": b"<", "big": b">"}
+_TYPE_CODES = {"int": 0, "bool": 1, "str": 2}
+_TYPE_NAMES = {code: name for name, code in _TYPE_CODES.items()}
+# Заголовок всегда little-endian, данные столбцов - в порядке байт записи
+_HEADER = struct.Struct("<qI")
+_COLUMN_HEADER = struct.Struct("<BqH")
+_ALIGNMENT = 8
+
+
+class MappedBoolColumn:
+    """Bool-столбец, читаемый из битовой карты в mmap."""
+
+    def __init__(self, view, length):
+        self._view = view
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, position):
+        if not 0 <= position < self._length:
+            raise IndexError(position)
+        return bool(self._view[position >> 3] & (1 << (position & 7)))
+
+    def __iter__(self):
+        for position in range(self._length):
+            yield self[position]
+
+
+class MappedStrColumn:
+    """Str-столбец, читаемый из кучи строк в mmap по таблице смещений."""
+
+    def __init__(self, offsets, heap):
+        self._offsets = offsets
+        self._heap = heap
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position):
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        start = self._offsets[position]
+        end = self._offsets[position + 1]
+        return bytes(self._heap[start:end]).decode("utf-8")
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+
+_MAPPED_COLUMNS = (memoryview, MappedBoolColumn, MappedStrColumn)
+
+
+class BinaryTable(ColumnarTable):
+    """
+    Колоночная таблица, сохраняемая в бинарном формате.
+
+    Загруженная с диска таблица читает столбцы прямо из mmap.
+    """
+
+    def _writable_column(self, column):
+        values = self.columns[column]
+        if isinstance(values, _MAPPED_COLUMNS):
+            values = _materialize(self.column_types[column], values)
+            self.columns[column] = values
+        return values
+
+    @classmethod
+    def open(cls, filepath):
+        """
+        Открывает бинарный файл таблицы через mmap без чтения данных.
+
+        Args:
+            filepath: Путь к файлу таблицы
+
+        Returns:
+            BinaryTable: Таблица со столбцами, отображенными на файл
+        """
+        with open(filepath, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(mapped)
+        magic_size = len(BINARY_FILE_MAGIC)
+        if bytes(view[:magic_size]) != BINARY_FILE_MAGIC:
+            raise ValueError(filepath)
+        byte_order = bytes(view[magic_size:magic_size + 1])
+        native = byte_order == _BYTE_ORDER_MARKS[sys.byteorder]
+
+        pos = magic_size + 1
+        row_count, column_count = _HEADER.unpack_from(view, pos)
+        pos += _HEADER.size
+
+        layout = []
+        for _ in range(column_count):
+            type_code, offset, name_size = _COLUMN_HEADER.unpack_from(view, pos)
+            pos += _COLUMN_HEADER.size
+            name = bytes(view[pos:pos + name_size]).decode("utf-8")
+            pos += name_size
+            layout.append((name, _TYPE_NAMES[type_code], offset))
+
+        table = cls([f"{name}:{col_type}" for name, col_type, _ in layout])
+        for name, col_type, offset in layout:
+            column = _map_column(view, col_type, offset, row_count, byte_order)
+            if not native:
+                column = _materialize(col_type, column, swap=True)
+            table.columns[name] = column
+        return table
+
+
+def _map_column(view, col_type, offset, row_count, byte_order):
+    """Создает столбец, читающий данные из mmap начиная со смещения."""
+    if col_type == 'int':
+        size = row_count * 8
+        return view[offset:offset + size].cast(INT_ARRAY_TYPECODE)
+
+    if col_type == 'bool':
+        size = (row_count + 7) // 8
+        return MappedBoolColumn(view[offset:offset + size], row_count)
+
+    offsets_size = (row_count + 1) * 8
+    offsets = view[offset:offset + offsets_size].cast(INT_ARRAY_TYPECODE)
+    heap_start = offset + offsets_size
+    (heap_size,) = struct.unpack_from(
+        byte_order.decode() + INT_ARRAY_TYPECODE, view, offset + row_count * 8
+    )
+    heap = view[heap_start:heap_start + heap_size]
+    return MappedStrColumn(offsets, heap)
+
+
+def _materialize(col_type, values, swap=False):
+    """Копирует отображенный столбец в изменяемое хранилище."""
+    if col_type == 'int':
+        column = array(INT_ARRAY_TYPECODE)
+        column.frombytes(values.tobytes())
+        if swap:
+            column.byteswap()
+        return column
+    if isinstance(values, MappedStrColumn) and swap:
+        offsets = array(INT_ARRAY_TYPECODE)
+        offsets.frombytes(values._offsets.tobytes())
+        offsets.byteswap()
+        return [
+            bytes(values._heap[offsets[i]:offsets[i + 1]]).decode("utf-8")
+            for i in range(len(offsets) - 1)
+        ]
+    return new_column(col_type, values)
+
+
+def _column_bytes(col_type, values):
+    """Сериализует столбец в байты блока файла."""
+    if col_type == 'int':
+        if isinstance(values, memoryview):
+            return values.tobytes()
+        return array(INT_ARRAY_TYPECODE, values).tobytes()
+
+    if col_type == 'bool':
+        if isinstance(values, Bitmap):
+            return bytes(values._bits)
+        if isinstance(values, MappedBoolColumn):
+            return bytes(values._view)
+        return bytes(Bitmap(values)._bits)
+
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = array(INT_ARRAY_TYPECODE, [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return offsets.tobytes() + b"".join(encoded)
+
+
+def _padding(size):
+    """Число байт до следующей границы выравнивания."""
+    return -size % _ALIGNMENT
+
+
+def write_table(filepath, table):
+    """
+    Записывает колоночную таблицу в бинарный файл.
+
+    Запись идет во временный файл (с fsync) с последующей заменой: старый
+    файл может быть отображен в память, и перезапись на месте испортила
+    бы его.
+
+    Args:
+        filepath: Путь к файлу таблицы
+        table: ColumnarTable для сохранения
+    """
+    blocks = [
+        (name, table.column_types[name],
+         _column_bytes(table.column_types[name], table.columns[name]))
+        for name in table.column_names
+    ]
+
+    header_size = len(BINARY_FILE_MAGIC) + 1 + _HEADER.size
+    for name, _, _ in blocks:
+        header_size += _COLUMN_HEADER.size + len(name.encode("utf-8"))
+
+    header = bytearray(BINARY_FILE_MAGIC)
+    header += _BYTE_ORDER_MARKS[sys.byteorder]
+    header += _HEADER.pack(len(table), len(blocks))
+
+    offset = header_size + _padding(header_size)
+    for name, col_type, data in blocks:
+        encoded_name = name.encode("utf-8")
+        header += _COLUMN_HEADER.pack(
+            _TYPE_CODES[col_type], offset, len(encoded_name)
+        )
+        header += encoded_name
+        offset += len(data) + _padding(len(data))
+
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(b"\0" * _padding(len(header)))
+        for _, _, data in blocks:
+            f.write(data)
+            f.write(b"\0" * _padding(len(data)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Колоночное представление таблицы.
+
+Каждый столбец хранится отдельно: int - в array('q'), bool - в битовой
+карте, str - в списке строк. Для кода, работающего со списком словарей,
+таблица ведет себя как последовательность записей: индексирование
+возвращает RowView, который читает и пишет прямо в столбцы.
+"""
+
+from array import array
+
+from .constants import COLUMNAR_STORAGE
+
+INT_ARRAY_TYPECODE = 'q'
+
+
+class Bitmap:
+    """Битовая карта для столбцов типа bool (1 бит на значение)."""
+
+    def __init__(self, values=()):
+        self._bits = bytearray()
+        self._length = 0
+        for value in values:
+            self.append(value)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, position):
+        if not 0 <= position < self._length:
+            raise IndexError(position)
+        return bool(self._bits[position >> 3] & (1 << (position & 7)))
+
+    def __setitem__(self, position, value):
+        if not 0 <= position < self._length:
+            raise IndexError(position)
+        if value:
+            self._bits[position >> 3] |= 1 << (position & 7)
+        else:
+            self._bits[position >> 3] &= ~(1 << (position & 7)) & 0xFF
+
+    def __iter__(self):
+        for position in range(self._length):
+            yield self[position]
+
+    def append(self, value):
+        if self._length & 7 == 0:
+            self._bits.append(0)
+        self._length += 1
+        self[self._length - 1] = value
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+
+def new_column(col_type, values=()):
+    """Создает хранилище столбца по его типу."""
+    if col_type == 'int':
+        return array(INT_ARRAY_TYPECODE, values)
+    if col_type == 'bool':
+        return Bitmap(values)
+    return list(values)
+
+
+class RowView:
+    """
+    Запись колоночной таблицы, читающая и пишущая прямо в столбцы.
+
+    Поддерживает тот же доступ, что и словарь записи: get, [], keys, items.
+    """
+
+    __slots__ = ("_table", "_position")
+
+    def __init__(self, table, position):
+        self._table = table
+        self._position = position
+
+    def __getitem__(self, column):
+        return self._table.get_value(self._position, column)
+
+    def __setitem__(self, column, value):
+        self._table.set_value(self._position, column, value)
+
+    def get(self, column, default=None):
+        if column not in self._table.columns:
+            return default
+        return self[column]
+
+    def keys(self):
+        return list(self._table.column_names)
+
+    def items(self):
+        return [(column, self[column]) for column in self._table.column_names]
+
+    def __iter__(self):
+        return iter(self._table.column_names)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class ColumnarTable:
+    """Таблица, хранящая данные по столбцам."""
+
+    def __init__(self, columns_spec):
+        """
+        Args:
+            columns_spec: Столбцы в формате "имя:тип", включая ID:int
+        """
+        self.columns_spec = list(columns_spec)
+        self.column_names = []
+        self.column_types = {}
+        self.columns = {}
+        for col_spec in self.columns_spec:
+            col_name, col_type = col_spec.split(':')
+            self.column_names.append(col_name)
+            self.column_types[col_name] = col_type
+            self.columns[col_name] = new_column(col_type)
+
+    def __len__(self):
+        return len(self.columns[self.column_names[0]])
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [
+                dict(RowView(self, i).items())
+                for i in range(*position.indices(len(self)))
+            ]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        return RowView(self, position)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield RowView(self, position)
+
+    def get_value(self, position, column):
+        return self.columns[column][position]
+
+    def set_value(self, position, column, value):
+        self._writable_column(column)[position] = self._coerce(column, value)
+
+    def _writable_column(self, column):
+        """Возвращает хранилище столбца, допускающее изменение."""
+        return self.columns[column]
+
+    def _coerce(self, column, value):
+        """Приводит значение к типу хранилища столбца."""
+        col_type = self.column_types[column]
+        if col_type == 'int':
+            return int(value)
+        if col_type == 'bool':
+            return bool(value)
+        return str(value)
+
+    def append(self, record):
+        for column in self.column_names:
+            self._writable_column(column).append(
+                self._coerce(column, record[column])
+            )
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def project(self, positions, columns):
+        """
+        Собирает записи из выбранных столбцов, не трогая остальные.
+        
+        Args:
+            positions: Позиции записей
+            columns: Имена выбираемых столбцов
+            
+        Returns:
+            iterator: Записи-словари {столбец: значение}
+        """
+        selected = [(column, self.columns[column]) for column in columns]
+        for position in positions:
+            yield {column: values[position] for column, values in selected}
+
+    def without_positions(self, removed):
+        """
+        Возвращает копию таблицы без записей на указанных позициях.
+
+        Args:
+            removed: Множество удаляемых позиций
+
+        Returns:
+            ColumnarTable: Новая таблица того же класса
+        """
+        result = type(self)(self.columns_spec)
+        for column in self.column_names:
+            col_type = self.column_types[column]
+            result.columns[column] = new_column(col_type, (
+                value for i, value in enumerate(self.columns[column])
+                if i not in removed
+            ))
+        return result
+
+    def to_dict(self):
+        """Сериализует таблицу в словарь для JSON-снимка."""
+        return {
+            "storage": COLUMNAR_STORAGE,
+            "columns": self.columns_spec,
+            "data": {
+                column: list(values) for column, values in self.columns.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Восстанавливает таблицу из словаря JSON-снимка."""
+        table = cls(data["columns"])
+        for column in table.column_names:
+            col_type = table.column_types[column]
+            table.columns[column] = new_column(col_type, data["data"][column])
+        return table
+
+    @classmethod
+    def from_records(cls, columns_spec, records):
+        """Строит колоночную таблицу из списка записей-словарей."""
+        table = cls(columns_spec)
+        table.extend(records)
+        return table
@@ -3,12 +3,22 @@
 Константы для устранения "магических чисел" и строк в проекте.
 """
 
+import operator
+import re
+
 # Константы для работы с таблицами - core.py
 DEFAULT_ID_COLUMN = "ID:int"
 VALID_DATA_TYPES = {"int", "str", "bool"}
 BOOLEAN_TRUE_VALUES = ['true', '1', 'yes']
 BOOLEAN_FALSE_VALUES = ['false', '0', 'no']
 DEFAULT_START_ID = 1
+META_COLUMNS_KEY = "columns"
+META_SEQUENCE_KEY = "next_id"
+META_STORAGE_KEY = "storage"
+ROW_STORAGE = "rows"
+COLUMNAR_STORAGE = "columnar"
+BINARY_STORAGE = "binary"
+STORAGE_FORMATS = {ROW_STORAGE, COLUMNAR_STORAGE, BINARY_STORAGE}
 
 # Сообщения об ошибках и успехах - core.py
 EMPTY_TABLE_MESSAGE = "Нет созданных таблиц."
@@ -19,6 +29,10 @@ COLUMN_FORMAT_ERROR = 'Некорректный формат столбца: {}.
 EMPTY_COLUMN_NAME_ERROR = "Имя столбца не может быть пустым в: {}"
 INVALID_TYPE_ERROR = 'Неподдерживаемый тип данных: {}. Используйте int, str, bool.'
 TABLE_NOT_FOUND_ERROR = 'Ошибка: Таблица "{}" не существует.'
+INVALID_STORAGE_ERROR = (
+    "Ошибка: Неподдерживаемый формат хранения: {}. "
+    "Используйте rows, columnar, binary."
+)
 SUCCESS_CREATE_MESSAGE = 'Таблица "{}" успешно создана со столбцами: {}'
 SUCCESS_DROP_MESSAGE = 'Таблица "{}" успешно удалена.'
 VALUES_COUNT_ERROR = "Ошибка: Ожидается {} значений, получено {}."
@@ -27,6 +41,44 @@ UNSUPPORTED_TYPE_ERROR = "Неподдерживаемый тип: {}"
 INVALID_TYPE_FOR_COLUMN_ERROR = 'Ошибка: Неверный тип для столбца {}: {}'
 SUCCESS_INSERT_MESSAGE = 'Запись с ID={} успешно добавлена в таблицу "{}".'
 INFO_TEMPLATE = "Таблица: {}\nСтолбцы: {}\nКоличество записей: {}"
+COLUMN_NOT_FOUND_ERROR = 'Ошибка: Столбец "{}" не существует в таблице "{}".'
+INDEX_EXISTS_ERROR = 'Ошибка: Индекс по столбцу "{}" таблицы "{}" уже существует.'
+SUCCESS_INDEX_MESSAGE = 'Индекс по столбцу "{}" таблицы "{}" успешно создан.'
+SORTED_INDEX_TYPE_ERROR = (
+    'Ошибка: Сортированный индекс возможен только по столбцу типа int, '
+    'а "{}" имеет тип {}.'
+)
+AGGREGATE_TYPE_ERROR = (
+    'Ошибка: Функция {} применима только к столбцу типа int, '
+    'а "{}" имеет тип {}.'
+)
+AGGREGATE_COLUMN_ERROR = (
+    'Ошибка: Столбец "{}" должен быть указан в group by '
+    'или использоваться внутри агрегатной функции.'
+)
+JOIN_COLUMN_NOT_FOUND_ERROR = (
+    'Ошибка: Столбец "{}" не найден в таблицах "{}" и "{}".'
+)
+JOIN_AMBIGUOUS_COLUMN_ERROR = (
+    'Ошибка: Столбец "{}" есть в обеих таблицах, '
+    'укажите таблицу: <таблица>.<столбец>.'
+)
+JOIN_SAME_TABLE_ERROR = 'Ошибка: Таблицу "{}" нельзя соединить саму с собой.'
+JOIN_ON_ERROR = (
+    'Ошибка: Условие on должно связывать столбцы разных таблиц: {} = {}.'
+)
+JOIN_AGGREGATE_ERROR = (
+    "Ошибка: Агрегатные функции и group by для соединения таблиц "
+    "не поддерживаются."
+)
+ORDER_BY_COLUMN_ERROR = (
+    "Ошибка: Результат агрегатов можно сортировать только по его столбцам: {}."
+)
+EMPTY_ROWS_ERROR = "Ошибка: Нет строк для вставки."
+BULK_ROW_ERROR = "Строка {}: {}"
+SUCCESS_BULK_INSERT_MESSAGE = (
+    'В таблицу "{}" успешно добавлено записей: {} (ID с {} по {}).'
+)
 
 
 
@@ -35,6 +87,52 @@ DB_TITLE = "***База данных***"
 COMMAND_PROMPT = ">>>Введите команду: "
 EXIT_MESSAGE = "Выход из программы..."
 CACHE_KEY_SEPARATOR = "_"
+CACHE_STATS_ARG = "stats"
+CACHE_STATS_TEMPLATE = (
+    "Кэш запросов: записей {}, строк {}\n"
+    "Попадания: {}, промахи: {} (доля попаданий {:.1f}%)\n"
+    "Вытеснения: {}"
+)
+PLAN_CACHE_STATS_TEMPLATE = (
+    "Кэш планов: записей {entries}, попадания: {hits}, промахи: {misses}, "
+    "вытеснения: {evictions}\n"
+    "Подготовленных выражений: {prepared}"
+)
+SUCCESS_PREPARE_MESSAGE = 'Выражение "{}" подготовлено (параметров: {}).'
+PREPARED_NOT_FOUND_ERROR = 'Ошибка: Подготовленное выражение "{}" не найдено.'
+PREPARED_ARGS_ERROR = (
+    'Ошибка: Выражение "{}" ожидает параметров: {}, передано: {}.'
+)
+LIMIT_OFFSET_ERROR = (
+    "Ошибка: limit и offset должны быть неотрицательными целыми числами."
+)
+PREPARE_COMMAND_ERROR = (
+    "Ошибка: Подготовить можно только команды insert, select, update и delete."
+)
+STATS_JSON_ARG = "json"
+STATS_PROFILE_ARG = "profile"
+STATS_ON_ARG = "on"
+STATS_OFF_ARG = "off"
+STATS_RESET_ARG = "reset"
+STATS_COUNTERS_TEMPLATE = (
+    "Строк проверено условием: {rows_scanned}, выведено: {rows_returned}\n"
+    "Байт прочитано: {bytes_read}, записано: {bytes_written}, "
+    "отображено через mmap: {bytes_mapped}"
+)
+STATS_COLUMNS = [
+    "Команда", "Вызовов", "Всего, мс", "Среднее, мс",
+    "p50, мс", "p95, мс", "p99, мс", "Макс, мс",
+]
+STATS_ENABLED_MESSAGE = "Сбор метрик включен."
+STATS_DISABLED_MESSAGE = "Сбор метрик выключен."
+STATS_RESET_MESSAGE = "Метрики сброшены."
+STATS_OFF_NOTE = "Метрики не собираются: включите их командой stats on."
+STATS_SAVED_MESSAGE = 'Метрики сохранены в файл "{}".'
+PROFILE_SAVED_MESSAGE = 'Профиль сохранен в файл "{}".'
+NO_PROFILE_MESSAGE = (
+    "Профиль пуст: запустите программу с опцией --profile."
+)
+PROFILE_TOP_FUNCTIONS = 20
 CANCELLED_INDICATOR = "отменена"
 SUCCESS_INDICATOR = "успешно"
 YES_RESPONSE = "y"
@@ -45,14 +143,123 @@ PARSE_ERROR_MESSAGE = "Ошибка парсинга: {}"
 UNEXPECTED_ERROR_MESSAGE = "Произошла ошибка: {}"
 NO_DATA_MESSAGE = "Нет данных для отображения."
 INTERRUPT_MESSAGE = "\n\nВыход из программы..."
+SUCCESS_COMPACT_MESSAGE = 'Журнал таблицы "{}" успешно уплотнен в снимок.'
+SUCCESS_COMMIT_MESSAGE = "Изменения успешно сохранены на диск."
+SUCCESS_BEGIN_MESSAGE = "Транзакция успешно начата."
+SUCCESS_ROLLBACK_MESSAGE = "Изменения транзакции успешно отменены."
+TRANSACTION_ACTIVE_ERROR = "Ошибка: Команда недоступна внутри транзакции."
+NO_TRANSACTION_ERROR = "Ошибка: Нет открытой транзакции."
+TRANSACTION_ABORTED_MESSAGE = "Транзакция не завершена, изменения отменены."
+SERVER_TRANSACTION_ERROR = (
+    "Ошибка: Транзакции недоступны на сервере: таблицы общие для всех клиентов."
+)
+ROWS_FILE_NOT_FOUND_ERROR = 'Ошибка: Файл "{}" не найден.'
+UNSUPPORTED_ROWS_FORMAT_ERROR = (
+    'Ошибка: Неподдерживаемый формат файла "{}". Используйте .csv или .jsonl'
+)
+SCRIPT_NOT_FOUND_ERROR = 'Ошибка: Файл скрипта "{}" не найден.'
+
+# Аргументы командной строки и пакетный режим - engine.py
+DB_DESCRIPTION = "Примитивная база данных"
+SCRIPT_OPTION = "--script"
+SCRIPT_OPTION_HELP = "выполнить команды из файла без подтверждений и справки"
+SCRIPT_COMMENT_PREFIXES = ("--", "#")
+WORKERS_OPTION = "--workers"
+WORKERS_OPTION_HELP = (
+    "число процессов для параллельного сканирования больших таблиц"
+)
+METRICS_OPTION = "--metrics"
+METRICS_OPTION_HELP = "собирать метрики команд (см. команду stats)"
+PROFILE_OPTION = "--profile"
+PROFILE_OPTION_HELP = "профилировать каждую команду через cProfile (stats profile)"
+QUIET_OPTION = "--quiet"
+QUIET_OPTION_HELP = "не выводить заголовок и справку при запуске консоли"
 
 # Команды для проверки в парсерах - engine.py
 INSERT_KEYWORD = "into"
 SELECT_KEYWORD = "from"
 UPDATE_SET_KEYWORD = "set"
 UPDATE_WHERE_KEYWORD = "where"
+SELECT_LIMIT_KEYWORD = "limit"
+SELECT_ALL_COLUMNS = "*"
+SELECT_COLUMN_SEPARATOR = ","
+SELECT_OFFSET_KEYWORD = "offset"
+SELECT_GROUP_KEYWORD = "group"
+SELECT_BY_KEYWORD = "by"
+SELECT_ORDER_KEYWORD = "order"
+SELECT_ASC_KEYWORD = "asc"
+SELECT_DESC_KEYWORD = "desc"
+JOIN_KEYWORD = "join"
+JOIN_ON_KEYWORD = "on"
+JOIN_COLUMN_SEPARATOR = "."
+JOIN_ON_SEPARATOR = "="
 DELETE_FROM_KEYWORD = "from"
 DELETE_WHERE_KEYWORD = "where"
+BULK_INSERT_FROM_KEYWORD = "from"
+STORAGE_OPTION = "--storage"
+PREPARE_AS_KEYWORD = "as"
+# Команды, которые можно подготовить командой prepare
+PREPARED_COMMANDS = {"insert", "select", "update", "delete"}
+
+# Команды, меняющие таблицу, и те из них, что меняют метаданные:
+# перед выполнением захватывают блокировку записи - engine.py
+TABLE_WRITE_COMMANDS = {
+    "create_table", "drop_table", "insert", "bulk_insert", "update",
+    "delete", "create_index", "compact",
+}
+METADATA_WRITE_COMMANDS = {"create_table", "drop_table", "insert", "bulk_insert"}
+# Служебные команды, которым метаданные не нужны: для них метаданные
+# не читаются с диска - engine.py
+METADATA_FREE_COMMANDS = {
+    "", "exit", "help", "cache", "stats", "prepare", "execute",
+}
+
+# Параллельное сканирование - parallel.py
+DEFAULT_SCAN_WORKERS = 1
+PARALLEL_MIN_ROWS = 100_000
+
+# Агрегатные функции - aggregates.py
+AGGREGATE_COUNT = "count"
+AGGREGATE_SUM = "sum"
+AGGREGATE_MIN = "min"
+AGGREGATE_MAX = "max"
+AGGREGATE_AVG = "avg"
+NUMERIC_AGGREGATES = {AGGREGATE_SUM, AGGREGATE_AVG}
+AGGREGATE_PATTERN = re.compile(
+    r"^\s*(count|sum|min|max|avg)\s*\(\s*(\*|[^\s()*]+)\s*\)\s*$",
+    re.IGNORECASE,
+)
+
+# Вид индекса - engine.py
+SORTED_INDEX_ARG = "sorted"
+
+# Грамматика условий WHERE - parser.py
+AND_KEYWORD = "and"
+OR_KEYWORD = "or"
+BETWEEN_OP = "between"
+IN_OP = "in"
+COMPARISON_OPS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+RANGE_OPS = {"<", "<=", ">", ">=", BETWEEN_OP}
+WHERE_PUNCTUATION = {"=", "!=", "<>", "<", "<=", ">", ">=", "(", ")", ","}
+# Лексемы команды за один проход: строка в кавычках, оператор или скобка,
+# слово; последняя группа ловит нераспознанный символ (незакрытую кавычку)
+COMMAND_TOKEN_PATTERN = re.compile(
+    r"""\s*(?:(["'])(.*?)\1|(<=|>=|!=|<>|[=<>(),])"""
+    r"""|((?:[^\s"'=<>!(),]|!(?!=))+)|(\S))""",
+    re.DOTALL,
+)
+QUOTED_TOKEN_GROUP = 2
+UNKNOWN_TOKEN_GROUP = 5
+VALUES_KEYWORD = "values"
+# Параметр подготовленного выражения: ?N (N - номер по порядку)
+PARAM_PATTERN = re.compile(r"\?(\d+)")
 
 # Минимальное количество аргументов для команд - engine.py
 MIN_INSERT_ARGS = 4
@@ -60,14 +267,31 @@ MIN_SELECT_ARGS = 2
 MIN_UPDATE_ARGS = 6
 MIN_DELETE_ARGS = 4
 
+# Размер страницы потокового вывода SELECT - engine.py
+SELECT_PAGE_SIZE = 100
+
 # Сообщения об ошибках использования - engine.py
-CREATE_TABLE_USAGE = "create_table <таблица> <столбец1:тип> ..."
+CREATE_TABLE_USAGE = (
+    "create_table <таблица> <столбец1:тип> ... [--storage rows|columnar|binary]"
+)
 DROP_TABLE_USAGE = "drop_table <таблица>"
 INSERT_USAGE = "insert into <таблица> values (значение1, значение2, ...)"
-SELECT_USAGE = "select from <таблица> [where <условие>]"
+SELECT_USAGE = (
+    "select [<столбец1>, <функция>(<столбец2>), ...] from <таблица> "
+    "[join <таблица2> on <столбец1> = <столбец2>] [where <условие>] "
+    "[group by <столбец>] [order by <столбец> [asc|desc]] "
+    "[limit <N>] [offset <M>]"
+)
 UPDATE_USAGE = "update <таблица> set <столбец>=<значение> where <условие>"
 DELETE_USAGE = "delete from <таблица> where <условие>"
 INFO_USAGE = "info <таблица>"
+CREATE_INDEX_USAGE = "create_index <таблица> <столбец> [sorted]"
+COMPACT_USAGE = "compact <таблица>"
+CACHE_USAGE = "cache stats"
+PREPARE_USAGE = "prepare <имя> as <команда с параметрами ?>"
+EXECUTE_USAGE = "execute <имя> (значение1, значение2, ...)"
+STATS_USAGE = "stats [json [<файл>] | profile [<файл>] | on | off | reset]"
+BULK_INSERT_USAGE = "bulk_insert <таблица> from <файл.csv|файл.jsonl>"
 
 
 # Константы для устранения "магических строк" - decorators.py
@@ -80,9 +304,75 @@ FILE_NOT_FOUND_MESSAGE = (
     "Ошибка: Файл данных не найден. "
     "Возможно, база данных не инициализирована."
 )
-TIME_FORMAT_TEMPLATE = "Функция {} выполнилась за {:.3f} секунд."
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_ROWS = 100_000
 
 # Константы для устранения "магических чисел" и строк - utils.py
 META_FILE = "db_meta.json"
 DATA_DIR = "data"
-DEFAULT_ENCODING = "utf-8"
\ No newline at end of file
+INDEX_FILE_SUFFIX = ".idx.json"
+BINARY_FILE_SUFFIX = ".bin"
+BINARY_FILE_MAGIC = b"PDB1"
+LOG_FILE_SUFFIX = ".log"
+TEMP_FILE_SUFFIX = ".tmp"
+TRANSACTION_FILE_SUFFIX = ".txn"
+TRANSACTION_JOURNAL_FILE = "transaction.json"
+TRANSACTION_LOCK_FILE = "transaction.lock"
+# Поддиректория DATA_DIR для файлов-замков таблиц и транзакций
+LOCK_DIR = "locks"
+LOCK_FILE_SUFFIX = ".lock"
+WRITE_LOCK_FILE_SUFFIX = ".wlock"
+LOG_OP_INSERT = "insert"
+LOG_OP_UPDATE = "update"
+LOG_OP_DELETE = "delete"
+LOG_OP_INSERT_MANY = "insert_many"
+CSV_EXTENSION = ".csv"
+JSONL_EXTENSION = ".jsonl"
+WAL_COMPACT_THRESHOLD = 1000
+
+# Константы хранилища таблиц в памяти - store.py
+FLUSH_INTERVAL_SECONDS = 5.0
+DEFAULT_ENCODING = "utf-8"
+
+# Кэш планов и подготовленные выражения - plans.py
+PLAN_CACHE_SIZE = 1024
+PARAM_PLACEHOLDER = "?"
+
+# Метрики производительности - metrics.py
+METRIC_ROWS_SCANNED = "rows_scanned"
+METRIC_ROWS_RETURNED = "rows_returned"
+METRIC_BYTES_READ = "bytes_read"
+METRIC_BYTES_WRITTEN = "bytes_written"
+METRIC_BYTES_MAPPED = "bytes_mapped"
+METRIC_COUNTERS = (
+    METRIC_ROWS_SCANNED, METRIC_ROWS_RETURNED,
+    METRIC_BYTES_READ, METRIC_BYTES_WRITTEN, METRIC_BYTES_MAPPED,
+)
+LATENCY_BUCKETS = 48
+LATENCY_PERCENTILES = (50, 95, 99)
+
+# Блокировки файлов между процессами - locks.py
+LOCK_TIMEOUT_SECONDS = 10.0
+LOCK_POLL_INTERVAL = 0.01
+LOCK_TIMEOUT_ERROR = (
+    'Ошибка: Файл "{}" заблокирован другим процессом. Попробуйте позже.'
+)
+
+# Сетевой сервер - server.py
+SERVER_DEFAULT_HOST = "127.0.0.1"
+SERVER_DEFAULT_PORT = 8765
+SERVER_THREADS = 8
+SERVER_RESPONSE_END = "\x04"
+SERVER_DESCRIPTION = "Сервер примитивной базы данных"
+SERVER_HOST_HELP = "адрес для TCP-подключений"
+SERVER_PORT_HELP = "порт для TCP-подключений"
+SERVER_UNIX_HELP = "путь к Unix-сокету (вместо TCP)"
+SERVER_STARTED_MESSAGE = "Сервер запущен: {}"
+SERVER_STOPPED_MESSAGE = "Сервер остановлен, изменения сохранены на диск."
+# Команды, меняющие набор таблиц или сбрасывающие все изменения на диск:
+# выполняются монопольно относительно всех остальных команд
+SERVER_GLOBAL_COMMANDS = {"create_table", "drop_table", "commit", "compact"}
+SERVER_UNSUPPORTED_COMMANDS = {"begin", "rollback"}
+SERVER_WRITE_COMMANDS = {
+    "insert", "bulk_insert", "update", "delete", "create_index",
+}
@@ -1,26 +1,55 @@
 #!/usr/bin/env python3
 """
 Основная логика работы с таблицами и данными.
+
+Модули отдельных возможностей (бинарный формат, соединения, агрегаты,
+параллельное сканирование) импортируются в функциях, которые их
+используют, чтобы запуск не тратил время на неиспользуемые возможности.
 """
 
-from prettytable import PrettyTable
+import heapq
+from itertools import islice
+from operator import itemgetter
 
+from . import index, metrics
+from .columnar import ColumnarTable
 from .constants import (
+    AGGREGATE_COLUMN_ERROR,
+    AGGREGATE_COUNT,
+    AGGREGATE_MAX,
+    AGGREGATE_MIN,
+    AGGREGATE_TYPE_ERROR,
+    BINARY_STORAGE,
     BOOL_TYPE_ERROR,
-    BOOLEAN_FALSE_VALUES,
-    BOOLEAN_TRUE_VALUES,
+    BULK_ROW_ERROR,
     COLUMN_FORMAT_ERROR,
+    COLUMN_NOT_FOUND_ERROR,
+    COLUMNAR_STORAGE,
     DEFAULT_ID_COLUMN,
     DEFAULT_START_ID,
     EMPTY_COLUMN_NAME_ERROR,
+    EMPTY_ROWS_ERROR,
     EMPTY_TABLE_ERROR,
     EMPTY_TABLE_MESSAGE,
+    INDEX_EXISTS_ERROR,
     INFO_TEMPLATE,
+    INVALID_STORAGE_ERROR,
     INVALID_TYPE_ERROR,
     INVALID_TYPE_FOR_COLUMN_ERROR,
+    META_COLUMNS_KEY,
+    META_SEQUENCE_KEY,
+    META_STORAGE_KEY,
+    METRIC_ROWS_SCANNED,
     MIN_COLUMNS_ERROR,
+    NUMERIC_AGGREGATES,
+    ORDER_BY_COLUMN_ERROR,
+    ROW_STORAGE,
+    SORTED_INDEX_TYPE_ERROR,
+    STORAGE_FORMATS,
+    SUCCESS_BULK_INSERT_MESSAGE,
     SUCCESS_CREATE_MESSAGE,
     SUCCESS_DROP_MESSAGE,
+    SUCCESS_INDEX_MESSAGE,
     SUCCESS_INSERT_MESSAGE,
     TABLE_EXISTS_ERROR,
     TABLE_NOT_FOUND_ERROR,
@@ -29,10 +58,201 @@ from .constants import (
     VALUES_COUNT_ERROR,
 )
 from .decorators import confirm_action, handle_db_errors, log_time
+from .parser import And, Or, Predicate
+from .values import CONVERTERS
+
+
+def table_columns(metadata, table_name):
+    """
+    Возвращает список столбцов таблицы в формате "имя:тип".
+    
+    Args:
+        metadata: Метаданные БД
+        table_name: Имя таблицы
+        
+    Returns:
+        list: Столбцы таблицы
+    """
+    return metadata[table_name][META_COLUMNS_KEY]
+
+
+def table_storage(metadata, table_name):
+    """
+    Возвращает формат хранения таблицы (rows по умолчанию).
+    
+    Args:
+        metadata: Метаданные БД
+        table_name: Имя таблицы
+        
+    Returns:
+        str: Формат хранения
+    """
+    return metadata[table_name].get(META_STORAGE_KEY, ROW_STORAGE)
+
+
+def empty_table_data(metadata, table_name):
+    """
+    Создает пустые данные таблицы в ее формате хранения.
+    
+    Args:
+        metadata: Метаданные БД
+        table_name: Имя таблицы
+        
+    Returns:
+        list | ColumnarTable | BinaryTable: Пустые данные таблицы
+    """
+    storage = table_storage(metadata, table_name)
+    if storage == COLUMNAR_STORAGE:
+        return ColumnarTable(table_columns(metadata, table_name))
+    if storage == BINARY_STORAGE:
+        from .binary import BinaryTable
+        
+        return BinaryTable(table_columns(metadata, table_name))
+    return []
+
+
+def _iter_matches(table_data, where_clause):
+    """
+    Лениво перебирает позиции записей, подходящих под условие,
+    полным сканированием.
+    
+    Простое условие по колоночной таблице сканирует один столбец без
+    сборки записей; составное проверяется по каждой записи. Большие
+    таблицы при включенном параллельном режиме сканируются пулом процессов.
+    
+    Args:
+        table_data: Данные таблицы
+        where_clause: Условие parser.Predicate, parser.And или parser.Or
+        
+    Returns:
+        iterator: Позиции подходящих записей по возрастанию
+    """
+    metrics.add(METRIC_ROWS_SCANNED, len(table_data))
+    from . import parallel
+    
+    if parallel.should_parallelize(table_data):
+        return iter(parallel.scan(table_data, where_clause))
+    
+    if isinstance(table_data, ColumnarTable) and \
+            isinstance(where_clause, Predicate):
+        values = table_data.columns.get(where_clause.column)
+        if values is None:
+            return iter(())
+        return where_clause.scan(values)
+    
+    return where_clause.scan_records(table_data)
+
+
+def _match_positions(table_data, where_clause):
+    """
+    Находит позиции записей, подходящих под условие, полным сканированием.
+    
+    Returns:
+        list: Позиции подходящих записей
+    """
+    return list(_iter_matches(table_data, where_clause))
+
+
+def _indexed_positions(table_data, where_clause, indexes):
+    """
+    Планирует выполнение условия по индексам.
+    
+    Для and берется самый узкий индексируемый член, и найденные записи
+    проходят проверку полным условием. Для or индексы объединяются, только
+    если индексируется каждый член (иначе все равно нужен полный проход).
+    
+    Args:
+        table_data: Данные таблицы
+        where_clause: Условие parser.Predicate, parser.And или parser.Or
+        indexes: Индексы таблицы
+        
+    Returns:
+        list: Отсортированные позиции записей или None, если индексы
+        не помогают и нужно полное сканирование
+    """
+    if not indexes:
+        return None
+    
+    if isinstance(where_clause, And):
+        candidates = [
+            positions for positions in (
+                _indexed_positions(table_data, item, indexes)
+                for item in where_clause.items
+            )
+            if positions is not None
+        ]
+        if not candidates:
+            return None
+        narrowest = min(candidates, key=len)
+        return [
+            position for position in narrowest
+            if where_clause(table_data[position])
+        ]
+    
+    if isinstance(where_clause, Or):
+        found = set()
+        for item in where_clause.items:
+            positions = _indexed_positions(table_data, item, indexes)
+            if positions is None:
+                return None
+            found.update(positions)
+        return sorted(found)
+    
+    positions = index.lookup(indexes, where_clause)
+    if positions is not None:
+        metrics.add(METRIC_ROWS_SCANNED, len(positions))
+    return positions
+
+
+def _without_positions(table_data, removed):
+    """
+    Возвращает данные таблицы без записей на указанных позициях.
+    
+    Args:
+        table_data: Данные таблицы
+        removed: Множество удаляемых позиций
+        
+    Returns:
+        list | ColumnarTable: Новые данные таблицы
+    """
+    if isinstance(table_data, ColumnarTable):
+        return table_data.without_positions(removed)
+    
+    return [
+        record for position, record in enumerate(table_data)
+        if position not in removed
+    ]
+
+
+def next_sequence_id(metadata, table_name, table_data, count=1):
+    """
+    Выделяет следующий ID (или диапазон из count ID) из счетчика таблицы.
+    
+    Счетчик только растет, поэтому ID не переиспользуются после удаления.
+    Для метаданных старого формата без счетчика он один раз
+    восстанавливается по максимальному ID в данных.
+    
+    Args:
+        metadata: Метаданные БД, счетчик обновляется на месте
+        table_name: Имя таблицы
+        table_data: Данные таблицы
+        count: Количество выделяемых подряд ID
+        
+    Returns:
+        int: Первый выделенный ID
+    """
+    table_meta = metadata[table_name]
+    next_id = table_meta.get(META_SEQUENCE_KEY)
+    if next_id is None:
+        ids = [record.get("ID", 0) for record in table_data]
+        next_id = max(ids) + 1 if ids else DEFAULT_START_ID
+    
+    table_meta[META_SEQUENCE_KEY] = next_id + count
+    return next_id
 
 
 @handle_db_errors
-def create_table(metadata, table_name, columns):
+def create_table(metadata, table_name, columns, storage=ROW_STORAGE):
     """
     Создает новую таблицу в метаданных.
     
@@ -40,6 +260,7 @@ def create_table(metadata, table_name, columns):
         metadata: Текущие метаданные БД
         table_name: Имя таблицы
         columns: Список столбцов в формате "имя:тип"
+        storage: Формат хранения данных (rows, columnar или binary)
         
     Returns:
         tuple: (обновленные метаданные, сообщение об ошибке или успехе)
@@ -53,6 +274,9 @@ def create_table(metadata, table_name, columns):
     if not columns:
         return metadata, MIN_COLUMNS_ERROR
     
+    if storage not in STORAGE_FORMATS:
+        return metadata, INVALID_STORAGE_ERROR.format(storage)
+    
     all_columns = [DEFAULT_ID_COLUMN] + columns
     
     for column in all_columns:
@@ -67,7 +291,11 @@ def create_table(metadata, table_name, columns):
         if col_type not in VALID_DATA_TYPES:
             return metadata, INVALID_TYPE_ERROR.format(col_type)
     
-    metadata[table_name] = all_columns
+    metadata[table_name] = {
+        META_COLUMNS_KEY: all_columns,
+        META_SEQUENCE_KEY: DEFAULT_START_ID,
+        META_STORAGE_KEY: storage,
+    }
     columns_str = ", ".join(all_columns)
     
     return metadata, SUCCESS_CREATE_MESSAGE.format(table_name, columns_str)
@@ -111,12 +339,14 @@ def list_tables(metadata):
     if not metadata:
         return EMPTY_TABLE_MESSAGE
     
+    from prettytable import PrettyTable
+    
     table = PrettyTable()
     table.field_names = ["Таблица", "Столбцы"]
     table.align = "l"
     
-    for table_name, columns in metadata.items():
-        columns_str = ", ".join(columns)
+    for table_name in metadata:
+        columns_str = ", ".join(table_columns(metadata, table_name))
         table.add_row([table_name, columns_str])
     
     return table
@@ -138,16 +368,161 @@ def info_table(metadata, table_name, table_data):
     if table_name not in metadata:
         return TABLE_NOT_FOUND_ERROR.format(table_name)
     
-    columns = metadata[table_name]
+    columns = table_columns(metadata, table_name)
     columns_str = ", ".join(columns)
     record_count = len(table_data)
     
     return INFO_TEMPLATE.format(table_name, columns_str, record_count)
 
 
+def missing_column(metadata, table_name, columns):
+    """
+    Ищет первый столбец из списка, которого нет в таблице.
+    
+    Args:
+        metadata: Метаданные БД
+        table_name: Имя таблицы
+        columns: Имена столбцов
+        
+    Returns:
+        str: Имя отсутствующего столбца или None
+    """
+    column_names = {
+        spec.split(':')[0] for spec in table_columns(metadata, table_name)
+    }
+    for column in columns:
+        if column not in column_names:
+            return column
+    return None
+
+
+def check_set_clause(metadata, table_name, set_clause):
+    """
+    Проверяет SET условие и приводит новое значение к типу столбца.
+    
+    Значение приводится на месте один раз, до изменения записей,
+    индексов и журнала, поэтому в таблицу попадают только значения
+    типа столбца (как при insert).
+    
+    Args:
+        metadata: Метаданные БД
+        table_name: Имя таблицы
+        set_clause: {'column': 'new_value'}, изменяется на месте
+        
+    Returns:
+        str: Сообщение об ошибке или None, если условие корректно
+    """
+    if table_name not in metadata:
+        return TABLE_NOT_FOUND_ERROR.format(table_name)
+    
+    column_types = dict(
+        spec.split(':') for spec in table_columns(metadata, table_name)
+    )
+    for column, value in set_clause.items():
+        if column not in column_types:
+            return COLUMN_NOT_FOUND_ERROR.format(column, table_name)
+        col_type = column_types[column]
+        if col_type not in CONVERTERS:
+            return UNSUPPORTED_TYPE_ERROR.format(col_type)
+        try:
+            set_clause[column] = CONVERTERS[col_type](value)
+        except (ValueError, TypeError):
+            if col_type == 'bool':
+                return BOOL_TYPE_ERROR.format(column, value)
+            return INVALID_TYPE_FOR_COLUMN_ERROR.format(column, value)
+    return None
+
+
+@handle_db_errors
+def create_index(metadata, table_name, column, table_data, indexes,
+                 sorted_index=False):
+    """
+    Создает индекс по столбцу таблицы.
+    
+    Args:
+        metadata: Метаданные БД
+        table_name: Имя таблицы
+        column: Имя индексируемого столбца
+        table_data: Данные таблицы
+        indexes: Текущие индексы таблицы {столбец: индекс}
+        sorted_index: Создать сортированный индекс для условий
+            по диапазону (только int-столбцы) вместо хеш-индекса
+        
+    Returns:
+        tuple: (обновленные индексы, сообщение об ошибке или успехе)
+    """
+    if table_name not in metadata:
+        return indexes, TABLE_NOT_FOUND_ERROR.format(table_name)
+    
+    column_types = dict(
+        spec.split(':') for spec in table_columns(metadata, table_name)
+    )
+    if column not in column_types:
+        return indexes, COLUMN_NOT_FOUND_ERROR.format(column, table_name)
+    
+    if column in indexes:
+        return indexes, INDEX_EXISTS_ERROR.format(column, table_name)
+    
+    if sorted_index:
+        if column_types[column] != 'int':
+            return indexes, SORTED_INDEX_TYPE_ERROR.format(
+                column, column_types[column]
+            )
+        indexes[column] = index.build_sorted_index(table_data, column)
+    else:
+        indexes[column] = index.build_index(table_data, column)
+    
+    return indexes, SUCCESS_INDEX_MESSAGE.format(column, table_name)
+
+
+def _column_converters(data_columns):
+    """
+    Разбирает спецификацию столбцов один раз для серии вставок.
+    
+    Args:
+        data_columns: Столбцы в формате "имя:тип" (без ID)
+        
+    Returns:
+        tuple: (список (имя, тип, функция приведения), сообщение об ошибке)
+    """
+    converters = []
+    for col_spec in data_columns:
+        col_name, col_type = col_spec.split(':')
+        if col_type not in CONVERTERS:
+            return None, UNSUPPORTED_TYPE_ERROR.format(col_type)
+        converters.append((col_name, col_type, CONVERTERS[col_type]))
+    return converters, None
+
+
+def _validate_row(converters, values):
+    """
+    Проверяет и приводит значения одной записи к типам столбцов.
+    
+    Args:
+        converters: Результат _column_converters
+        values: Значения записи
+        
+    Returns:
+        tuple: (приведенные значения или None, сообщение об ошибке)
+    """
+    if len(values) != len(converters):
+        return None, VALUES_COUNT_ERROR.format(len(converters), len(values))
+    
+    validated_values = []
+    for (col_name, col_type, convert), value in zip(converters, values):
+        try:
+            validated_values.append(convert(value))
+        except (ValueError, TypeError):
+            if col_type == 'bool':
+                return None, BOOL_TYPE_ERROR.format(col_name, value)
+            return None, INVALID_TYPE_FOR_COLUMN_ERROR.format(col_name, value)
+    
+    return validated_values, None
+
+
 @handle_db_errors
 @log_time
-def insert(metadata, table_name, values, table_data):
+def insert(metadata, table_name, values, table_data, indexes=None):
     """
     Вставляет запись в таблицу.
     
@@ -156,6 +531,7 @@ def insert(metadata, table_name, values, table_data):
         table_name: Имя таблицы
         values: Список значений для вставки
         table_data: Текущие данные таблицы
+        indexes: Индексы таблицы, обновляются на месте
         
     Returns:
         tuple: (обновленные данные таблицы, сообщение об ошибке или успехе)
@@ -163,139 +539,528 @@ def insert(metadata, table_name, values, table_data):
     if table_name not in metadata:
         return table_data, TABLE_NOT_FOUND_ERROR.format(table_name)
     
-    columns_spec = metadata[table_name]
+    columns_spec = table_columns(metadata, table_name)
     data_columns = columns_spec[1:]  # Пропускаем ID:int
     
-    if len(values) != len(data_columns):
-        expected = len(data_columns)
-        actual = len(values)
-        return table_data, VALUES_COUNT_ERROR.format(expected, actual)
+    converters, error = _column_converters(data_columns)
+    if error:
+        return table_data, error
     
     # Валидируем и преобразуем значения
-    validated_values = []
-    for i, (col_spec, value) in enumerate(zip(data_columns, values)):
-        col_name, col_type = col_spec.split(':')
-        
-        try:
-            if col_type == 'int':
-                validated_values.append(int(value))
-            elif col_type == 'str':
-                # Убираем кавычки если есть
-                if isinstance(value, str) and (
-                    (value.startswith('"') and value.endswith('"')) or
-                    (value.startswith("'") and value.endswith("'"))
-                ):
-                    validated_values.append(value[1:-1])
-                else:
-                    validated_values.append(str(value))
-            elif col_type == 'bool':
-                if isinstance(value, bool):
-                    validated_values.append(value)
-                elif isinstance(value, str):
-                    if value.lower() in BOOLEAN_TRUE_VALUES:
-                        validated_values.append(True)
-                    elif value.lower() in BOOLEAN_FALSE_VALUES:
-                        validated_values.append(False)
-                    else:
-                        return table_data, BOOL_TYPE_ERROR.format(col_name, value)
-                elif isinstance(value, int):
-                    validated_values.append(bool(value))
-                else:
-                    return table_data, BOOL_TYPE_ERROR.format(col_name, value)
-            else:
-                return table_data, UNSUPPORTED_TYPE_ERROR.format(col_type)
-        except (ValueError, TypeError):
-            return table_data, INVALID_TYPE_FOR_COLUMN_ERROR.format(col_name, value)
+    validated_values, error = _validate_row(converters, values)
+    if error:
+        return table_data, error
     
-    # Генерируем ID
-    next_id = DEFAULT_START_ID
-    if table_data:
-        ids = [record.get("ID", 0) for record in table_data]
-        next_id = max(ids) + 1 if ids else DEFAULT_START_ID
+    # Генерируем ID из счетчика таблицы
+    next_id = next_sequence_id(metadata, table_name, table_data)
     
     # Создаем запись
     record = {"ID": next_id}
-    for col_spec, value in zip(data_columns, validated_values):
-        col_name, _ = col_spec.split(':')
+    for (col_name, _, _), value in zip(converters, validated_values):
         record[col_name] = value
     
     # Добавляем в данные
     table_data.append(record)
+    if indexes:
+        index.add_record(indexes, record, len(table_data) - 1)
     
     return table_data, SUCCESS_INSERT_MESSAGE.format(next_id, table_name)
 
 
 @handle_db_errors
 @log_time
-def select(table_data, where_clause=None):
+def insert_many(metadata, table_name, rows, table_data, indexes=None):
+    """
+    Вставляет пачку записей в таблицу.
+    
+    Все строки проверяются до вставки: при ошибке в любой из них таблица
+    не меняется. Записи получают непрерывный диапазон ID.
+    
+    Args:
+        metadata: Метаданные БД
+        table_name: Имя таблицы
+        rows: Список строк, каждая - список значений в порядке столбцов
+        table_data: Текущие данные таблицы
+        indexes: Индексы таблицы, обновляются на месте
+        
+    Returns:
+        tuple: (обновленные данные таблицы, сообщение об ошибке или успехе)
+    """
+    if table_name not in metadata:
+        return table_data, TABLE_NOT_FOUND_ERROR.format(table_name)
+    
+    if not rows:
+        return table_data, EMPTY_ROWS_ERROR
+    
+    columns_spec = table_columns(metadata, table_name)
+    converters, error = _column_converters(columns_spec[1:])
+    if error:
+        return table_data, error
+    
+    column_names = ["ID"] + [col_name for col_name, _, _ in converters]
+    records = []
+    for row_number, values in enumerate(rows, 1):
+        validated_values, error = _validate_row(converters, values)
+        if error:
+            return table_data, BULK_ROW_ERROR.format(row_number, error)
+        records.append(validated_values)
+    
+    first_id = next_sequence_id(metadata, table_name, table_data, len(records))
+    start_position = len(table_data)
+    
+    table_data.extend(
+        dict(zip(column_names, [record_id] + validated_values))
+        for record_id, validated_values in enumerate(records, first_id)
+    )
+    if indexes:
+        for position in range(start_position, len(table_data)):
+            index.add_record(indexes, table_data[position], position)
+    
+    last_id = first_id + len(records) - 1
+    return table_data, SUCCESS_BULK_INSERT_MESSAGE.format(
+        table_name, len(records), first_id, last_id
+    )
+
+
+def _column_getter(table_data, column):
+    """Функция позиция -> значение столбца."""
+    if isinstance(table_data, ColumnarTable):
+        return table_data.columns[column].__getitem__
+    return lambda position: table_data[position][column]
+
+
+def _top(items, key, count=None, descending=False):
+    """
+    Первые count элементов в порядке key.
+    
+    При заданном count отбор идет через кучу из count элементов
+    (O(N log K)) без сортировки всех элементов; равные элементы
+    сохраняют исходный порядок при любом направлении (как и обход
+    сортированного индекса в index.ordered_positions).
+    
+    Args:
+        items: Итератор элементов
+        key: Ключ сортировки
+        count: Сколько элементов нужно (None - все)
+        descending: True - по убыванию
+        
+    Returns:
+        list: Отобранные элементы по порядку
+    """
+    if count is None:
+        return sorted(items, key=key, reverse=descending)
+    if descending:
+        return heapq.nlargest(count, items, key=key)
+    return heapq.nsmallest(count, items, key=key)
+
+
+def _ordered_positions(table_data, where_clause, indexes, order_by, count):
+    """
+    Позиции подходящих записей в порядке order by.
+    
+    Если по столбцу сортировки есть сортированный индекс, записи идут
+    прямо в порядке индекса и проверяются условием по одной, поэтому
+    запрос с limit останавливается, набрав нужное число. Иначе (или если
+    условие само сужается индексом) найденные позиции отбираются
+    через _top.
+    
+    Args:
+        table_data: Данные таблицы
+        where_clause: Условие или None
+        indexes: Индексы таблицы
+        order_by: (столбец, по убыванию)
+        count: Сколько первых записей нужно (None - все)
+        
+    Returns:
+        iterator: Позиции записей
+    """
+    column, descending = order_by
+    positions = None
+    if where_clause is not None:
+        positions = _indexed_positions(table_data, where_clause, indexes)
+    
+    if positions is None and (where_clause is None or count is not None):
+        ordered = index.ordered_positions(indexes, column, descending)
+        if ordered is not None:
+            if where_clause is None:
+                return ordered
+            return (
+                position for position in ordered
+                if where_clause(table_data[position])
+            )
+    
+    if positions is None:
+        if where_clause is None:
+            positions = range(len(table_data))
+        else:
+            positions = _iter_matches(table_data, where_clause)
+    
+    key = _column_getter(table_data, column)
+    return iter(_top(positions, key, count, descending))
+
+
+@handle_db_errors
+def select(table_data, where_clause=None, indexes=None, limit=None, offset=0,
+           columns=None, order_by=None):
     """
     Выбирает записи из таблицы.
+    
+    Записи отдаются генератором по мере нахождения, поэтому вывод может
+    начаться до окончания сканирования. Условие по индексированному
+    столбцу обслуживается индексом без полного сканирования.
+    
+    Args:
+        table_data: Данные таблицы
+        where_clause: Условие parser.Predicate или None
+        indexes: Индексы таблицы
+        limit: Максимальное число записей (None - без ограничения)
+        offset: Сколько подходящих записей пропустить
+        columns: Выбираемые столбцы (None - все столбцы)
+        order_by: (столбец, по убыванию) или None - порядок хранения
+        
+    Returns:
+        iterator: Подходящие записи
     """
+    stop = None if limit is None else offset + limit
+    
     if not table_data:
-        return []
+        return iter(())
+    
+    if order_by is not None:
+        positions = _ordered_positions(
+            table_data, where_clause, indexes, order_by, stop
+        )
+        return _project(table_data, islice(positions, offset, stop), columns)
     
     if where_clause is None:
-        return table_data
+        if columns is None:
+            return islice(iter(table_data), offset, stop)
+        positions = range(len(table_data))[offset:stop]
+    else:
+        positions = _indexed_positions(table_data, where_clause, indexes)
+        if positions is not None:
+            positions = positions[offset:stop]
+        else:
+            positions = islice(
+                _iter_matches(table_data, where_clause), offset, stop
+            )
     
-    column, value = next(iter(where_clause.items()))
-    value_str = str(value).lower()  # Приводим к нижнему регистру
+    return _project(table_data, positions, columns)
+
+
+def _side_positions(table_data, where_clause, indexes):
+    """Позиции записей таблицы, подходящих под условие (с индексами)."""
+    if where_clause is None:
+        return range(len(table_data))
+    positions = _indexed_positions(table_data, where_clause, indexes)
+    if positions is None:
+        positions = _match_positions(table_data, where_clause)
+    return positions
+
+
+def _join_keys(positions, key, normalize=None):
+    """Пары (позиция, ключ соединения) для hash_join."""
+    if normalize is None:
+        return ((position, key(position)) for position in positions)
+    return ((position, normalize(key(position))) for position in positions)
+
+
+@handle_db_errors
+def join_select(query, tables, limit=None, offset=0, descending=False):
+    """
+    Выполняет select по соединению двух таблиц (hash join).
     
-    filtered_data = [
-        record for record in table_data 
-        if str(record.get(column, "")).lower() == value_str
-    ]
+    Условия, относящиеся к одной таблице, проверяются при ее
+    сканировании (с индексами), затем по меньшей из отобранных сторон
+    строится хеш-таблица, а большая проходится один раз. Записи
+    результата собираются только из нужных столбцов.
+    
+    Args:
+        query: Проверенный join.Join
+        tables: {таблица: (данные, индексы)} для обеих таблиц
+        limit: Максимальное число записей (None - без ограничения)
+        offset: Сколько записей пропустить
+        descending: Порядок сортировки по query.order_column
+        
+    Returns:
+        iterator: Записи {таблица.столбец: значение}
+    """
+    from . import join
+    
+    stop = None if limit is None else offset + limit
+    normalize = query.key_function()
+    needed = query.needed_columns()
+    
+    sides = []
+    for table in query.tables:
+        table_data, indexes = tables[table]
+        positions = _side_positions(
+            table_data, query.conditions[table], indexes
+        )
+        key = _column_getter(table_data, query.keys[table])
+        getters = [
+            (join.qualified(table, column), _column_getter(table_data, column))
+            for column in needed[table]
+        ]
+        sides.append((positions, key, getters))
+    
+    build, probe = sides
+    swapped = len(probe[0]) < len(build[0])
+    if swapped:
+        build, probe = probe, build
+    pairs = join.hash_join(
+        _join_keys(build[0], build[1], normalize),
+        _join_keys(probe[0], probe[1], normalize),
+    )
+    if swapped:
+        pairs = ((left, right) for right, left in pairs)
+    
+    left_getters, right_getters = sides[0][2], sides[1][2]
+    records = (
+        {
+            **{label: get(left) for label, get in left_getters},
+            **{label: get(right) for label, get in right_getters},
+        }
+        for left, right in pairs
+    )
+    if query.residual is not None:
+        records = filter(query.residual, records)
+    if query.order_column is not None:
+        records = iter(_top(
+            records, itemgetter(query.order_column), stop, descending
+        ))
+    
+    return (
+        {column: record[column] for column in query.columns}
+        for record in islice(records, offset, stop)
+    )
+
+
+def _project(table_data, positions, columns):
+    """
+    Собирает записи на указанных позициях, оставляя только нужные столбцы.
+    
+    Колоночная таблица читает только выбранные столбцы, не собирая
+    записи целиком.
+    
+    Args:
+        table_data: Данные таблицы
+        positions: Позиции записей
+        columns: Выбираемые столбцы (None - все столбцы)
+        
+    Returns:
+        iterator: Записи
+    """
+    if columns is None:
+        return (table_data[position] for position in positions)
+    
+    if isinstance(table_data, ColumnarTable):
+        return table_data.project(positions, columns)
+    
+    return (
+        {column: table_data[position][column] for column in columns}
+        for position in positions
+    )
+
+
+def check_aggregate_query(metadata, table_name, items, group_by=None,
+                          order_by=None):
+    """
+    Проверяет столбцы и типы агрегатного запроса.
+    
+    Args:
+        metadata: Метаданные БД
+        table_name: Имя таблицы
+        items: Элементы SELECT: Aggregate или имя столбца
+        group_by: Столбец группировки или None
+        order_by: (столбец результата, по убыванию) или None
+        
+    Returns:
+        str: Сообщение об ошибке или None, если запрос корректен
+    """
+    from .aggregates import Aggregate
+    
+    column_types = dict(
+        spec.split(':') for spec in table_columns(metadata, table_name)
+    )
+    if group_by is not None and group_by not in column_types:
+        return COLUMN_NOT_FOUND_ERROR.format(group_by, table_name)
     
-    return filtered_data
+    for item in items:
+        if not isinstance(item, Aggregate):
+            if item not in column_types:
+                return COLUMN_NOT_FOUND_ERROR.format(item, table_name)
+            if item != group_by:
+                return AGGREGATE_COLUMN_ERROR.format(item)
+            continue
+        
+        if item.column is None:
+            continue
+        if item.column not in column_types:
+            return COLUMN_NOT_FOUND_ERROR.format(item.column, table_name)
+        col_type = column_types[item.column]
+        if item.func in NUMERIC_AGGREGATES and col_type != 'int':
+            return AGGREGATE_TYPE_ERROR.format(item.func, item.column, col_type)
+    
+    if order_by is not None:
+        result_columns = [
+            item.name if isinstance(item, Aggregate) else item
+            for item in items
+        ]
+        if order_by[0] not in result_columns:
+            return ORDER_BY_COLUMN_ERROR.format(", ".join(result_columns))
+    
+    return None
+
+
+def _aggregate_without_scan(table_data, items, where_clause, indexes):
+    """
+    Пытается ответить на агрегатный запрос без чтения записей.
+    
+    count берется из длины таблицы или числа позиций, найденных по индексу;
+    min и max без условия - из краев сортированного индекса.
+    
+    Returns:
+        dict: Запись результата или None, если нужен проход по записям
+    """
+    from .aggregates import Aggregate, result_row
+    
+    aggregates = [item for item in items if isinstance(item, Aggregate)]
+    
+    if where_clause is None:
+        count = len(table_data)
+    else:
+        if any(item.func != AGGREGATE_COUNT for item in aggregates):
+            return None
+        positions = _indexed_positions(table_data, where_clause, indexes)
+        if positions is None:
+            return None
+        count = len(positions)
+    
+    states = []
+    for item in aggregates:
+        if item.func == AGGREGATE_COUNT:
+            states.append([count, None])
+            continue
+        if item.func not in (AGGREGATE_MIN, AGGREGATE_MAX):
+            return None
+        column_bounds = index.bounds(indexes, item.column)
+        if column_bounds is None:
+            return None
+        low, high = column_bounds
+        states.append([count, low if item.func == AGGREGATE_MIN else high])
+    
+    return result_row(items, None, states)
 
 
 @handle_db_errors
-def update(table_data, set_clause, where_clause):
+def aggregate(table_data, items, where_clause=None, indexes=None,
+              group_by=None, order_by=None, count=None):
+    """
+    Вычисляет агрегатный запрос (count, sum, min, max, avg, group by).
+    
+    Записи обходятся один раз, и из них читаются только столбцы, нужные
+    функциям и группировке. Запросы, на которые можно ответить по длине
+    таблицы и индексам, выполняются без чтения записей.
+    
+    Args:
+        table_data: Данные таблицы
+        items: Элементы SELECT: Aggregate или имя столбца group by
+        where_clause: Условие или None
+        indexes: Индексы таблицы
+        group_by: Столбец группировки или None
+        order_by: (столбец результата, по убыванию) или None
+        count: Сколько первых записей нужно при order_by (None - все)
+        
+    Returns:
+        list: Записи результата, по одной на группу
+    """
+    from .aggregates import Aggregate, aggregate_records
+    
+    if group_by is None:
+        row = _aggregate_without_scan(table_data, items, where_clause, indexes)
+        if row is not None:
+            return [row]
+    
+    columns = [group_by] if group_by else []
+    for item in items:
+        if isinstance(item, Aggregate) and item.column and \
+                item.column not in columns:
+            columns.append(item.column)
+    
+    if where_clause is None:
+        positions = range(len(table_data))
+    else:
+        positions = _indexed_positions(table_data, where_clause, indexes)
+        if positions is None:
+            positions = _iter_matches(table_data, where_clause)
+    
+    records = _project(table_data, positions, columns) if table_data else ()
+    rows = aggregate_records(records, items, group_by)
+    if order_by is not None:
+        column, descending = order_by
+        rows = _top(rows, itemgetter(column), count, descending)
+    return rows
+
+
+@handle_db_errors
+def update(table_data, set_clause, where_clause, indexes=None):
     """
     Обновляет записи в таблицы.
     
     Args:
         table_data: Данные таблицы
-        set_clause: Что обновить
+        set_clause: Что обновить (значение уже приведено к типу столбца,
+            см. check_set_clause)
         where_clause: Условие для поиска записей
+        indexes: Индексы таблицы, обновляются на месте
         
     Returns:
-        list: Обновленные данные таблицы
+        tuple: (обновленные данные таблицы, список ID обновленных записей)
     """
     if not table_data or not set_clause or not where_clause:
-        return table_data
+        return table_data, []
     
     set_column, new_value = next(iter(set_clause.items()))
-    where_column, where_value = next(iter(where_clause.items()))
     
-    # Приводим к нижнему регистру для сравнения
-    where_value_str = str(where_value).lower()
-    updated_count = 0
+    positions = _indexed_positions(table_data, where_clause, indexes)
+    if positions is None:
+        positions = _match_positions(table_data, where_clause)
     
-    for record in table_data:
-        # Тоже приводим к нижнему регистру
-        record_value = str(record.get(where_column, "")).lower()
-        if record_value == where_value_str:
-            record[set_column] = new_value
-            updated_count += 1
+    for position in positions:
+        record = table_data[position]
+        if indexes:
+            index.move_record(
+                indexes, set_column, position,
+                record.get(set_column, ""), new_value
+            )
+        record[set_column] = new_value
     
-    return table_data
+    updated_ids = [table_data[position]["ID"] for position in positions]
+    return table_data, updated_ids
 
 
 @handle_db_errors
 @confirm_action("удаление записей")
-def delete(table_data, where_clause):
+def delete(table_data, where_clause, indexes=None):
     """
     Удаляет записи из таблицы.
+    
+    Индексы перестраиваются на месте, так как позиции записей сдвигаются.
     """
     if not table_data or not where_clause:
         return table_data
     
-    column, value = next(iter(where_clause.items()))
-    value_str = str(value).lower()  # Приводим к нижнему регистру для поиска
+    positions = _indexed_positions(table_data, where_clause, indexes)
+    if positions is None:
+        positions = _match_positions(table_data, where_clause)
     
-    filtered_data = [
-        record for record in table_data 
-        if str(record.get(column, "")).lower() != value_str
-    ]
+    if not positions:
+        return table_data
+    
+    filtered_data = _without_positions(table_data, set(positions))
+    
+    if indexes and len(filtered_data) < len(table_data):
+        index.rebuild_indexes(indexes, filtered_data)
     
     return filtered_data
\ No newline at end of file
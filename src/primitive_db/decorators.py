@@ -3,19 +3,65 @@
 Декораторы для обработки ошибок, логирования и подтверждения действий.
 """
 
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Iterator
 
+from . import metrics
 from .constants import (
+    CACHE_MAX_ENTRIES,
+    CACHE_MAX_ROWS,
     CANCELLATION_MESSAGE,
     CONFIRMATION_PROMPT_TEMPLATE,
     FILE_NOT_FOUND_MESSAGE,
     KEY_ERROR_MESSAGE,
-    TIME_FORMAT_TEMPLATE,
     UNEXPECTED_ERROR_MESSAGE,
     VALIDATION_ERROR_MESSAGE,
 )
 
 
+def _report_error(error):
+    """Печатает сообщение об ошибке базы данных (см. handle_db_errors)."""
+    if isinstance(error, FileNotFoundError):
+        print(FILE_NOT_FOUND_MESSAGE)
+    elif isinstance(error, KeyError):
+        print(KEY_ERROR_MESSAGE.format(error))
+    elif isinstance(error, ValueError):
+        print(VALIDATION_ERROR_MESSAGE.format(error))
+    else:
+        print(UNEXPECTED_ERROR_MESSAGE.format(error))
+
+
+class GuardedIterator:
+    """
+    Итератор результата, сообщающий об ошибке перебора так же, как
+    handle_db_errors: перебор останавливается, а failed становится True.
+    
+    iter() возвращает внутренний генератор, поэтому list() и islice
+    перебирают записи без вызова Python-метода на каждую запись.
+    """
+    
+    __slots__ = ("_records", "failed")
+    
+    def __init__(self, iterator):
+        self.failed = False
+        self._records = self._guard(iterator)
+    
+    def _guard(self, iterator):
+        try:
+            yield from iterator
+        except Exception as e:
+            self.failed = True
+            _report_error(e)
+    
+    def __iter__(self):
+        return self._records
+    
+    def __next__(self):
+        return next(self._records)
+
+
 def handle_db_errors(func):
     """
     Декоратор для обработки ошибок базы данных.
@@ -25,31 +71,45 @@ def handle_db_errors(func):
     - KeyError: таблица или столбец не найден
     - ValueError: ошибки валидации типов
     - Exception: все остальные ошибки
+    
+    Если функция возвращает ленивый итератор (select), он оборачивается
+    в GuardedIterator: ошибки при переборе перехватываются так же.
     """
     def wrapper(*args, **kwargs):
         try:
-            return func(*args, **kwargs)
-        except FileNotFoundError:
-            print(FILE_NOT_FOUND_MESSAGE)
-            return None
-        except KeyError as e:
-            print(KEY_ERROR_MESSAGE.format(e))
-            return None
-        except ValueError as e:
-            print(VALIDATION_ERROR_MESSAGE.format(e))
-            return None
+            result = func(*args, **kwargs)
         except Exception as e:
-            print(UNEXPECTED_ERROR_MESSAGE.format(e))
+            _report_error(e)
             return None
+        if isinstance(result, Iterator):
+            return GuardedIterator(result)
+        return result
     # Сохраняем имя и документацию оригинальной функции
     wrapper.__name__ = func.__name__
     wrapper.__doc__ = func.__doc__
     return wrapper
 
 
+# Запрашивать ли подтверждение (отключается в пакетном режиме)
+_confirmation = {"enabled": True}
+
+
+def set_confirmation(enabled):
+    """
+    Включает или отключает запрос подтверждения в confirm_action.
+    
+    Args:
+        enabled: False - действия выполняются без вопроса
+    """
+    _confirmation["enabled"] = enabled
+
+
 def confirm_action(action_name):
     def decorator(func):
         def wrapper(*args, **kwargs):
+            if not _confirmation["enabled"]:
+                return func(*args, **kwargs)
+            
             prompt_msg = CONFIRMATION_PROMPT_TEMPLATE.format(action_name)
             response = input(prompt_msg).strip().lower()
             
@@ -69,47 +129,118 @@ def confirm_action(action_name):
 def log_time(func):
     """
     Декоратор для измерения времени выполнения функции.
+    
+    Время записывается в гистограмму "<модуль>.<функция>" подсистемы
+    метрик (metrics.py). Пока метрики выключены, функция вызывается
+    напрямую, без замера.
     """
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+    
     def wrapper(*args, **kwargs):
-        start_time = time.monotonic()
-        result = func(*args, **kwargs)
-        end_time = time.monotonic()
-        
-        elapsed = end_time - start_time
-        print(TIME_FORMAT_TEMPLATE.format(func.__name__, elapsed))
+        if not metrics.is_enabled():
+            return func(*args, **kwargs)
         
-        return result
+        start_time = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.observe(name, time.perf_counter() - start_time)
     # Сохраняем имя и документацию
     wrapper.__name__ = func.__name__
     wrapper.__doc__ = func.__doc__
     return wrapper
 
 
-def create_cacher():
+def create_cacher(max_entries=CACHE_MAX_ENTRIES, max_rows=CACHE_MAX_ROWS):
     """
-    Фабрика функций для кэширования результатов.
+    Фабрика LRU-кэша результатов запросов с версиями таблиц.
+    
+    Ключ записи включает версию таблицы, которая увеличивается при каждом
+    изменении таблицы: устаревшие результаты становятся недостижимыми
+    и вытесняются по LRU. Объем ограничен числом записей кэша и суммарным
+    числом закэшированных строк. Операции над кэшем защищены блокировкой,
+    поэтому кэшер можно использовать из нескольких потоков (server.py).
     
+    Args:
+        max_entries: Максимальное число закэшированных результатов
+        max_rows: Максимальное суммарное число строк в кэше
+        
     Returns:
-        Функция cache_result для кэширования
+        tuple: (cache_result, bump_version, cache_stats)
     """
-    cache = {}
+    cache = OrderedDict()
+    versions = {}
+    stats = {"hits": 0, "misses": 0, "evictions": 0, "rows": 0}
+    lock = threading.Lock()
     
-    def cache_result(key, value_func):
+    def cache_result(table_name, key, value_func):
         """
         Кэширует результаты выполнения функций.
         
+        Новый результат не собирается в список заранее: записи отдаются
+        по мере перебора и одновременно копятся для кэша. Как только их
+        становится больше max_rows, накопленное отбрасывается, а остаток
+        отдается без буферизации - такой результат не кэшируется.
+        
         Args:
-            key: Ключ для кэша
-            value_func: Функция для получения значения
+            table_name: Таблица, от которой зависит результат
+            key: Ключ запроса внутри таблицы
+            value_func: Функция для получения значения (итерируемые записи
+                или None при ошибке - такой результат не кэшируется, как
+                и результат с failed=True после перебора, см.
+                GuardedIterator)
             
         Returns:
-            Результат выполнения value_func (из кэша или новый)
+            Список записей из кэша, итератор записей нового результата
+            или None
         """
-        if key in cache:
-            return cache[key]
+        with lock:
+            full_key = (table_name, versions.get(table_name, 0), key)
+            if full_key in cache:
+                stats["hits"] += 1
+                cache.move_to_end(full_key)
+                return cache[full_key]
+            stats["misses"] += 1
         
         result = value_func()
-        cache[key] = result
-        return result
+        if result is None:
+            return None
+        return _collect(full_key, result)
+    
+    def _collect(full_key, result):
+        """Отдает записи result, сохраняя их в кэш, если их не больше max_rows."""
+        iterator = iter(result)
+        rows = []
+        for record in iterator:
+            rows.append(record)
+            yield record
+            if len(rows) > max_rows:
+                # Слишком большой результат: дальше без буферизации
+                rows = None
+                yield from iterator
+                return
+        if getattr(result, "failed", False):
+            # Неполный результат после ошибки перебора не кэшируем
+            return
+        
+        with lock:
+            if full_key in cache:
+                return
+            cache[full_key] = rows
+            stats["rows"] += len(rows)
+            while len(cache) > max_entries or stats["rows"] > max_rows:
+                _, evicted = cache.popitem(last=False)
+                stats["rows"] -= len(evicted)
+                stats["evictions"] += 1
+    
+    def bump_version(table_name):
+        """Помечает все закэшированные результаты таблицы устаревшими."""
+        with lock:
+            versions[table_name] = versions.get(table_name, 0) + 1
+    
+    def cache_stats():
+        """Возвращает счетчики кэша."""
+        with lock:
+            return dict(stats, entries=len(cache))
     
-    return cache_result
\ No newline at end of file
+    return cache_result, bump_version, cache_stats
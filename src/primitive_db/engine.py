@@ -3,21 +3,34 @@
 Модуль engine - ядро приложения, отвечает за запуск и парсинг команд.
 """
 
-import shlex
+import argparse
+import json
+import select
+import sys
+from itertools import islice
 
-from prettytable import PrettyTable
-
-from . import core, parser, utils
+from . import core, metrics, parser, plans, utils
 from .constants import (
+    BULK_INSERT_FROM_KEYWORD,
+    BULK_INSERT_USAGE,
     CACHE_KEY_SEPARATOR,
+    CACHE_STATS_ARG,
+    CACHE_STATS_TEMPLATE,
+    CACHE_USAGE,
     CANCELLED_INDICATOR,
+    COLUMN_NOT_FOUND_ERROR,
     COMMAND_PROMPT,
+    COMPACT_USAGE,
+    CREATE_INDEX_USAGE,
     CREATE_TABLE_USAGE,
+    DB_DESCRIPTION,
     DB_TITLE,
+    DEFAULT_SCAN_WORKERS,
     DELETE_FROM_KEYWORD,
     DELETE_USAGE,
     DELETE_WHERE_KEYWORD,
     DROP_TABLE_USAGE,
+    EXECUTE_USAGE,
     EXIT_MESSAGE,
     GENERAL_COMMANDS_TITLE,
     HELP_TITLE,
@@ -25,37 +38,190 @@ from .constants import (
     INSERT_KEYWORD,
     INSERT_USAGE,
     INTERRUPT_MESSAGE,
+    JOIN_AGGREGATE_ERROR,
+    JOIN_KEYWORD,
+    JOIN_ON_KEYWORD,
+    JOIN_ON_SEPARATOR,
+    LIMIT_OFFSET_ERROR,
+    LOG_OP_DELETE,
+    LOG_OP_INSERT,
+    LOG_OP_INSERT_MANY,
+    LOG_OP_UPDATE,
+    METADATA_FREE_COMMANDS,
+    METADATA_WRITE_COMMANDS,
+    METRIC_ROWS_RETURNED,
+    METRICS_OPTION,
+    METRICS_OPTION_HELP,
     MIN_DELETE_ARGS,
     MIN_INSERT_ARGS,
     MIN_SELECT_ARGS,
     MIN_UPDATE_ARGS,
     NO_DATA_MESSAGE,
+    NO_PROFILE_MESSAGE,
+    NO_TRANSACTION_ERROR,
     PARSE_ERROR_MESSAGE,
+    PLAN_CACHE_STATS_TEMPLATE,
+    PREPARE_AS_KEYWORD,
+    PREPARE_COMMAND_ERROR,
+    PREPARE_USAGE,
+    PREPARED_ARGS_ERROR,
+    PREPARED_COMMANDS,
+    PREPARED_NOT_FOUND_ERROR,
+    PROFILE_OPTION,
+    PROFILE_OPTION_HELP,
+    PROFILE_SAVED_MESSAGE,
+    PROFILE_TOP_FUNCTIONS,
+    QUIET_OPTION,
+    QUIET_OPTION_HELP,
+    ROW_STORAGE,
+    ROWS_FILE_NOT_FOUND_ERROR,
+    SCRIPT_COMMENT_PREFIXES,
+    SCRIPT_NOT_FOUND_ERROR,
+    SCRIPT_OPTION,
+    SCRIPT_OPTION_HELP,
+    SELECT_ALL_COLUMNS,
+    SELECT_ASC_KEYWORD,
+    SELECT_BY_KEYWORD,
+    SELECT_COLUMN_SEPARATOR,
+    SELECT_DESC_KEYWORD,
+    SELECT_GROUP_KEYWORD,
     SELECT_KEYWORD,
+    SELECT_LIMIT_KEYWORD,
+    SELECT_OFFSET_KEYWORD,
+    SELECT_ORDER_KEYWORD,
+    SELECT_PAGE_SIZE,
     SELECT_USAGE,
+    SORTED_INDEX_ARG,
+    STATS_COLUMNS,
+    STATS_COUNTERS_TEMPLATE,
+    STATS_DISABLED_MESSAGE,
+    STATS_ENABLED_MESSAGE,
+    STATS_JSON_ARG,
+    STATS_OFF_ARG,
+    STATS_OFF_NOTE,
+    STATS_ON_ARG,
+    STATS_PROFILE_ARG,
+    STATS_RESET_ARG,
+    STATS_RESET_MESSAGE,
+    STATS_SAVED_MESSAGE,
+    STATS_USAGE,
+    STORAGE_OPTION,
+    SUCCESS_BEGIN_MESSAGE,
+    SUCCESS_COMMIT_MESSAGE,
+    SUCCESS_COMPACT_MESSAGE,
     SUCCESS_INDICATOR,
+    SUCCESS_PREPARE_MESSAGE,
+    SUCCESS_ROLLBACK_MESSAGE,
+    TABLE_NOT_FOUND_ERROR,
+    TABLE_WRITE_COMMANDS,
+    TRANSACTION_ABORTED_MESSAGE,
+    TRANSACTION_ACTIVE_ERROR,
     UNEXPECTED_ERROR_MESSAGE,
     UNKNOWN_COMMAND_MESSAGE,
+    UNSUPPORTED_ROWS_FORMAT_ERROR,
     UPDATE_SET_KEYWORD,
     UPDATE_USAGE,
     UPDATE_WHERE_KEYWORD,
+    WORKERS_OPTION,
+    WORKERS_OPTION_HELP,
 )
-from .decorators import create_cacher
+from .decorators import create_cacher, set_confirmation
+from .store import TableStore
 
 # Создаем кэшер для результатов запросов
-cache_result = create_cacher()
+cache_result, clear_table_cache, cache_stats = create_cacher()
 
 
-def clear_table_cache(table_name):
-    """Очищает кэш для конкретной таблицы."""
-    if hasattr(cache_result, '__closure__') and cache_result.__closure__:
-        cache_dict = cache_result.__closure__[0].cell_contents
-        keys_to_remove = [
-            key for key in cache_dict.keys()
-            if key.startswith(f"{table_name}{CACHE_KEY_SEPARATOR}")
-        ]
-        for key in keys_to_remove:
-            cache_dict.pop(key, None)
+def format_cache_stats(stats):
+    """Форматирует счетчики кэша запросов для вывода."""
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = stats["hits"] / lookups * 100 if lookups else 0.0
+    return CACHE_STATS_TEMPLATE.format(
+        stats["entries"], stats["rows"], stats["hits"], stats["misses"],
+        hit_rate, stats["evictions"],
+    )
+
+
+def collect_metrics():
+    """
+    Собирает метрики команд вместе со счетчиками кэша запросов.
+    
+    Returns:
+        dict: Снимок metrics.snapshot() с разделом "cache"
+    """
+    snapshot = metrics.snapshot()
+    stats = cache_stats()
+    lookups = stats["hits"] + stats["misses"]
+    snapshot["cache"] = dict(
+        stats, hit_rate=stats["hits"] / lookups if lookups else 0.0
+    )
+    return snapshot
+
+
+def format_metrics(snapshot):
+    """Форматирует метрики для вывода командой stats."""
+    lines = [] if snapshot["enabled"] else [STATS_OFF_NOTE]
+    if snapshot["commands"]:
+        from prettytable import PrettyTable
+
+        table = PrettyTable()
+        table.field_names = STATS_COLUMNS
+        for name, summary in snapshot["commands"].items():
+            table.add_row([name, summary["count"]] + [
+                f"{summary[field] * 1000:.3f}"
+                for field in ("total", "mean", "p50", "p95", "p99", "max")
+            ])
+        lines.append(str(table))
+    lines.append(STATS_COUNTERS_TEMPLATE.format(**snapshot["counters"]))
+    lines.append(format_cache_stats(snapshot["cache"]))
+    return "\n".join(lines)
+
+
+def execute_stats_command(args):
+    """
+    Выполняет команду stats: вывод, JSON-дамп, профиль и управление сбором.
+    
+    Args:
+        args: Аргументы команды
+    """
+    action = args[0].lower() if args else None
+    
+    if action is None:
+        print(format_metrics(collect_metrics()))
+    
+    elif action == STATS_JSON_ARG and len(args) <= 2:
+        dump = json.dumps(collect_metrics(), ensure_ascii=False, indent=2)
+        if len(args) == 1:
+            print(dump)
+            return
+        with open(args[1], 'w', encoding='utf-8') as f:
+            f.write(dump)
+        print(STATS_SAVED_MESSAGE.format(args[1]))
+    
+    elif action == STATS_PROFILE_ARG and len(args) <= 2:
+        stats = metrics.profile_stats(sys.stdout)
+        if stats is None:
+            print(NO_PROFILE_MESSAGE)
+        elif len(args) == 2:
+            stats.dump_stats(args[1])
+            print(PROFILE_SAVED_MESSAGE.format(args[1]))
+        else:
+            stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+    
+    elif action == STATS_ON_ARG and len(args) == 1:
+        metrics.enable()
+        print(STATS_ENABLED_MESSAGE)
+    
+    elif action == STATS_OFF_ARG and len(args) == 1:
+        metrics.enable(False)
+        print(STATS_DISABLED_MESSAGE)
+    
+    elif action == STATS_RESET_ARG and len(args) == 1:
+        metrics.reset()
+        print(STATS_RESET_MESSAGE)
+    
+    else:
+        print(f"Ошибка: Использование: {STATS_USAGE}")
 
 
 def print_help():
@@ -65,8 +231,32 @@ def print_help():
     
     # Команды управления таблицами
     print("<command> create_table <имя_таблицы> <столбец1:тип> .. - создать таблицу")
+    print(
+        "<command> create_table <имя_таблицы> <столбец1:тип> .. "
+        "--storage columnar - создать колоночную таблицу"
+    )
     print("<command> list_tables - показать список всех таблиц")
     print("<command> drop_table <имя_таблицы> - удалить таблицу")
+    print(
+        "<command> create_index <имя_таблицы> <столбец> "
+        "- создать индекс по столбцу"
+    )
+    print(
+        "<command> create_index <имя_таблицы> <столбец> sorted "
+        "- создать сортированный индекс по int-столбцу (для диапазонов)"
+    )
+    print("<command> compact <имя_таблицы> - уплотнить журнал таблицы в снимок")
+    print("<command> begin - начать транзакцию")
+    print(
+        "<command> commit - зафиксировать транзакцию "
+        "(сохранить несохраненные изменения на диск)"
+    )
+    print("<command> rollback - отменить изменения транзакции")
+    print("<command> cache stats - статистика кэша запросов")
+    print(
+        "<command> stats [json [<файл>] | profile [<файл>] | on | off | reset] "
+        "- метрики команд: задержки, строки, байты, кэш"
+    )
     
     # CRUD операции
     insert_desc = (
@@ -75,6 +265,12 @@ def print_help():
     )
     print(insert_desc)
     
+    bulk_insert_desc = (
+        "<command> bulk_insert <имя_таблицы> from <файл.csv|файл.jsonl> "
+        "- добавить записи из файла."
+    )
+    print(bulk_insert_desc)
+    
     select_desc = (
         "<command> select from <имя_таблицы> where <столбец> = <значение> "
         "- прочитать записи по условию."
@@ -82,6 +278,31 @@ def print_help():
     print(select_desc)
     
     print("<command> select from <имя_таблицы> - прочитать все записи.")
+    print(
+        "<command> select <столбец1>, <столбец2> from <имя_таблицы> ... "
+        "- прочитать только указанные столбцы."
+    )
+    print(
+        "<command> select count(*), sum(<столбец>), min(..), max(..), avg(..) "
+        "from <имя_таблицы> [where ..] [group by <столбец>] - агрегаты."
+    )
+    print(
+        "<command> ... where <условие> - условия: =, !=, <, <=, >, >=, "
+        "between A and B, in (A, B), связки and/or и скобки."
+    )
+    print(
+        "<command> select from <имя_таблицы> ... limit <N> offset <M> "
+        "- прочитать N записей, пропустив первые M."
+    )
+    print(
+        "<command> select <столбцы> from <таблица1> join <таблица2> "
+        "on <таблица1>.<столбец> = <таблица2>.<столбец> [where ..] "
+        "- соединить таблицы."
+    )
+    print(
+        "<command> select from <имя_таблицы> ... order by <столбец> [asc|desc] "
+        "limit <N> - первые N записей по значению столбца."
+    )
     
     update_desc = (
         "<command> update <имя_таблицы> set <столбец1> = <новое_значение1> "
@@ -96,6 +317,10 @@ def print_help():
     print(delete_desc)
     
     print("<command> info <имя_таблицы> - вывести информацию о таблице.")
+    print(
+        "<command> prepare <имя> as <команда с ?> - подготовить выражение; "
+        "execute <имя> (значение1, ...) - выполнить его."
+    )
     
     print(GENERAL_COMMANDS_TITLE)
     print("<command> exit - выход из программы")
@@ -116,37 +341,263 @@ def parse_command(command_str):
         return "", []
     
     try:
-        parts = shlex.split(command_str)
-        return parts[0], parts[1:]
+        parts = plans.cached(
+            command_str.strip(), lambda: tuple(parser.tokenize(command_str))
+        )
+        return parts[0], list(parts[1:])
     except ValueError as e:
         return "", [PARSE_ERROR_MESSAGE.format(e)]
 
 
+def parse_storage_option(args):
+    """
+    Отделяет опцию --storage от списка столбцов create_table.
+    
+    Args:
+        args: Аргументы после имени таблицы
+        
+    Returns:
+        tuple: (столбцы, формат хранения) или (None, None) при ошибке
+    """
+    if STORAGE_OPTION not in args:
+        return args, ROW_STORAGE
+    
+    option_pos = args.index(STORAGE_OPTION)
+    if option_pos + 1 >= len(args):
+        return None, None
+    
+    columns = args[:option_pos] + args[option_pos + 2:]
+    return columns, args[option_pos + 1].lower()
+
+
 def parse_insert_command(args):
     """Парсит команду INSERT."""
     if len(args) < MIN_INSERT_ARGS or args[0].lower() != INSERT_KEYWORD:
         return None, None
     
     table_name = args[1]
-    values_str = " ".join(args[2:])
-    values = parser.parse_values(values_str)
+    values = parser.parse_values(args[2:])
     
     return table_name, values
 
 
+def parse_count(token):
+    """
+    Разбирает значение limit/offset.
+    
+    Args:
+        token: Лексема команды
+        
+    Returns:
+        int | parser.Param: Число или параметр подготовленного выражения
+        
+    Raises:
+        ValueError: Значение не неотрицательное целое число и не параметр
+    """
+    value = parser.parse_value(token)
+    if isinstance(value, parser.Param):
+        return value
+    count = int(token)
+    if count < 0:
+        raise ValueError(token)
+    return count
+
+
+def check_limit_offset(limit, offset):
+    """
+    Проверяет limit и offset после подстановки параметров.
+    
+    Returns:
+        str: Сообщение об ошибке или None, если значения корректны
+    """
+    for value in (offset, 0 if limit is None else limit):
+        if type(value) is not int or value < 0:
+            return LIMIT_OFFSET_ERROR
+    return None
+
+
+def parse_limit_offset(args):
+    """
+    Отделяет хвост "limit N [offset M]" от аргументов SELECT.
+    
+    Вместо N и M можно указать параметр ? подготовленного выражения.
+    
+    Args:
+        args: Аргументы команды
+        
+    Returns:
+        tuple: (аргументы без хвоста, limit или None, offset)
+        
+    Raises:
+        ValueError: Некорректное значение limit/offset
+    """
+    limit = None
+    offset = 0
+    keywords = parser.keywords(args)
+    
+    if SELECT_OFFSET_KEYWORD in keywords:
+        pos = keywords.index(SELECT_OFFSET_KEYWORD)
+        offset = parse_count(args[pos + 1])
+        args = args[:pos] + args[pos + 2:]
+        keywords = keywords[:pos] + keywords[pos + 2:]
+    
+    if SELECT_LIMIT_KEYWORD in keywords:
+        pos = keywords.index(SELECT_LIMIT_KEYWORD)
+        limit = parse_count(args[pos + 1])
+        args = args[:pos] + args[pos + 2:]
+    
+    return args, limit, offset
+
+
+def parse_projection(args):
+    """
+    Разбирает список столбцов SELECT ("a, b" или "*").
+    
+    Args:
+        args: Аргументы до ключевого слова from
+        
+    Returns:
+        list: Имена столбцов или None, если выбираются все столбцы
+    """
+    columns = []
+    column = []
+    for arg in [*args, SELECT_COLUMN_SEPARATOR]:
+        if arg == SELECT_COLUMN_SEPARATOR and type(arg) is str:
+            if column:
+                columns.append("".join(column))
+            column = []
+        else:
+            # count(*) разбит на лексемы - собираем имя обратно
+            column.append(arg)
+    if not columns or columns == [SELECT_ALL_COLUMNS]:
+        return None
+    return columns
+
+
+def parse_group_by(args):
+    """
+    Отделяет "group by <столбец>" от аргументов SELECT.
+    
+    Args:
+        args: Аргументы команды без хвоста limit/offset
+        
+    Returns:
+        tuple: (аргументы без group by, столбец группировки или None)
+        
+    Raises:
+        ValueError: После group by нет ровно одного столбца
+    """
+    keywords = parser.keywords(args)
+    for pos in range(len(keywords) - 1):
+        if (keywords[pos] == SELECT_GROUP_KEYWORD and
+                keywords[pos + 1] == SELECT_BY_KEYWORD):
+            if len(args) != pos + 3:
+                raise ValueError(args[pos:])
+            return args[:pos], args[pos + 2]
+    return args, None
+
+
+def parse_order_by(args):
+    """
+    Отделяет "order by <столбец> [asc|desc]" от аргументов SELECT.
+    
+    Args:
+        args: Аргументы команды без хвоста limit/offset
+        
+    Returns:
+        tuple: (аргументы без order by, (столбец, по убыванию) или None)
+        
+    Raises:
+        ValueError: После order by нет столбца или лишние слова
+    """
+    keywords = parser.keywords(args)
+    for pos in range(len(keywords) - 1):
+        if (keywords[pos] == SELECT_ORDER_KEYWORD and
+                keywords[pos + 1] == SELECT_BY_KEYWORD):
+            end = len(args)
+            if keywords[-1] in (SELECT_ASC_KEYWORD, SELECT_DESC_KEYWORD):
+                end -= 1
+            if end <= pos + 2:
+                raise ValueError(args[pos:])
+            descending = keywords[-1] == SELECT_DESC_KEYWORD
+            # count(*) разбит на лексемы - собираем имя обратно
+            return args[:pos], ("".join(args[pos + 2:end]), descending)
+    return args, None
+
+
+def parse_join(table_name, args):
+    """
+    Разбирает "join <таблица> on <столбец1> = <столбец2>" после from.
+    
+    Args:
+        table_name: Таблица после from
+        args: Аргументы, начиная с ключевого слова join
+        
+    Returns:
+        tuple: ((таблица, таблица2, (столбец1, столбец2)) или None при
+        ошибке, оставшиеся аргументы). join.Join создается при выполнении
+        (execute_join_select), так как check изменяет его
+    """
+    keywords = parser.keywords(args)
+    if len(args) < 4 or keywords[2] != JOIN_ON_KEYWORD:
+        return None, args
+    
+    end = len(args)
+    if UPDATE_WHERE_KEYWORD in keywords:
+        end = keywords.index(UPDATE_WHERE_KEYWORD)
+    on = args[3:end]
+    if len(on) != 3 or keywords[4] != JOIN_ON_SEPARATOR:
+        return None, args
+    return (table_name, args[1], (on[0], on[2])), args[end:]
+
+
 def parse_select_command(args):
-    """Парсит команду SELECT."""
-    if len(args) < MIN_SELECT_ARGS or args[0].lower() != SELECT_KEYWORD:
-        return None, None
+    """
+    Парсит команду SELECT.
+    
+    Returns:
+        tuple: (таблица, столбцы, условие, limit, offset, group by,
+        order by, соединение из parse_join или None) или None вместо
+        таблицы
+    """
+    invalid = None, None, None, None, 0, None, None, None
+    try:
+        args, limit, offset = parse_limit_offset(args)
+        args, order_by = parse_order_by(args)
+        args, group_by = parse_group_by(args)
+    except (ValueError, IndexError):
+        return invalid
+    
+    keywords = parser.keywords(args)
+    if SELECT_KEYWORD not in keywords:
+        return invalid
+    
+    from_pos = keywords.index(SELECT_KEYWORD)
+    columns = parse_projection(args[:from_pos])
+    args = args[from_pos:]
+    if len(args) < MIN_SELECT_ARGS:
+        return invalid
     
     table_name = args[1]
+    where_clause = None
+    join = None
+    args = args[2:]
     
-    if len(args) > 3 and args[2].lower() == UPDATE_WHERE_KEYWORD:
-        where_str = " ".join(args[3:])
-        where_clause = parser.parse_where_clause(where_str)
-        return table_name, where_clause
+    if args and args[0].lower() == JOIN_KEYWORD:
+        join, args = parse_join(table_name, args)
+        if join is None:
+            return invalid
     
-    return table_name, None
+    if args and args[0].lower() == UPDATE_WHERE_KEYWORD:
+        # Некорректное условие - ошибка, а не выборка без фильтра
+        where_clause = parser.parse_where_clause(args[1:])
+        if where_clause is None:
+            return invalid
+    
+    return (
+        table_name, columns, where_clause, limit, offset, group_by, order_by,
+        join,
+    )
 
 
 def parse_update_command(args):
@@ -155,29 +606,29 @@ def parse_update_command(args):
         return None, None, None
     
     table_name = args[0]
-    set_str = ""
-    where_str = ""
+    set_tokens = []
+    where_tokens = []
     found_set = False
     found_where = False
     
-    for i, arg in enumerate(args[1:], 1):
-        if arg.lower() == UPDATE_SET_KEYWORD and not found_set:
+    for arg, keyword in zip(args[1:], parser.keywords(args[1:])):
+        if keyword == UPDATE_SET_KEYWORD and not found_set:
             found_set = True
             continue
-        elif arg.lower() == UPDATE_WHERE_KEYWORD and found_set:
+        elif keyword == UPDATE_WHERE_KEYWORD and found_set:
             found_where = True
             continue
         
         if found_set and not found_where:
-            set_str += f" {arg}"
+            set_tokens.append(arg)
         elif found_where:
-            where_str += f" {arg}"
+            where_tokens.append(arg)
     
     if not found_set:
         return None, None, None
     
-    set_clause = parser.parse_set_clause(set_str.strip())
-    where_clause = parser.parse_where_clause(where_str.strip())
+    set_clause = parser.parse_set_clause(set_tokens)
+    where_clause = parser.parse_where_clause(where_tokens)
     
     return table_name, set_clause, where_clause
 
@@ -190,191 +641,840 @@ def parse_delete_command(args):
         return None, None
     
     table_name = args[1]
-    where_str = " ".join(args[3:])
-    where_clause = parser.parse_where_clause(where_str)
+    where_clause = parser.parse_where_clause(args[3:])
     
     return table_name, where_clause
 
 
-def print_table_as_prettytable(table_data):
-    """Выводит данные в виде PrettyTable."""
-    if not table_data:
+# Разбор аргументов команд, для которых строится план
+PLAN_PARSERS = {
+    "insert": parse_insert_command,
+    "select": parse_select_command,
+    "update": parse_update_command,
+    "delete": parse_delete_command,
+}
+
+
+def command_plan(command, args, params=()):
+    """
+    Разбирает аргументы команды через кэш планов.
+    
+    Args:
+        command: Имя команды из PLAN_PARSERS
+        args: Аргументы команды
+        params: Значения параметров подготовленного выражения
+        
+    Returns:
+        tuple: Результат parse_<команда>_command (свежая копия)
+    """
+    # Строка в кавычках и такое же слово без кавычек дают разные планы
+    key = (command, *(arg if type(arg) is str else (arg,) for arg in args))
+    template = plans.cached(key, lambda: PLAN_PARSERS[command](args))
+    return plans.bind(template, params)
+
+
+def resolve_prepared(command, args):
+    """
+    Заменяет execute на команду подготовленного выражения.
+    
+    Args:
+        command: Имя команды
+        args: Аргументы команды
+        
+    Returns:
+        tuple: (команда, аргументы, значения параметров); для других
+        команд и некорректного execute - (command, args, ())
+    """
+    if command != "execute" or not args:
+        return command, args, ()
+    
+    statement = plans.get_prepared(args[0])
+    if statement is None:
+        return command, args, ()
+    # Значение вида ?N в execute - обычный текст, а не параметр
+    params = plans.bind(parser.parse_values(args[1:]))
+    if len(params) != statement.param_count:
+        return command, args, ()
+    return statement.command, statement.args, tuple(params)
+
+
+def execute_prepare_command(args):
+    """Выполняет prepare <имя> as <команда>."""
+    if len(args) < 3 or args[1].lower() != PREPARE_AS_KEYWORD:
+        print(f"Ошибка: Использование: {PREPARE_USAGE}")
+        return
+    
+    name, command, command_args = args[0], args[2], args[3:]
+    if command not in PREPARED_COMMANDS:
+        print(PREPARE_COMMAND_ERROR)
+        return
+    
+    statement = plans.PreparedStatement(
+        command, *plans.number_params(command_args)
+    )
+    if command_plan(command, statement.args)[0] is None:
+        print(f"Ошибка: Использование: {PREPARE_USAGE}")
+        return
+    plans.prepare(name, statement)
+    print(SUCCESS_PREPARE_MESSAGE.format(name, statement.param_count))
+
+
+def print_execute_error(args):
+    """Сообщает, почему execute не выполнен (см. resolve_prepared)."""
+    if not args:
+        print(f"Ошибка: Использование: {EXECUTE_USAGE}")
+        return
+    
+    statement = plans.get_prepared(args[0])
+    if statement is None:
+        print(PREPARED_NOT_FOUND_ERROR.format(args[0]))
+        return
+    params = parser.parse_values(args[1:])
+    print(PREPARED_ARGS_ERROR.format(
+        args[0], statement.param_count, len(params)
+    ))
+
+
+def command_table(command, args):
+    """
+    Определяет таблицу, с которой работает команда.
+
+    Args:
+        command: Имя команды
+        args: Аргументы команды
+
+    Returns:
+        str: Имя таблицы или None
+    """
+    if command == "prepare":
+        return None
+    keywords = parser.keywords(args)
+    if command == "insert" and keywords[:1] == [INSERT_KEYWORD]:
+        return args[1] if len(args) > 1 else None
+    if command == "delete" and keywords[:1] == [DELETE_FROM_KEYWORD]:
+        return args[1] if len(args) > 1 else None
+    if command == "select" and SELECT_KEYWORD in keywords:
+        pos = keywords.index(SELECT_KEYWORD) + 1
+        return args[pos] if pos < len(args) else None
+    return args[0] if args else None
+
+
+def command_tables(command, args):
+    """
+    Определяет все таблицы, с которыми работает команда.
+    
+    Returns:
+        list: Имена таблиц по алфавиту (для select с join - обе таблицы)
+    """
+    table_name = command_table(command, args)
+    if table_name is None:
+        return []
+    
+    tables = {table_name}
+    keywords = parser.keywords(args)
+    if command == "select" and JOIN_KEYWORD in keywords:
+        pos = keywords.index(JOIN_KEYWORD) + 1
+        if pos < len(args):
+            tables.add(args[pos])
+    return sorted(tables)
+
+
+def lock_for_command(store, command, args):
+    """
+    Захватывает блокировки записи, нужные команде, до ее выполнения.
+    
+    Блокировка берется до чтения таблицы, поэтому команда видит
+    последние изменения других процессов.
+    
+    Raises:
+        TimeoutError: Таблица заблокирована другим процессом
+    """
+    if command not in TABLE_WRITE_COMMANDS:
+        return
+    store.lock_for_write(
+        command_table(command, args),
+        metadata=command in METADATA_WRITE_COMMANDS,
+    )
+
+
+def compile_where(metadata, table_name, where_clause):
+    """Компилирует условие WHERE под типы столбцов таблицы."""
+    if where_clause is not None and table_name in metadata:
+        where_clause.compile(core.table_columns(metadata, table_name))
+    return where_clause
+
+
+def execute_join_select(store, join, columns, where_clause, limit, offset,
+                        order_by):
+    """
+    Выполняет select по соединению двух таблиц и печатает результат.
+    
+    Результаты соединений не кэшируются: кэш запросов привязан
+    к одной таблице.
+    
+    Args:
+        join: Соединение из parse_join (таблица, таблица2, столбцы on)
+    """
+    from .join import Join
+    
+    join = Join(*join)
+    error = join.check(store.metadata, columns, where_clause, order_by)
+    if error:
+        print(error)
+        return
+    
+    tables = {table: store.get_table(table) for table in join.tables}
+    descending = order_by is not None and order_by[1]
+    result = core.join_select(join, tables, limit, offset, descending)
+    if result is not None:
+        print_table_as_prettytable(result)
+
+
+def print_table_as_prettytable(records, page_size=SELECT_PAGE_SIZE):
+    """
+    Выводит записи в виде PrettyTable постранично.
+    
+    Записи читаются из итератора страницами по page_size, каждая страница
+    печатается сразу, поэтому в памяти держится не больше одной страницы.
+    """
+    iterator = iter(records)
+    page = list(islice(iterator, page_size))
+    if not page:
         print(NO_DATA_MESSAGE)
         return
     
-    table = PrettyTable()
-    table.field_names = list(table_data[0].keys())
+    # prettytable импортируется при первом выводе таблицы, а не при
+    # запуске: скрипты и сервер без select не тратят на него время
+    from prettytable import PrettyTable
+    
+    field_names = list(page[0].keys())
+    returned = 0
+    while page:
+        table = PrettyTable()
+        table.field_names = field_names
+        for record in page:
+            table.add_row([record[col] for col in field_names])
+        print(table, flush=True)
+        returned += len(page)
+        page = list(islice(iterator, page_size))
+    metrics.add(METRIC_ROWS_RETURNED, returned)
+
+
+def execute_command(store, command, args, interactive=True, params=()):
+    """
+    Выполняет одну разобранную команду.
+    
+    execute заменяется командой подготовленного выражения. При включенных
+    метриках время команды записывается в ее гистограмму (и команда
+    профилируется, если включено профилирование).
+    
+    Args:
+        store: Хранилище таблиц TableStore
+        command: Имя команды
+        args: Аргументы команды
+        interactive: Команда введена в консоли (при ошибке в имени команды
+            выводится справка)
+        params: Значения параметров подготовленного выражения
+        
+    Returns:
+        bool: False, если команда завершает работу, иначе True
+    """
+    if command == "execute":
+        command, args, params = resolve_prepared(command, args)
+    if command and metrics.is_enabled():
+        return metrics.run_command(
+            command, _execute_command, store, command, args, interactive,
+            params,
+        )
+    return _execute_command(store, command, args, interactive, params)
+
+
+def _execute_command(store, command, args, interactive, params=()):
+    """Выполняет команду (см. execute_command)."""
+    try:
+        lock_for_command(store, command, args)
+    except TimeoutError as e:
+        print(e)
+        return True
+    
+    if command in METADATA_FREE_COMMANDS:
+        metadata = None
+    else:
+        metadata = store.metadata
+    
+    if command == "exit":
+        return False
+
+    elif command == "cache":
+        if args != [CACHE_STATS_ARG]:
+            print(f"Ошибка: Использование: {CACHE_USAGE}")
+            return True
+
+        print(format_cache_stats(cache_stats()))
+        print(PLAN_CACHE_STATS_TEMPLATE.format(**plans.stats()))
+
+    elif command == "begin":
+        if store.in_transaction:
+            print(TRANSACTION_ACTIVE_ERROR)
+            return True
+        
+        store.begin()
+        print(SUCCESS_BEGIN_MESSAGE)
+
+    elif command == "commit":
+        store.commit()
+        print(SUCCESS_COMMIT_MESSAGE)
+
+    elif command == "rollback":
+        if not store.in_transaction:
+            print(NO_TRANSACTION_ERROR)
+            return True
+        
+        rollback_transaction(store)
+        print(SUCCESS_ROLLBACK_MESSAGE)
+
+    elif command == "help":
+        print_help()
+
+    elif command == "stats":
+        execute_stats_command(args)
+
+    elif command == "prepare":
+        execute_prepare_command(args)
+
+    elif command == "execute":
+        print_execute_error(args)
+
+    # Управление таблицами
+    elif command == "create_table":
+        if len(args) < 2:
+            msg = f"Ошибка: Использование: {CREATE_TABLE_USAGE}"
+            print(msg)
+            return True
+
+        columns, storage = parse_storage_option(args[1:])
+        if columns is None:
+            msg = f"Ошибка: Использование: {CREATE_TABLE_USAGE}"
+            print(msg)
+            return True
+
+        metadata, message = core.create_table(
+            metadata, args[0], columns, storage
+        )
+        print(message)
+
+        if SUCCESS_INDICATOR in message.lower():
+            store.set_metadata(metadata)
+            store.replace_table(
+                args[0], core.empty_table_data(metadata, args[0]), {}
+            )
+
+    elif command == "drop_table":
+        if len(args) != 1:
+            print(f"Ошибка: Использование: {DROP_TABLE_USAGE}")
+            return True
+
+        result = core.drop_table(metadata, args[0])
+
+        if isinstance(result, tuple) and len(result) == 2:
+            metadata, message = result
+
+            # Выводим сообщение только если не "Операция отменена."
+            if CANCELLED_INDICATOR not in message.lower():
+                print(message)
+
+            if SUCCESS_INDICATOR in message.lower():
+                store.set_metadata(metadata)
+                store.evict(args[0])
+                clear_table_cache(args[0])
+
+    elif command == "list_tables":
+        print(core.list_tables(metadata))
+
+    elif command == "create_index":
+        sorted_index = (
+            len(args) == 3 and args[2].lower() == SORTED_INDEX_ARG
+        )
+        if len(args) != 2 and not sorted_index:
+            print(f"Ошибка: Использование: {CREATE_INDEX_USAGE}")
+            return True
+
+        table_name, column = args[:2]
+        table_data, indexes = store.get_table(table_name)
+        result = core.create_index(
+            metadata, table_name, column, table_data, indexes,
+            sorted_index
+        )
+        if result is None:
+            return True
+        indexes, message = result
+        print(message)
+
+        if SUCCESS_INDICATOR in message.lower():
+            store.replace_table(table_name, table_data, indexes)
+
+    elif command == "compact":
+        if len(args) != 1:
+            print(f"Ошибка: Использование: {COMPACT_USAGE}")
+            return True
+
+        table_name = args[0]
+        if table_name not in metadata:
+            print(TABLE_NOT_FOUND_ERROR.format(table_name))
+            return True
+        
+        if store.in_transaction:
+            print(TRANSACTION_ACTIVE_ERROR)
+            return True
+
+        table_data, indexes = store.get_table(table_name)
+        store.replace_table(table_name, table_data, indexes)
+        store.flush()
+        print(SUCCESS_COMPACT_MESSAGE.format(table_name))
+
+    # CRUD операции
+    elif command == "insert":
+        table_name, values = command_plan(command, args, params)
+
+        if table_name is None:
+            msg = f"Ошибка: Использование: {INSERT_USAGE}"
+            print(msg)
+            return True
+
+        table_data, indexes = store.get_table(table_name)
+        table_data, message = core.insert(
+            metadata, table_name, values, table_data, indexes
+        )
+
+        print(message)
+        if SUCCESS_INDICATOR in message.lower():
+            # Счетчик ID в метаданных сдвинулся
+            store.set_metadata(metadata)
+            store.log(
+                table_name,
+                [{"op": LOG_OP_INSERT, "record": dict(table_data[-1])}],
+            )
+            clear_table_cache(table_name)
+
+    elif command == "bulk_insert":
+        if (len(args) != 3 or
+                args[1].lower() != BULK_INSERT_FROM_KEYWORD):
+            print(f"Ошибка: Использование: {BULK_INSERT_USAGE}")
+            return True
+
+        table_name, filepath = args[0], args[2]
+        if table_name not in metadata:
+            print(TABLE_NOT_FOUND_ERROR.format(table_name))
+            return True
+
+        column_names = [
+            spec.split(':')[0]
+            for spec in core.table_columns(metadata, table_name)[1:]
+        ]
+        try:
+            rows = utils.load_rows_file(filepath, column_names)
+        except FileNotFoundError:
+            print(ROWS_FILE_NOT_FOUND_ERROR.format(filepath))
+            return True
+        except ValueError:
+            print(UNSUPPORTED_ROWS_FORMAT_ERROR.format(filepath))
+            return True
+
+        table_data, indexes = store.get_table(table_name)
+        start_position = len(table_data)
+        table_data, message = core.insert_many(
+            metadata, table_name, rows, table_data, indexes
+        )
+
+        print(message)
+        if SUCCESS_INDICATOR in message.lower():
+            store.set_metadata(metadata)
+            store.log(table_name, [{
+                "op": LOG_OP_INSERT_MANY,
+                "records": table_data[start_position:],
+            }])
+            clear_table_cache(table_name)
+
+    elif command == "select":
+        (table_name, columns, where_clause, limit, offset, group_by,
+         order_by, join) = command_plan(command, args, params)
+
+        if table_name is None:
+            msg = f"Ошибка: Использование: {SELECT_USAGE}"
+            print(msg)
+            return True
+
+        error = check_limit_offset(limit, offset)
+        if error:
+            print(error)
+            return True
+
+        from . import aggregates
+
+        items = [
+            aggregates.parse_aggregate(column) or column
+            for column in columns or []
+        ]
+        is_aggregate = group_by is not None or any(
+            isinstance(item, aggregates.Aggregate) for item in items
+        )
+        if join is not None:
+            if is_aggregate:
+                print(JOIN_AGGREGATE_ERROR)
+                return True
+            execute_join_select(
+                store, join, columns, where_clause, limit, offset, order_by
+            )
+            return True
+
+        if is_aggregate:
+            if table_name not in metadata:
+                print(TABLE_NOT_FOUND_ERROR.format(table_name))
+                return True
+            
+            error = core.check_aggregate_query(
+                metadata, table_name, items, group_by, order_by
+            )
+            if error:
+                print(error)
+                return True
+            
+            compile_where(metadata, table_name, where_clause)
+            table_data, indexes = store.get_table(table_name)
+            stop = None if limit is None else offset + limit
+            result = core.aggregate(
+                table_data, items, where_clause, indexes, group_by,
+                order_by, stop,
+            )
+            if result is not None:
+                print_table_as_prettytable(islice(result, offset, stop))
+            return True
+
+        selected = list(columns or [])
+        if order_by is not None:
+            selected.append(order_by[0])
+        if selected and table_name in metadata:
+            missing = core.missing_column(metadata, table_name, selected)
+            if missing is not None:
+                print(COLUMN_NOT_FOUND_ERROR.format(missing, table_name))
+                return True
+
+        compile_where(metadata, table_name, where_clause)
+
+        # Запросы без условия НЕ кэшируем
+        if where_clause is None:
+            table_data, indexes = store.get_table(table_name)
+            filtered_data = core.select(
+                table_data, where_clause, indexes, limit, offset, columns,
+                order_by,
+            )
+        else:
+            # Кэшируем только запросы с условиями
+            cache_key = CACHE_KEY_SEPARATOR.join(
+                str(part) for part in (
+                    where_clause, columns, limit, offset, order_by
+                )
+            )
+
+            # Кэш устаревает, если таблицу изменил другой процесс
+            store.refresh(table_name)
+
+            def execute_select():
+                table_data, indexes = store.get_table(table_name)
+                return core.select(
+                    table_data, where_clause, indexes, limit, offset, columns,
+                    order_by,
+                )
+
+            filtered_data = cache_result(
+                table_name, cache_key, execute_select
+            )
+
+        if filtered_data is not None:
+            print_table_as_prettytable(filtered_data)
+
+    elif command == "update":
+        table_name, set_clause, where_clause = command_plan(
+            command, args, params
+        )
+
+        if table_name is None or not set_clause or not where_clause:
+            msg = f"Ошибка: Использование: {UPDATE_USAGE}"
+            print(msg)
+            return True
+
+        error = core.check_set_clause(metadata, table_name, set_clause)
+        if error:
+            print(error)
+            return True
+
+        compile_where(metadata, table_name, where_clause)
+        table_data, indexes = store.get_table(table_name)
+        result = core.update(
+            table_data, set_clause, where_clause, indexes
+        )
+        if result is None:
+            return True
+        _, updated_ids = result
+
+        if updated_ids:
+            store.log(table_name, [{
+                "op": LOG_OP_UPDATE,
+                "ids": updated_ids,
+                "set": set_clause,
+            }])
+        clear_table_cache(table_name)
+        success_msg = (
+            f'Запись в таблице "{table_name}" '
+            f'успешно обновлена.'
+        )
+        print(success_msg)
+
+    elif command == "delete":
+        table_name, where_clause = command_plan(command, args, params)
+
+        if table_name is None or not where_clause:
+            msg = f"Ошибка: Использование: {DELETE_USAGE}"
+            print(msg)
+            return True
+
+        compile_where(metadata, table_name, where_clause)
+        table_data, indexes = store.get_table(table_name)
+        result = core.delete(table_data, where_clause, indexes)
+
+        if len(result) < len(table_data):
+            remaining_ids = {record["ID"] for record in result}
+            deleted_ids = [
+                record["ID"] for record in table_data
+                if record["ID"] not in remaining_ids
+            ]
+            store.set_table(table_name, result)
+            store.log(
+                table_name,
+                [{"op": LOG_OP_DELETE, "ids": deleted_ids}],
+            )
+            clear_table_cache(table_name)
+
+            success_msg = (
+                f'Запись успешно удалена '
+                f'из таблицы "{table_name}".'
+            )
+            print(success_msg)
+
+    elif command == "info":
+        if len(args) != 1:
+            print(f"Ошибка: Использование: {INFO_USAGE}")
+            return True
+
+        table_name = args[0]
+        table_data, _ = store.get_table(table_name)
+        info = core.info_table(metadata, table_name, table_data)
+        print(info)
+
+    elif command == "":
+        return True
+
+    else:
+        print(UNKNOWN_COMMAND_MESSAGE.format(command))
+        if interactive:
+            print_help()
+    
+    return True
+
+
+def rollback_transaction(store):
+    """Отменяет транзакцию и сбрасывает кэш запросов затронутых таблиц."""
+    table_names = set(store.metadata)
+    store.rollback()
+    table_names.update(store.metadata)
+    for table_name in table_names:
+        clear_table_cache(table_name)
+
+
+def close_store(store):
+    """
+    Сохраняет изменения при завершении работы.
+    
+    Незавершенная транзакция при выходе отменяется.
+    """
+    if store.in_transaction:
+        store.rollback()
+        print(TRANSACTION_ABORTED_MESSAGE)
+    else:
+        store.flush()
+
+
+def parse_args(argv=None):
+    """
+    Разбирает аргументы командной строки.
+    
+    Args:
+        argv: Аргументы (по умолчанию sys.argv[1:])
+        
+    Returns:
+        argparse.Namespace: Разобранные аргументы
+    """
+    arg_parser = argparse.ArgumentParser(description=DB_DESCRIPTION)
+    arg_parser.add_argument(
+        SCRIPT_OPTION, metavar="FILE", help=SCRIPT_OPTION_HELP
+    )
+    arg_parser.add_argument(
+        WORKERS_OPTION, metavar="N", type=int, default=DEFAULT_SCAN_WORKERS,
+        help=WORKERS_OPTION_HELP,
+    )
+    arg_parser.add_argument(
+        METRICS_OPTION, action="store_true", help=METRICS_OPTION_HELP
+    )
+    arg_parser.add_argument(
+        PROFILE_OPTION, action="store_true", help=PROFILE_OPTION_HELP
+    )
+    arg_parser.add_argument(
+        QUIET_OPTION, action="store_true", help=QUIET_OPTION_HELP
+    )
+    return arg_parser.parse_args(argv)
+
+
+def iter_script_commands(lines):
+    """
+    Перебирает команды скрипта, пропуская пустые строки и комментарии.
+    
+    Завершающая точка с запятой отбрасывается.
+    
+    Args:
+        lines: Строки скрипта
+        
+    Returns:
+        iterator: Строки команд
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(SCRIPT_COMMENT_PREFIXES):
+            continue
+        yield line.rstrip(';').strip()
+
+
+def run_script(lines):
+    """
+    Выполняет команды пакетно, без приглашения, справки и подтверждений.
+    
+    Метаданные и таблицы загружаются один раз, промежуточные сбросы
+    отключены: все изменения пакета записываются на диск одним сбросом
+    в конце (или по команде commit).
+    
+    Args:
+        lines: Строки скрипта (файл или sys.stdin)
+    """
+    store = TableStore(flush_interval=None, on_refresh=clear_table_cache)
+    set_confirmation(False)
+    try:
+        for user_input in iter_script_commands(lines):
+            try:
+                command, args = parse_command(user_input)
+                if not execute_command(store, command, args, interactive=False):
+                    break
+                store.maybe_flush()
+            except Exception as e:
+                print(UNEXPECTED_ERROR_MESSAGE.format(e))
+    finally:
+        set_confirmation(True)
+        close_store(store)
+
+
+def read_command(store):
+    """
+    Читает команду из консоли.
     
-    for record in table_data:
-        table.add_row([record[col] for col in table.field_names])
+    Пока пользователь не ввел команду, несохраненные изменения
+    сбрасываются на диск по интервалу: иначе простаивающая консоль
+    держала бы блокировки записи и мешала другим процессам.
     
-    print(table)
+    Args:
+        store: Хранилище таблиц TableStore
+        
+    Returns:
+        str: Введенная строка
+    """
+    print(COMMAND_PROMPT, end="", flush=True)
+    while store.dirty and not store.in_transaction and store.flush_interval:
+        try:
+            ready, _, _ = select.select([sys.stdin], [], [], store.flush_interval)
+        except (OSError, ValueError):
+            break
+        if ready:
+            break
+        store.flush()
+    return input()
 
 
-def run():
-    """Главная функция запуска приложения."""
-    print(DB_TITLE)
-    print_help()
+def run_interactive(quiet=False):
+    """
+    Запускает интерактивный режим с приглашением для ввода команд.
+    
+    Args:
+        quiet: Не выводить заголовок и справку при запуске
+    """
+    if not quiet:
+        print(DB_TITLE)
+        print_help()
+    store = TableStore(on_refresh=clear_table_cache)
     
     while True:
         try:
-            user_input = input(COMMAND_PROMPT).strip()
+            user_input = read_command(store).strip()
             command, args = parse_command(user_input)
-            metadata = utils.load_metadata()
             
-            if command == "exit":
+            if not execute_command(store, command, args):
+                close_store(store)
                 print(EXIT_MESSAGE)
                 break
+            
+            store.maybe_flush()
                 
-            elif command == "help":
-                print_help()
-                
-            # Управление таблицами
-            elif command == "create_table":
-                if len(args) < 2:
-                    msg = f"Ошибка: Использование: {CREATE_TABLE_USAGE}"
-                    print(msg)
-                    continue
-                
-                metadata, message = core.create_table(
-                    metadata, args[0], args[1:]
-                )
-                print(message)
-                
-                if SUCCESS_INDICATOR in message.lower():
-                    utils.save_metadata(metadata)
-                    utils.save_table_data(args[0], [])
-                    
-            elif command == "drop_table":
-                if len(args) != 1:
-                    print(f"Ошибка: Использование: {DROP_TABLE_USAGE}")
-                    continue
-
-                result = core.drop_table(metadata, args[0])
-
-                if isinstance(result, tuple) and len(result) == 2:
-                    metadata, message = result
-
-                    # Выводим сообщение только если не "Операция отменена."
-                    if CANCELLED_INDICATOR not in message.lower():
-                        print(message)
-                    
-                    if SUCCESS_INDICATOR in message.lower():
-                        utils.save_metadata(metadata)
-                        clear_table_cache(args[0])
-                    
-            elif command == "list_tables":
-                print(core.list_tables(metadata))
-                
-            # CRUD операции
-            elif command == "insert":
-                table_name, values = parse_insert_command(args)
-                
-                if table_name is None:
-                    msg = f"Ошибка: Использование: {INSERT_USAGE}"
-                    print(msg)
-                    continue
-                
-                table_data = utils.load_table_data(table_name)
-                table_data, message = core.insert(
-                    metadata, table_name, values, table_data
-                )
-                
-                print(message)
-                if SUCCESS_INDICATOR in message.lower():
-                    utils.save_table_data(table_name, table_data)
-                    clear_table_cache(table_name)
-                
-            elif command == "select":
-                table_name, where_clause = parse_select_command(args)
-                
-                if table_name is None:
-                    msg = f"Ошибка: Использование: {SELECT_USAGE}"
-                    print(msg)
-                    continue
-                
-                # Запросы без условия НЕ кэшируем
-                if where_clause is None:
-                    table_data = utils.load_table_data(table_name)
-                    filtered_data = core.select(table_data, where_clause)
-                else:
-                    # Кэшируем только запросы с условиями
-                    cache_key = f"{table_name}{CACHE_KEY_SEPARATOR}{str(where_clause)}"
-                    
-                    def execute_select():
-                        table_data = utils.load_table_data(table_name)
-                        return core.select(table_data, where_clause)
-                    
-                    filtered_data = cache_result(cache_key, execute_select)
-                
-                print_table_as_prettytable(filtered_data)
-                
-            elif command == "update":
-                table_name, set_clause, where_clause = parse_update_command(args)
-                
-                if table_name is None or not set_clause or not where_clause:
-                    msg = f"Ошибка: Использование: {UPDATE_USAGE}"
-                    print(msg)
-                    continue
-                
-                table_data = utils.load_table_data(table_name)
-                updated_data = core.update(
-                    table_data, set_clause, where_clause
-                )
-
-                utils.save_table_data(table_name, updated_data)
-                clear_table_cache(table_name)
-                success_msg = (
-                    f'Запись в таблице "{table_name}" '
-                    f'успешно обновлена.'
-                )
-                print(success_msg)
-                
-            elif command == "delete":
-                table_name, where_clause = parse_delete_command(args)
-                
-                if table_name is None or not where_clause:
-                    msg = f"Ошибка: Использование: {DELETE_USAGE}"
-                    print(msg)
-                    continue
-                
-                table_data = utils.load_table_data(table_name)
-                result = core.delete(table_data, where_clause)
-                
-                utils.save_table_data(table_name, result)
-                clear_table_cache(table_name)
-
-                if len(result) < len(table_data):
-                    success_msg = (
-                        f'Запись успешно удалена '
-                        f'из таблицы "{table_name}".'
-                    )
-                    print(success_msg)
-                
-            elif command == "info":
-                if len(args) != 1:
-                    print(f"Ошибка: Использование: {INFO_USAGE}")
-                    continue
-                
-                table_name = args[0]
-                table_data = utils.load_table_data(table_name)
-                info = core.info_table(metadata, table_name, table_data)
-                print(info)
-                
-            elif command == "":
-                continue
-                
-            else:
-                print(UNKNOWN_COMMAND_MESSAGE.format(command))
-                print_help()
-                
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
+            close_store(store)
             print(INTERRUPT_MESSAGE)
             break
         except Exception as e:
             print(UNEXPECTED_ERROR_MESSAGE.format(e))
 
 
+def run(argv=None):
+    """
+    Главная функция запуска приложения.
+    
+    С опцией --script команды читаются из файла, а если стандартный ввод
+    перенаправлен (не терминал) - из него; в обоих случаях они выполняются
+    пакетно. Иначе запускается интерактивный режим (с --quiet - без
+    заголовка и справки). Опция --workers включает параллельное
+    сканирование больших таблиц, --metrics и --profile - сбор метрик
+    и профилирование команд.
+    
+    Args:
+        argv: Аргументы командной строки (по умолчанию sys.argv[1:])
+    """
+    options = parse_args(argv)
+    if options.workers > DEFAULT_SCAN_WORKERS:
+        from . import parallel
+        
+        parallel.set_workers(options.workers)
+    metrics.enable(options.metrics)
+    metrics.set_profiling(options.profile)
+    
+    if options.script:
+        try:
+            with open(options.script, 'r', encoding='utf-8') as f:
+                run_script(f)
+        except FileNotFoundError:
+            print(SCRIPT_NOT_FOUND_ERROR.format(options.script))
+        return
+    
+    if not sys.stdin.isatty():
+        run_script(sys.stdin)
+        return
+    
+    run_interactive(options.quiet)
+
+
 def main():
     """Основная функция запуска приложения."""
     run()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Индексы по столбцам таблиц.
+
+Хеш-индекс хранится как словарь {ключ_значения: [позиции_записей]}, где
+ключ - нормализованное строковое представление значения (так же, как
+значения сравниваются при полном сканировании в core.py).
+
+Сортированный индекс (только для int-столбцов) хранится как список
+[значения, позиции]: пары упорядочены по значению, а при равных
+значениях - по позиции записи. Поиск по диапазону выполняется через
+bisect.
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+def index_key(value):
+    """
+    Нормализует значение в ключ индекса.
+
+    Args:
+        value: Значение столбца или условия WHERE
+
+    Returns:
+        str: Ключ индекса
+    """
+    return str(value).lower()
+
+
+def is_sorted_index(column_index):
+    """Проверяет, является ли индекс сортированным."""
+    return isinstance(column_index, list)
+
+
+def build_index(table_data, column):
+    """
+    Строит хеш-индекс по столбцу.
+
+    Args:
+        table_data: Данные таблицы
+        column: Имя столбца
+
+    Returns:
+        dict: {ключ: [позиции записей]}
+    """
+    column_index = {}
+    for position, record in enumerate(table_data):
+        key = index_key(record.get(column, ""))
+        column_index.setdefault(key, []).append(position)
+    return column_index
+
+
+def build_sorted_index(table_data, column):
+    """
+    Строит сортированный индекс по int-столбцу.
+
+    Args:
+        table_data: Данные таблицы
+        column: Имя столбца
+
+    Returns:
+        list: [значения по возрастанию, позиции в том же порядке]
+    """
+    pairs = sorted(
+        (record.get(column), position)
+        for position, record in enumerate(table_data)
+    )
+    return [[value for value, _ in pairs], [position for _, position in pairs]]
+
+
+def rebuild_indexes(indexes, table_data):
+    """
+    Перестраивает все индексы таблицы на месте (после сдвига позиций).
+
+    Args:
+        indexes: Индексы таблицы {столбец: индекс}
+        table_data: Актуальные данные таблицы
+    """
+    for column, column_index in indexes.items():
+        if is_sorted_index(column_index):
+            indexes[column] = build_sorted_index(table_data, column)
+        else:
+            indexes[column] = build_index(table_data, column)
+
+
+def _sorted_insert(column_index, value, position):
+    """Вставляет пару (значение, позиция) в сортированный индекс."""
+    values, positions = column_index
+    # Среди равных значений позиции остаются по возрастанию
+    at = bisect_right(
+        positions, position,
+        bisect_left(values, value), bisect_right(values, value),
+    )
+    values.insert(at, value)
+    positions.insert(at, position)
+
+
+def _sorted_remove(column_index, value, position):
+    """Удаляет пару (значение, позиция) из сортированного индекса."""
+    values, positions = column_index
+    for at in range(bisect_left(values, value), bisect_right(values, value)):
+        if positions[at] == position:
+            del values[at]
+            del positions[at]
+            return
+
+
+def add_record(indexes, record, position):
+    """
+    Добавляет запись во все индексы таблицы.
+
+    Args:
+        indexes: Индексы таблицы {столбец: индекс}
+        record: Добавленная запись
+        position: Позиция записи в данных таблицы
+    """
+    for column, column_index in indexes.items():
+        if is_sorted_index(column_index):
+            _sorted_insert(column_index, record.get(column), position)
+            continue
+        key = index_key(record.get(column, ""))
+        column_index.setdefault(key, []).append(position)
+
+
+def move_record(indexes, column, position, old_value, new_value):
+    """
+    Переносит позицию записи между ключами индекса при изменении значения.
+
+    Args:
+        indexes: Индексы таблицы {столбец: индекс}
+        column: Измененный столбец
+        position: Позиция записи
+        old_value: Прежнее значение
+        new_value: Новое значение
+    """
+    if column not in indexes:
+        return
+
+    column_index = indexes[column]
+    if is_sorted_index(column_index):
+        if old_value != new_value:
+            _sorted_remove(column_index, old_value, position)
+            _sorted_insert(column_index, new_value, position)
+        return
+
+    old_key = index_key(old_value)
+    new_key = index_key(new_value)
+    if old_key == new_key:
+        return
+
+    positions = column_index.get(old_key, [])
+    if position in positions:
+        positions.remove(position)
+        if not positions:
+            del column_index[old_key]
+    column_index.setdefault(new_key, []).append(position)
+
+
+def bounds(indexes, column):
+    """
+    Возвращает минимальное и максимальное значения столбца из индекса.
+
+    Args:
+        indexes: Индексы таблицы {столбец: индекс} или None
+        column: Имя столбца
+
+    Returns:
+        tuple: (минимум, максимум), (None, None) для пустой таблицы
+        или None, если сортированного индекса по столбцу нет
+    """
+    if not indexes or not is_sorted_index(indexes.get(column)):
+        return None
+
+    values = indexes[column][0]
+    if not values:
+        return None, None
+    return values[0], values[-1]
+
+
+def ordered_positions(indexes, column, descending=False):
+    """
+    Перебирает позиции записей в порядке значений столбца.
+
+    Записи с равными значениями идут в порядке позиций (вставки) при любом
+    направлении - так же, как при сортировке без индекса (core._top).
+
+    Args:
+        indexes: Индексы таблицы {столбец: индекс} или None
+        column: Имя столбца
+        descending: True - по убыванию значений
+
+    Returns:
+        iterator: Позиции записей или None, если сортированного индекса
+        по столбцу нет
+    """
+    if not indexes or not is_sorted_index(indexes.get(column)):
+        return None
+
+    values, positions = indexes[column]
+    if not descending:
+        return iter(positions)
+    return _descending_positions(values, positions)
+
+
+def _descending_positions(values, positions):
+    """Позиции по убыванию значений, равные значения - по возрастанию позиций."""
+    end = len(values)
+    while end:
+        start = end - 1
+        value = values[start]
+        if start and values[start - 1] == value:
+            start = bisect_left(values, value, 0, start)
+            yield from positions[start:end]
+        else:
+            yield positions[start]
+        end = start
+
+
+def _sorted_range(column_index, low, high, include_low=True, include_high=True):
+    """Позиции записей со значениями в диапазоне [low, high] (None - без края)."""
+    values, positions = column_index
+    if low is None:
+        start = 0
+    elif include_low:
+        start = bisect_left(values, low)
+    else:
+        start = bisect_right(values, low)
+
+    if high is None:
+        end = len(values)
+    elif include_high:
+        end = bisect_right(values, high)
+    else:
+        end = bisect_left(values, high)
+    return positions[start:end]
+
+
+def _sorted_lookup(column_index, op, target):
+    """Ищет позиции по условию в сортированном индексе."""
+    if op == '=':
+        return _sorted_range(column_index, target, target)
+    if op == 'in':
+        found = []
+        for value in target:
+            found.extend(_sorted_range(column_index, value, value))
+        return found
+    if op == 'between':
+        return _sorted_range(column_index, target[0], target[1])
+    if op == '<':
+        return _sorted_range(column_index, None, target, include_high=False)
+    if op == '<=':
+        return _sorted_range(column_index, None, target)
+    if op == '>':
+        return _sorted_range(column_index, target, None, include_low=False)
+    if op == '>=':
+        return _sorted_range(column_index, target, None)
+    return None
+
+
+def _hash_lookup(column_index, op, target):
+    """Ищет позиции по условию равенства в хеш-индексе."""
+    if op == '=':
+        return list(column_index.get(index_key(target), []))
+    if op == 'in':
+        found = set()
+        for value in target:
+            found.update(column_index.get(index_key(value), []))
+        return list(found)
+    return None
+
+
+def lookup(indexes, where_clause):
+    """
+    Ищет позиции записей по простому условию с помощью индекса.
+
+    Хеш-индекс обслуживает = и in, сортированный - также <, <=, >, >=
+    и between.
+
+    Args:
+        indexes: Индексы таблицы {столбец: индекс} или None
+        where_clause: Условие parser.Predicate
+
+    Returns:
+        list: Отсортированные позиции записей или None, если индекс
+        не подходит для условия
+    """
+    if not indexes or not where_clause:
+        return None
+
+    column = getattr(where_clause, "column", None)
+    if column not in indexes:
+        return None
+
+    if not where_clause.possible:
+        return []
+
+    column_index = indexes[column]
+    if is_sorted_index(column_index):
+        if where_clause.col_type != 'int':
+            return None
+        found = _sorted_lookup(column_index, where_clause.op, where_clause.target)
+    else:
+        found = _hash_lookup(column_index, where_clause.op, where_clause.target)
+
+    if found is None:
+        return None
+    return sorted(found)
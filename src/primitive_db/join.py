@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Соединение двух таблиц в SELECT (join ... on ...).
+
+Join разрешает имена столбцов запроса ("таблица.столбец" или имя,
+встречающееся только в одной из таблиц) и делит условие WHERE:
+члены and, относящиеся к одной таблице, проверяются при сканировании
+этой таблицы (до соединения), остальные - на соединенных записях.
+Сами пары записей находит hash_join.
+"""
+
+from .constants import (
+    JOIN_AMBIGUOUS_COLUMN_ERROR,
+    JOIN_COLUMN_NOT_FOUND_ERROR,
+    JOIN_COLUMN_SEPARATOR,
+    JOIN_ON_ERROR,
+    JOIN_SAME_TABLE_ERROR,
+    META_COLUMNS_KEY,
+    TABLE_NOT_FOUND_ERROR,
+)
+from .index import index_key
+from .parser import And, BoolOp
+
+
+def qualified(table, column):
+    """Полное имя столбца "таблица.столбец"."""
+    return f"{table}{JOIN_COLUMN_SEPARATOR}{column}"
+
+
+def _predicates(condition):
+    """Перебирает простые условия внутри составного."""
+    if isinstance(condition, BoolOp):
+        for item in condition.items:
+            yield from _predicates(item)
+    else:
+        yield condition
+
+
+def _combine(items):
+    """Одно условие из списка членов and (None для пустого списка)."""
+    if not items:
+        return None
+    return items[0] if len(items) == 1 else And(items)
+
+
+class Join:
+    """Внутреннее соединение двух таблиц по равенству столбцов."""
+
+    def __init__(self, left, right, on):
+        """
+        Args:
+            left: Таблица после from
+            right: Таблица после join
+            on: Пара столбцов условия on, как они записаны в запросе
+        """
+        self.tables = (left, right)
+        self.on = on
+        self.column_types = {}
+        self.keys = {}
+        self.conditions = {}
+        self.residual = None
+        self.columns = []
+        self.order_column = None
+
+    def _resolve(self, column):
+        """
+        Находит таблицу столбца.
+
+        Returns:
+            tuple: (таблица, столбец)
+
+        Raises:
+            ValueError: Столбец не найден или есть в обеих таблицах
+        """
+        table, _, name = column.rpartition(JOIN_COLUMN_SEPARATOR)
+        if table:
+            if name in self.column_types.get(table, {}):
+                return table, name
+        else:
+            owners = [
+                table for table in self.tables
+                if column in self.column_types[table]
+            ]
+            if len(owners) == 1:
+                return owners[0], column
+            if owners:
+                raise ValueError(JOIN_AMBIGUOUS_COLUMN_ERROR.format(column))
+        raise ValueError(JOIN_COLUMN_NOT_FOUND_ERROR.format(
+            column, *self.tables
+        ))
+
+    def check(self, metadata, columns=None, where_clause=None, order_by=None):
+        """
+        Проверяет запрос и разрешает в нем имена столбцов.
+
+        Условие WHERE делится на условия для каждой таблицы и остаток,
+        и все части компилируются под типы своих столбцов.
+
+        Args:
+            metadata: Метаданные БД
+            columns: Выбираемые столбцы (None - все столбцы обеих таблиц)
+            where_clause: Условие или None
+            order_by: (столбец, по убыванию) или None
+
+        Returns:
+            str: Сообщение об ошибке или None, если запрос корректен
+        """
+        for table in self.tables:
+            if table not in metadata:
+                return TABLE_NOT_FOUND_ERROR.format(table)
+            self.column_types[table] = dict(
+                spec.split(':') for spec in metadata[table][META_COLUMNS_KEY]
+            )
+        if self.tables[0] == self.tables[1]:
+            return JOIN_SAME_TABLE_ERROR.format(self.tables[0])
+
+        try:
+            on = [self._resolve(column) for column in self.on]
+            if on[0][0] == on[1][0]:
+                return JOIN_ON_ERROR.format(*self.on)
+            self.keys = dict(on)
+
+            if columns is None:
+                self.columns = [
+                    qualified(table, column)
+                    for table in self.tables
+                    for column in self.column_types[table]
+                ]
+            else:
+                self.columns = [
+                    qualified(*self._resolve(column)) for column in columns
+                ]
+            if order_by is not None:
+                self.order_column = qualified(*self._resolve(order_by[0]))
+            self._split_where(where_clause)
+        except ValueError as e:
+            return str(e)
+        return None
+
+    def _split_where(self, where_clause):
+        """
+        Делит условие на условия для каждой таблицы и остаток.
+
+        Raises:
+            ValueError: Столбец условия не найден или неоднозначен
+        """
+        pushed = {table: [] for table in self.tables}
+        residual = []
+        items = []
+        if isinstance(where_clause, And):
+            items = where_clause.items
+        elif where_clause is not None:
+            items = [where_clause]
+
+        for item in items:
+            resolved = [
+                (predicate, self._resolve(predicate.column))
+                for predicate in _predicates(item)
+            ]
+            tables = {table for _, (table, _) in resolved}
+            if len(tables) == 1:
+                for predicate, (_, column) in resolved:
+                    predicate.column = column
+                pushed[tables.pop()].append(item)
+            else:
+                for predicate, (table, column) in resolved:
+                    predicate.column = qualified(table, column)
+                residual.append(item)
+
+        for table in self.tables:
+            condition = _combine(pushed[table])
+            if condition is not None:
+                condition.compile([
+                    f"{column}:{col_type}"
+                    for column, col_type in self.column_types[table].items()
+                ])
+            self.conditions[table] = condition
+
+        self.residual = _combine(residual)
+        if self.residual is not None:
+            self.residual.compile([
+                f"{qualified(table, column)}:{col_type}"
+                for table in self.tables
+                for column, col_type in self.column_types[table].items()
+            ])
+
+    def needed_columns(self):
+        """
+        Столбцы, которые нужно читать из каждой таблицы.
+
+        Returns:
+            dict: {таблица: [столбцы]} для выбранных столбцов, остатка
+            условия и сортировки
+        """
+        labels = list(self.columns)
+        if self.residual is not None:
+            labels.extend(
+                predicate.column for predicate in _predicates(self.residual)
+            )
+        if self.order_column is not None:
+            labels.append(self.order_column)
+
+        needed = {table: [] for table in self.tables}
+        for label in labels:
+            table, _, column = label.rpartition(JOIN_COLUMN_SEPARATOR)
+            if column not in needed[table]:
+                needed[table].append(column)
+        return needed
+
+    def key_function(self):
+        """
+        Нормализация значений столбцов on перед сравнением.
+
+        Столбцы одного типа int или bool сравниваются нативно, остальные -
+        как строки без учета регистра (как в индексах и условиях WHERE).
+        """
+        key_types = {
+            self.column_types[table][column]
+            for table, column in self.keys.items()
+        }
+        if len(key_types) == 1 and key_types != {'str'}:
+            return None
+        return index_key
+
+
+def hash_join(build, probe):
+    """
+    Находит пары записей с равными ключами.
+
+    По меньшей (строящей) стороне строится хеш-таблица ключ -> позиции,
+    затем большая сторона проходится один раз.
+
+    Args:
+        build: Пары (позиция, ключ) строящей стороны
+        probe: Пары (позиция, ключ) второй стороны
+
+    Returns:
+        iterator: Пары (позиция строящей стороны, позиция второй стороны)
+        в порядке второй стороны
+    """
+    table = {}
+    for position, key in build:
+        table.setdefault(key, []).append(position)
+
+    for position, key in probe:
+        for match in table.get(key, ()):
+            yield match, position
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Рекомендательные блокировки файлов (fcntl.flock) для нескольких процессов.
+
+Блокировка берется на отдельный файл-замок (для таблиц - в директории
+замков data/locks, см. utils.table_lock). Внутри процесса она повторно
+входима: вложенные захваты только увеличивают счетчик, а монопольный
+захват поверх разделяемого повышает режим блокировки и при освобождении
+возвращает его обратно. На платформах без fcntl блокировки ничего
+не делают.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .constants import LOCK_POLL_INTERVAL, LOCK_TIMEOUT_ERROR
+
+
+class FileLock:
+    """Разделяемая/монопольная блокировка файла-замка."""
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._shared = 0
+        self._exclusive = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def for_path(cls, path):
+        """
+        Возвращает блокировку файла, общую для всего процесса.
+
+        Args:
+            path: Путь к файлу-замку
+
+        Returns:
+            FileLock: Блокировка
+        """
+        with cls._registry_lock:
+            if path not in cls._registry:
+                cls._registry[path] = cls(path)
+            return cls._registry[path]
+
+    @property
+    def held(self):
+        """Удерживает ли процесс блокировку в каком-либо режиме."""
+        return bool(self._shared or self._exclusive)
+
+    def _flock(self, operation, timeout):
+        """Захватывает flock, ожидая не дольше timeout (None - без ограничения)."""
+        if timeout is None:
+            fcntl.flock(self._fd, operation)
+            return True
+
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(self._fd, operation | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(LOCK_POLL_INTERVAL)
+
+    def acquire(self, exclusive=False, timeout=None):
+        """
+        Захватывает блокировку.
+
+        Args:
+            exclusive: Монопольный режим (иначе разделяемый)
+            timeout: Максимальное ожидание в секундах (None - без ограничения,
+                0 - не ждать)
+
+        Returns:
+            bool: True, если блокировка захвачена
+        """
+        with self._lock:
+            if self._exclusive or (self._shared and not exclusive):
+                self._count(exclusive, 1)
+                return True
+
+            if fcntl is not None:
+                if self._fd is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                operation = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                if not self._flock(operation, timeout):
+                    # Неудачное повышение режима могло снять разделяемую блокировку
+                    self._restore()
+                    return False
+
+            self._count(exclusive, 1)
+            return True
+
+    def release(self, exclusive=False):
+        """
+        Освобождает блокировку, захваченную в том же режиме.
+
+        Args:
+            exclusive: Режим освобождаемого захвата
+        """
+        with self._lock:
+            self._count(exclusive, -1)
+            self._restore()
+
+    def _count(self, exclusive, delta):
+        if exclusive:
+            self._exclusive += delta
+        else:
+            self._shared += delta
+
+    def _restore(self):
+        """Приводит режим flock в соответствие со счетчиками захватов."""
+        if fcntl is None or self._fd is None or self._exclusive:
+            return
+        if self._shared:
+            fcntl.flock(self._fd, fcntl.LOCK_SH)
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+    @contextmanager
+    def hold(self, exclusive=False, timeout=None):
+        """
+        Удерживает блокировку на время блока with.
+
+        Raises:
+            TimeoutError: Блокировку не удалось захватить за timeout
+        """
+        if not self.acquire(exclusive, timeout):
+            raise TimeoutError(LOCK_TIMEOUT_ERROR.format(self.path))
+        try:
+            yield self
+        finally:
+            self.release(exclusive)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Метрики производительности и профилирование команд.
+
+Собираются гистограммы задержек команд и функций, помеченных log_time,
+счетчики просмотренных и возвращенных строк, прочитанных, записанных
+и отображенных через mmap байт. Опционально каждая команда выполняется
+под своим cProfile.Profile.
+
+По умолчанию метрики выключены: каждая точка замера сводится к проверке
+одного флага, а размеры файлов и время не вычисляются. cProfile и pstats
+импортируются только при профилировании, чтобы не замедлять запуск.
+"""
+
+import os
+import threading
+import time
+
+from .constants import (
+    LATENCY_BUCKETS,
+    LATENCY_PERCENTILES,
+    METRIC_COUNTERS,
+)
+
+_state = {"enabled": False, "profiling": False}
+_lock = threading.Lock()
+_histograms = {}
+_counters = dict.fromkeys(METRIC_COUNTERS, 0)
+_profiles = {}
+
+
+class Histogram:
+    """
+    Гистограмма задержек с логарифмическими корзинами.
+
+    Корзина b содержит значения от 2**(b-1) до 2**b микросекунд, поэтому
+    память постоянна, а перцентили вычисляются с точностью до корзины
+    (берется ее верхняя граница).
+    """
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * LATENCY_BUCKETS
+
+    def add(self, seconds):
+        """Добавляет одно значение задержки в секундах."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        bucket = int(seconds * 1_000_000).bit_length()
+        self.buckets[min(bucket, LATENCY_BUCKETS - 1)] += 1
+
+    def percentile(self, percent):
+        """
+        Приближенный перцентиль задержки.
+
+        Args:
+            percent: Перцентиль от 0 до 100
+
+        Returns:
+            float: Задержка в секундах (не больше максимальной)
+        """
+        if not self.count:
+            return 0.0
+        threshold = self.count * percent / 100
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= threshold:
+                return min((1 << bucket) / 1_000_000, self.max)
+        return self.max
+
+    def as_dict(self):
+        """Сводка гистограммы для вывода и JSON."""
+        summary = {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+        for percent in LATENCY_PERCENTILES:
+            summary[f"p{percent}"] = self.percentile(percent)
+        summary["buckets_us"] = {
+            1 << bucket: count
+            for bucket, count in enumerate(self.buckets) if count
+        }
+        return summary
+
+
+def enable(enabled=True):
+    """
+    Включает или выключает сбор метрик.
+
+    Args:
+        enabled: False - метрики не собираются (накопленные сохраняются)
+    """
+    _state["enabled"] = enabled
+    if not enabled:
+        _state["profiling"] = False
+
+
+def is_enabled():
+    """Собираются ли метрики."""
+    return _state["enabled"]
+
+
+def set_profiling(enabled):
+    """
+    Включает профилирование каждой команды через cProfile.
+
+    Профилирование включает и сбор метрик.
+
+    Args:
+        enabled: True - команды выполняются под профилировщиком
+    """
+    _state["profiling"] = enabled
+    if enabled:
+        _state["enabled"] = True
+
+
+def is_profiling():
+    """Профилируются ли команды."""
+    return _state["profiling"]
+
+
+def observe(name, seconds):
+    """
+    Записывает задержку в гистограмму name.
+
+    Args:
+        name: Имя команды или функции
+        seconds: Задержка в секундах
+    """
+    if not _state["enabled"]:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(seconds)
+
+
+def add(counter, value):
+    """
+    Увеличивает счетчик.
+
+    Args:
+        counter: Имя счетчика из METRIC_COUNTERS
+        value: Прибавляемое значение
+    """
+    if not _state["enabled"]:
+        return
+    with _lock:
+        _counters[counter] += value
+
+
+def add_file_size(counter, path):
+    """Прибавляет к счетчику размер файла (если метрики включены)."""
+    if not _state["enabled"]:
+        return
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return
+    add(counter, size)
+
+
+def run_command(name, func, *args, **kwargs):
+    """
+    Выполняет команду, записывая ее задержку (и профиль, если включен).
+
+    Args:
+        name: Имя команды
+        func: Функция, выполняющая команду
+
+    Returns:
+        Результат func
+    """
+    profiler = None
+    if _state["profiling"]:
+        with _lock:
+            profiler = _profiles.get(name)
+            if profiler is None:
+                import cProfile
+
+                profiler = _profiles[name] = cProfile.Profile()
+
+    start = time.perf_counter()
+    try:
+        if profiler is not None:
+            return profiler.runcall(func, *args, **kwargs)
+        return func(*args, **kwargs)
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def snapshot():
+    """
+    Возвращает текущие метрики.
+
+    Returns:
+        dict: {"enabled", "profiling", "commands": {имя: сводка},
+        "counters": {имя: значение}}
+    """
+    with _lock:
+        return {
+            "enabled": _state["enabled"],
+            "profiling": _state["profiling"],
+            "commands": {
+                name: histogram.as_dict()
+                for name, histogram in sorted(_histograms.items())
+            },
+            "counters": dict(_counters),
+        }
+
+
+def reset():
+    """Обнуляет накопленные метрики и профили."""
+    with _lock:
+        _histograms.clear()
+        _counters.update(dict.fromkeys(_counters, 0))
+        _profiles.clear()
+
+
+def profile_stats(stream=None):
+    """
+    Объединяет профили всех команд.
+
+    Args:
+        stream: Поток для вывода pstats (по умолчанию sys.stdout)
+
+    Returns:
+        pstats.Stats: Объединенная статистика или None, если профилей нет
+    """
+    with _lock:
+        profiles = list(_profiles.values())
+    if not profiles:
+        return None
+    import pstats
+
+    stats = pstats.Stats(profiles[0], stream=stream)
+    for profile in profiles[1:]:
+        stats.add(profile)
+    return stats
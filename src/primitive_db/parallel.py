@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Параллельное сканирование больших таблиц по условию WHERE.
+
+Таблица делится на непрерывные диапазоны позиций, и каждый диапазон
+проверяется в отдельном процессе пула concurrent.futures. Процессы
+создаются через fork: данные таблицы (список записей, массивы столбцов
+или отображенный через mmap бинарный файл) наследуются без копирования
+и сериализации, в процессы передаются только границы диапазонов,
+а обратно - найденные позиции. Результаты склеиваются по порядку
+диапазонов, поэтому позиции (и ID) идут по возрастанию.
+
+Режим включается явно (set_workers или опция --workers) и применяется
+только к таблицам от PARALLEL_MIN_ROWS записей. multiprocessing
+и concurrent.futures импортируются при первом параллельном сканировании:
+при обычном запуске они не нужны, а их импорт заметно удлиняет старт.
+"""
+
+from array import array
+
+from .columnar import ColumnarTable
+from .constants import DEFAULT_SCAN_WORKERS, PARALLEL_MIN_ROWS
+from .parser import Predicate
+
+# Число процессов сканирования и данные текущего сканирования,
+# которые процессы пула наследуют при fork
+_settings = {"workers": DEFAULT_SCAN_WORKERS}
+_scan_state = {}
+
+
+def set_workers(workers):
+    """
+    Задает число процессов для параллельного сканирования.
+
+    Args:
+        workers: Число процессов (1 - сканирование в текущем процессе)
+    """
+    _settings["workers"] = max(1, int(workers))
+
+
+def get_workers():
+    """Возвращает число процессов параллельного сканирования."""
+    return _settings["workers"]
+
+
+def is_available():
+    """Поддерживает ли платформа запуск процессов через fork."""
+    import multiprocessing
+
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def should_parallelize(table_data, workers=None):
+    """
+    Проверяет, стоит ли сканировать таблицу параллельно.
+
+    Args:
+        table_data: Данные таблицы
+        workers: Число процессов (по умолчанию из set_workers)
+
+    Returns:
+        bool: True, если включено несколько процессов и таблица большая
+    """
+    workers = get_workers() if workers is None else workers
+    return (
+        workers > 1 and len(table_data) >= PARALLEL_MIN_ROWS and is_available()
+    )
+
+
+def _column_chunk(values, start, stop):
+    """Возвращает значения столбца в диапазоне позиций."""
+    if isinstance(values, (list, array, memoryview)):
+        return values[start:stop]
+    return (values[position] for position in range(start, stop))
+
+
+def _scan_chunk(start, stop):
+    """
+    Ищет подходящие позиции в диапазоне [start, stop) в процессе пула.
+
+    Returns:
+        list: Позиции подходящих записей по возрастанию
+    """
+    table_data = _scan_state["table_data"]
+    where_clause = _scan_state["where_clause"]
+
+    if isinstance(table_data, ColumnarTable):
+        if isinstance(where_clause, Predicate):
+            values = table_data.columns.get(where_clause.column)
+            if values is None:
+                return []
+            matches = where_clause.scan(_column_chunk(values, start, stop))
+        else:
+            matches = where_clause.scan_records(
+                table_data[position] for position in range(start, stop)
+            )
+    else:
+        matches = where_clause.scan_records(table_data[start:stop])
+
+    return [start + position for position in matches]
+
+
+def _chunk_bounds(row_count, chunks):
+    """Делит позиции таблицы на chunks непрерывных диапазонов."""
+    size = -(-row_count // chunks)
+    return [
+        (start, min(start + size, row_count))
+        for start in range(0, row_count, size)
+    ]
+
+
+def scan(table_data, where_clause, workers=None):
+    """
+    Находит позиции записей, подходящих под условие, в пуле процессов.
+
+    Args:
+        table_data: Данные таблицы
+        where_clause: Скомпилированное условие
+        workers: Число процессов (по умолчанию из set_workers)
+
+    Returns:
+        list: Позиции подходящих записей по возрастанию
+    """
+    workers = get_workers() if workers is None else workers
+    bounds = _chunk_bounds(len(table_data), workers)
+
+    _scan_state["table_data"] = table_data
+    _scan_state["where_clause"] = where_clause
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    try:
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            futures = [pool.submit(_scan_chunk, *bound) for bound in bounds]
+            positions = []
+            for future in futures:
+                positions.extend(future.result())
+    finally:
+        _scan_state.clear()
+
+    return positions
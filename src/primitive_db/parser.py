@@ -1,102 +1,543 @@
 #!/usr/bin/env python3
 """
 Парсеры для сложных команд SQL-like.
+
+Команда разбивается на лексемы за один проход (tokenize), дальше значения
+INSERT, SET и условия WHERE разбираются рекурсивным спуском по лексемам
+без повторной токенизации.
 """
 
-import shlex
+from operator import methodcaller
+
+from .constants import (
+    AND_KEYWORD,
+    BETWEEN_OP,
+    COMMAND_TOKEN_PATTERN,
+    COMPARISON_OPS,
+    IN_OP,
+    OR_KEYWORD,
+    PARAM_PATTERN,
+    QUOTED_TOKEN_GROUP,
+    UNKNOWN_TOKEN_GROUP,
+    VALUES_KEYWORD,
+    WHERE_PUNCTUATION,
+)
+from .values import convert_bool, convert_str
+
+
+def str_coerce(value):
+    """Приводит значение условия к строке в нижнем регистре."""
+    return str(value).lower()
 
 
-def parse_where_clause(where_str):
+def coerce_operand(col_type, value):
     """
-    Парсит WHERE условие в формате "столбец = значение".
+    Приводит значение из условия WHERE к типу столбца.
+    
+    В отличие от вставки, bool не считается числом для int-столбца,
+    а дробное число не округляется.
     
     Args:
-        where_str: Строка условия
+        col_type: Тип столбца (int, str, bool)
+        value: Значение из условия
         
     Returns:
-        dict: {'column': value} или None если условие пустое
+        Значение типа столбца (для str - в нижнем регистре)
+        
+    Raises:
+        ValueError, TypeError: Значение не приводится к типу столбца
+    """
+    if col_type == 'int':
+        if isinstance(value, bool):
+            raise TypeError(value)
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError(value)
+        return int(value)
+    if col_type == 'bool':
+        if isinstance(value, int) and not isinstance(value, bool):
+            if value not in (0, 1):
+                raise ValueError(value)
+        return convert_bool(value)
+    return convert_str(value).lower()
+
+
+class Param:
+    """
+    Параметр подготовленного выражения (?N в тексте команды).
+    
+    Значение подставляется при выполнении (plans.bind).
+    """
+    
+    __slots__ = ("index",)
+    
+    def __init__(self, index):
+        self.index = index
+    
+    def __str__(self):
+        return f"?{self.index}"
+    
+    __repr__ = __str__
+
+
+def _lower_str(values):
+    """Приводит значения к строкам в нижнем регистре (через C-уровневые map)."""
+    return map(str.lower, map(str, values))
+
+
+def _guarded_scan(values, make_scan):
+    """
+    Перебирает позиции, найденные генератором make_scan(пары), пропуская
+    значения, несравнимые с условием.
+    
+    Значение другого типа не подходит, как в Predicate.matches, и не
+    прерывает сканирование: генератор, упавший с TypeError на этом
+    значении, создается заново над оставшимися парами (позиция, значение).
+    """
+    pairs = enumerate(values)
+    while True:
+        try:
+            yield from make_scan(pairs)
+            return
+        except TypeError:
+            continue
+
+
+class Predicate:
+    """
+    Условие WHERE над одним столбцом, скомпилированное под его тип.
+    
+    Поддерживаются операторы =, !=, <, <=, >, >=, between и in.
+    После compile значение условия один раз приводится к типу столбца,
+    и записи сравниваются нативно: int и bool - без преобразования
+    в строки, str - без учета регистра. Некомпилированное условие
+    сравнивает строковые представления.
+    """
+    
+    def __init__(self, column, op, value):
+        self.column = column
+        self.op = op
+        self.value = value
+        self.col_type = None
+        self.possible = True
+        self.target = self._coerce(str_coerce, value)
+    
+    def _coerce(self, coerce, value):
+        """Приводит значение условия (или его части) функцией coerce."""
+        if self.op == BETWEEN_OP:
+            return (coerce(value[0]), coerce(value[1]))
+        if self.op == IN_OP:
+            coerced = set()
+            for item in value:
+                try:
+                    coerced.add(coerce(item))
+                except (ValueError, TypeError):
+                    continue
+            if not coerced:
+                self.possible = False
+            return frozenset(coerced)
+        return coerce(value)
+    
+    def compile(self, columns_spec):
+        """
+        Приводит значение условия к типу столбца.
+        
+        Args:
+            columns_spec: Столбцы таблицы в формате "имя:тип"
+            
+        Returns:
+            Predicate: self
+        """
+        column_types = dict(spec.split(':', 1) for spec in columns_spec)
+        self.col_type = column_types.get(self.column)
+        if self.col_type is None:
+            self.possible = False
+            return self
+        
+        try:
+            self.target = self._coerce(
+                lambda item: coerce_operand(self.col_type, item), self.value
+            )
+        except (ValueError, TypeError):
+            self.possible = False
+        return self
+    
+    @property
+    def native(self):
+        """Сравниваются ли значения столбца без перевода в строки."""
+        return self.col_type in ('int', 'bool')
+    
+    def matches(self, value):
+        """Проверяет значение столбца одной записи."""
+        if not self.possible:
+            return False
+        if not self.native:
+            value = str(value).lower()
+        try:
+            if self.op == BETWEEN_OP:
+                return self.target[0] <= value <= self.target[1]
+            if self.op == IN_OP:
+                return value in self.target
+            return COMPARISON_OPS[self.op](value, self.target)
+        except TypeError:
+            return False
+    
+    def __call__(self, record):
+        return self.matches(record.get(self.column, ""))
+    
+    def scan(self, values):
+        """
+        Лениво перебирает позиции подходящих значений столбца.
+        
+        Args:
+            values: Значения одного столбца (список, array, битовая карта)
+            
+        Returns:
+            iterator: Позиции по возрастанию
+        """
+        if not self.possible:
+            return iter(())
+        if not self.native:
+            values = _lower_str(values)
+        
+        target = self.target
+        if self.op == IN_OP:
+            return (i for i, v in enumerate(values) if v in target)
+        if self.op == '=':
+            return (i for i, v in enumerate(values) if v == target)
+        # Сравнение по порядку может выбросить TypeError на значении
+        # другого типа, поэтому оно проверяется с защитой
+        if self.op == BETWEEN_OP:
+            low, high = target
+            return _guarded_scan(values, lambda pairs: (
+                i for i, v in pairs if low <= v <= high
+            ))
+        compare = COMPARISON_OPS[self.op]
+        return _guarded_scan(values, lambda pairs: (
+            i for i, v in pairs if compare(v, target)
+        ))
+    
+    def scan_records(self, records):
+        """
+        Лениво перебирает позиции подходящих записей-словарей.
+        
+        Args:
+            records: Записи таблицы
+            
+        Returns:
+            iterator: Позиции по возрастанию
+        """
+        if self.native:
+            getter = methodcaller('get', self.column)
+        else:
+            getter = methodcaller('get', self.column, "")
+        return self.scan(map(getter, records))
+    
+    def __repr__(self):
+        return f"{self.column} {self.op} {self.target!r}"
+
+
+class BoolOp:
+    """Логическая комбинация условий (AND или OR)."""
+    
+    op = None
+    
+    def __init__(self, items):
+        self.items = items
+    
+    def compile(self, columns_spec):
+        """Компилирует все вложенные условия."""
+        for item in self.items:
+            item.compile(columns_spec)
+        return self
+    
+    def scan_records(self, records):
+        """Лениво перебирает позиции записей, подходящих под условие."""
+        return (i for i, record in enumerate(records) if self(record))
+    
+    def __repr__(self):
+        return "(" + f" {self.op} ".join(repr(item) for item in self.items) + ")"
+
+
+class And(BoolOp):
+    """Все вложенные условия должны выполняться."""
+    
+    op = AND_KEYWORD
+    
+    def __call__(self, record):
+        return all(item(record) for item in self.items)
+
+
+class Or(BoolOp):
+    """Должно выполняться хотя бы одно вложенное условие."""
+    
+    op = OR_KEYWORD
+    
+    def __call__(self, record):
+        return any(item(record) for item in self.items)
+
+
+class Quoted(str):
+    """Лексема, записанная в кавычках (строка, а не слово или число)."""
+    
+    __slots__ = ()
+
+
+def tokenize(text):
     """
-    if not where_str or not where_str.strip():
+    Разбивает команду на лексемы за один проход.
+    
+    Лексемы: строки в кавычках (Quoted, без кавычек), операторы
+    сравнения, скобки и запятые, слова (ключевые слова, имена, числа).
+    
+    Args:
+        text: Текст команды или ее части
+        
+    Returns:
+        list: Лексемы
+        
+    Raises:
+        ValueError: Незакрытая кавычка или нераспознанный символ
+    """
+    tokens = []
+    for match in COMMAND_TOKEN_PATTERN.finditer(text):
+        group = match.lastindex
+        if group == QUOTED_TOKEN_GROUP:
+            tokens.append(Quoted(match.group(group)))
+        elif group == UNKNOWN_TOKEN_GROUP:
+            raise ValueError(text[match.start(group):])
+        else:
+            tokens.append(match.group(group))
+    return tokens
+
+
+def keywords(tokens):
+    """
+    Лексемы в нижнем регистре для поиска ключевых слов.
+    
+    Args:
+        tokens: Лексемы команды
+        
+    Returns:
+        list: Лексемы в нижнем регистре; None вместо строк в кавычках
+        (слово в кавычках - значение, а не ключевое слово)
+    """
+    return [
+        None if isinstance(token, Quoted) else token.lower()
+        for token in tokens
+    ]
+
+
+def _is_punctuation(token):
+    """Проверяет, является ли лексема оператором, скобкой или запятой."""
+    return token in WHERE_PUNCTUATION and not isinstance(token, Quoted)
+
+
+def _as_tokens(text_or_tokens):
+    """Лексемы из строки или уже готового списка лексем."""
+    if isinstance(text_or_tokens, str):
+        return tokenize(text_or_tokens)
+    return list(text_or_tokens)
+
+
+class _WhereParser:
+    """Рекурсивный спуск по лексемам условия WHERE."""
+    
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+    
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
         return None
     
-    where_str = where_str.strip()
-    if where_str.startswith('(') and where_str.endswith(')'):
-        where_str = where_str[1:-1].strip()
+    def peek_keyword(self):
+        token = self.peek()
+        return token.lower() if token is not None else None
     
-    try:
-        parts = where_str.split('=', 1)
-        if len(parts) != 2:
-            return None
+    def take(self, expected=None):
+        token = self.peek()
+        if token is None:
+            raise ValueError("unexpected end")
+        if expected is not None and token.lower() != expected:
+            raise ValueError(token)
+        self.pos += 1
+        return token
+    
+    def parse(self):
+        condition = self.parse_or()
+        if self.peek() is not None:
+            raise ValueError(self.peek())
+        return condition
+    
+    def parse_or(self):
+        items = [self.parse_and()]
+        while self.peek_keyword() == OR_KEYWORD:
+            self.take()
+            items.append(self.parse_and())
+        return items[0] if len(items) == 1 else Or(items)
+    
+    def parse_and(self):
+        items = [self.parse_primary()]
+        while self.peek_keyword() == AND_KEYWORD:
+            self.take()
+            items.append(self.parse_primary())
+        return items[0] if len(items) == 1 else And(items)
+    
+    def parse_primary(self):
+        if self.peek() == '(':
+            self.take()
+            condition = self.parse_or()
+            self.take(')')
+            return condition
+        return self.parse_comparison()
+    
+    def parse_comparison(self):
+        column = self.take()
+        if _is_punctuation(column):
+            raise ValueError(column)
         
-        column = parts[0].strip()
-        value_str = parts[1].strip()
+        op = self.take().lower()
+        if op == BETWEEN_OP:
+            low = self.parse_operand()
+            self.take(AND_KEYWORD)
+            return Predicate(column, op, (low, self.parse_operand()))
         
-        # Обрабатываем значения
-        value = parse_value(value_str)
+        if op == IN_OP:
+            self.take('(')
+            values = [self.parse_operand()]
+            while self.peek() == ',':
+                self.take()
+                values.append(self.parse_operand())
+            self.take(')')
+            return Predicate(column, op, values)
         
-        return {column: value}
-    except Exception:
+        if op == '<>':
+            op = '!='
+        if op not in COMPARISON_OPS:
+            raise ValueError(op)
+        return Predicate(column, op, self.parse_operand())
+    
+    def parse_operand(self):
+        """
+        Читает значение: строку в кавычках или подряд идущие слова
+        (значение без кавычек может содержать пробелы).
+        """
+        token = self.peek()
+        if token is None or _is_punctuation(token):
+            raise ValueError(token)
+        if isinstance(token, Quoted):
+            return parse_value(self.take())
+        
+        words = []
+        while True:
+            token = self.peek()
+            if token is None or _is_punctuation(token):
+                break
+            if isinstance(token, Quoted) or \
+                    token.lower() in (AND_KEYWORD, OR_KEYWORD):
+                break
+            words.append(self.take())
+        return parse_value(" ".join(words))
+    
+    def parse_rest_operand(self):
+        """Читает значение, занимающее все оставшиеся лексемы."""
+        rest = self.tokens[self.pos:]
+        if not rest:
+            raise ValueError("unexpected end")
+        self.pos = len(self.tokens)
+        if len(rest) == 1:
+            return parse_value(rest[0])
+        return parse_value(" ".join(rest))
+
+
+def parse_where_clause(where):
+    """
+    Парсит WHERE условие.
+    
+    Поддерживаются сравнения =, !=, <>, <, <=, >, >=, а также
+    "столбец between A and B", "столбец in (A, B, ...)", связки and/or
+    и скобки.
+    
+    Args:
+        where: Строка условия или ее лексемы
+        
+    Returns:
+        Predicate | And | Or: Условие (до compile) или None если условие
+        пустое или некорректное
+    """
+    try:
+        tokens = _as_tokens(where)
+        if not tokens:
+            return None
+        return _WhereParser(tokens).parse()
+    except ValueError:
         return None
 
 
-def parse_set_clause(set_str):
+def parse_set_clause(set_clause):
     """
     Парсит SET условие в формате "столбец = новое_значение".
     
     Args:
-        set_str: Строка условия
+        set_clause: Строка условия или ее лексемы
         
     Returns:
-        dict: {'column': 'new_value'}
+        dict: {'column': 'new_value'} или {} для некорректного условия
     """
-    if not set_str or not set_str.strip():
-        return {}
-    
     try:
-        set_str = set_str.lower().replace('set', '', 1).strip()
-        parts = set_str.split('=', 1)
-        
-        if len(parts) != 2:
+        tokens = _as_tokens(set_clause)
+        if len(tokens) < 3 or tokens[1] != '=' or _is_punctuation(tokens[0]):
             return {}
         
-        column = parts[0].strip()
-        value_str = parts[1].strip()
-        value = parse_value(value_str)
-        
-        return {column: value}
-    except Exception:
+        value = _WhereParser(tokens[2:]).parse_rest_operand()
+        return {tokens[0]: value}
+    except ValueError:
         return {}
 
 
-def parse_values(values_str):
+def parse_values(values):
     """
     Парсит значения для INSERT в формате "(значение1, значение2, ...)".
     
+    Значения разделяются запятыми; строка в кавычках может содержать
+    запятые и пробелы, значение без кавычек - пробелы.
+    
     Args:
-        values_str: Строка со значениями
+        values: Строка со значениями или ее лексемы
         
     Returns:
-        list: Список значений
+        list: Список значений ([] для некорректной строки)
     """
-    if not values_str or not values_str.strip():
+    try:
+        tokens = _as_tokens(values)
+    except ValueError:
         return []
     
+    if tokens and not isinstance(tokens[0], Quoted) and \
+            tokens[0].lower() == VALUES_KEYWORD:
+        tokens = tokens[1:]
+    if len(tokens) >= 2 and tokens[0] == '(' and tokens[-1] == ')':
+        tokens = tokens[1:-1]
+    if not tokens:
+        return []
+    
+    values = []
+    start = 0
     try:
-        values_str = values_str.lower().replace('values', '', 1).strip()
-        if values_str.startswith('(') and values_str.endswith(')'):
-            values_str = values_str[1:-1].strip()
-        
-        parts = shlex.split(values_str.replace(',', ' '))
-        values = []
-        
-        for part in parts:
-            if part == ',' or not part:
-                continue
-            values.append(parse_value(part))
-        
-        return values
-    except Exception:
+        for pos in range(len(tokens) + 1):
+            if pos == len(tokens) or (
+                tokens[pos] == ',' and not isinstance(tokens[pos], Quoted)
+            ):
+                if pos == start:
+                    return []
+                values.append(
+                    _WhereParser(tokens[start:pos]).parse_rest_operand()
+                )
+                start = pos + 1
+    except ValueError:
         return []
+    return values
 
 
 def parse_value(value_str):
@@ -104,14 +545,22 @@ def parse_value(value_str):
     Парсит одиночное значение, преобразуя к правильному типу.
     
     Args:
-        value_str: Строка со значением
+        value_str: Лексема или строка со значением
         
     Returns:
-        Значение правильного типа
+        Значение правильного типа (лексема в кавычках - всегда строка)
     """
+    if isinstance(value_str, Quoted):
+        return str(value_str)
+    
+    # Параметр подготовленного выражения
+    param = PARAM_PATTERN.fullmatch(value_str)
+    if param:
+        return Param(int(param.group(1)))
+    
     # Убираем кавычки
-    if (value_str.startswith('"') and value_str.endswith('"')) or \
-       (value_str.startswith("'") and value_str.endswith("'")):
+    if len(value_str) >= 2 and value_str[0] == value_str[-1] and \
+            value_str[0] in ('"', "'"):
         return value_str[1:-1]
     
     # Булевы значения
@@ -127,4 +576,4 @@ def parse_value(value_str):
         else:
             return int(value_str)
     except ValueError:
-        return value_str  # Оставляем как строку
\ No newline at end of file
+        return value_str  # Оставляем как строку
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Кэш планов команд и подготовленные выражения.
+
+Разбор команды (токенизация, разбор значений и условий WHERE)
+выполняется один раз для каждого текста: результат хранится в LRU-кэше
+PLAN_CACHE_SIZE записей, а при выполнении из шаблона собирается свежая
+копия (bind), потому что условия компилируются под таблицу на месте.
+
+Подготовленное выражение хранит аргументы команды с параметрами ?N;
+execute подставляет значения в готовый план без повторного разбора.
+"""
+
+import threading
+from collections import OrderedDict
+
+from .constants import PARAM_PLACEHOLDER, PLAN_CACHE_SIZE
+from .parser import BoolOp, Param, Predicate, Quoted
+
+_lock = threading.Lock()
+_plans = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_prepared = {}
+
+
+class PreparedStatement:
+    """Команда с параметрами, подготовленная командой prepare."""
+
+    def __init__(self, command, args, param_count):
+        """
+        Args:
+            command: Имя команды (insert, select, update, delete)
+            args: Аргументы команды с параметрами ?0, ?1, ...
+            param_count: Число параметров
+        """
+        self.command = command
+        self.args = args
+        self.param_count = param_count
+
+
+def cached(key, build):
+    """
+    Возвращает план из кэша или строит и запоминает его.
+
+    Args:
+        key: Ключ (нормализованный текст или кортеж токенов команды)
+        build: Функция без аргументов, строящая план
+
+    Returns:
+        План (общий для всех вызовов, изменять его нельзя)
+    """
+    with _lock:
+        plan = _plans.get(key)
+        if plan is not None:
+            _plans.move_to_end(key)
+            _stats["hits"] += 1
+            return plan
+        _stats["misses"] += 1
+
+    plan = build()
+    with _lock:
+        _plans[key] = plan
+        while len(_plans) > PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+            _stats["evictions"] += 1
+    return plan
+
+
+def bind(template, params=()):
+    """
+    Собирает из шаблона плана копию с подставленными параметрами.
+
+    Условия создаются заново, остальные неизменяемые значения берутся
+    из шаблона.
+
+    Args:
+        template: Шаблон плана
+        params: Значения параметров ?0, ?1, ...
+
+    Returns:
+        План, который можно изменять. Параметр без значения остается
+        текстом "?N" (как в команде без prepare)
+    """
+    if isinstance(template, Param):
+        if template.index < len(params):
+            return params[template.index]
+        return str(template)
+    if isinstance(template, Predicate):
+        return Predicate(
+            template.column, template.op, bind(template.value, params)
+        )
+    if isinstance(template, BoolOp):
+        return type(template)([bind(item, params) for item in template.items])
+    if isinstance(template, list):
+        return [bind(item, params) for item in template]
+    if isinstance(template, tuple):
+        return tuple(bind(item, params) for item in template)
+    if isinstance(template, dict):
+        return {key: bind(value, params) for key, value in template.items()}
+    return template
+
+
+def number_params(args):
+    """
+    Нумерует параметры ? в аргументах команды по порядку (?0, ?1, ...).
+
+    Знак ? внутри строки в кавычках параметром не считается.
+
+    Args:
+        args: Аргументы команды
+
+    Returns:
+        tuple: (аргументы с номерами параметров, число параметров)
+    """
+    count = 0
+    numbered = []
+    for arg in args:
+        if isinstance(arg, Quoted):
+            numbered.append(arg)
+            continue
+        parts = arg.split(PARAM_PLACEHOLDER)
+        for i in range(1, len(parts)):
+            parts[i] = f"{count}{parts[i]}"
+            count += 1
+        numbered.append(PARAM_PLACEHOLDER.join(parts))
+    return numbered, count
+
+
+def prepare(name, statement):
+    """
+    Запоминает подготовленное выражение (заменяя прежнее с тем же именем).
+
+    Args:
+        name: Имя выражения
+        statement: PreparedStatement
+    """
+    with _lock:
+        _prepared[name] = statement
+
+
+def get_prepared(name):
+    """Подготовленное выражение по имени или None."""
+    with _lock:
+        return _prepared.get(name)
+
+
+def stats():
+    """
+    Статистика кэша планов.
+
+    Returns:
+        dict: {"entries", "hits", "misses", "evictions", "prepared"}
+    """
+    with _lock:
+        return {"entries": len(_plans), **_stats, "prepared": len(_prepared)}
+
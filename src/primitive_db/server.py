@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Сетевой сервер на asyncio: доступ к базе данных по TCP или Unix-сокету.
+
+Таблицы загружаются один раз и живут в памяти процесса (TableStore), поэтому
+клиенты работают с "теплыми" данными. Протокол строковый: клиент отправляет
+команду одной строкой в UTF-8 (тот же язык команд, что и в консоли), сервер
+отвечает выводом команды, завершенным строкой из одного символа
+SERVER_RESPONSE_END. Команда exit закрывает соединение.
+
+Команды выполняются в пуле потоков. Чтения одной таблицы идут параллельно,
+изменения таблицы выполняются по одному и не пересекаются с ее чтениями;
+команды из SERVER_GLOBAL_COMMANDS и сброс на диск выполняются монопольно.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import signal
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import engine
+from .constants import (
+    FLUSH_INTERVAL_SECONDS,
+    SERVER_DEFAULT_HOST,
+    SERVER_DEFAULT_PORT,
+    SERVER_DESCRIPTION,
+    SERVER_GLOBAL_COMMANDS,
+    SERVER_HOST_HELP,
+    SERVER_PORT_HELP,
+    SERVER_RESPONSE_END,
+    SERVER_STARTED_MESSAGE,
+    SERVER_STOPPED_MESSAGE,
+    SERVER_THREADS,
+    SERVER_TRANSACTION_ERROR,
+    SERVER_UNIX_HELP,
+    SERVER_UNSUPPORTED_COMMANDS,
+    SERVER_WRITE_COMMANDS,
+    UNEXPECTED_ERROR_MESSAGE,
+)
+from .decorators import set_confirmation
+from .store import TableStore
+
+
+class ThreadOutput(io.TextIOBase):
+    """
+    Замена sys.stdout, направляющая вывод потока в его буфер.
+
+    Команды движка печатают результат через print; пока поток выполняет
+    команду клиента, его вывод собирается в отдельный буфер.
+    """
+
+    def __init__(self, default):
+        self._default = default
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def capture(self):
+        """Собирает вывод текущего потока в StringIO."""
+        buffer = io.StringIO()
+        self._local.buffer = buffer
+        try:
+            yield buffer
+        finally:
+            self._local.buffer = None
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._default).write(text)
+
+    def flush(self):
+        if getattr(self._local, "buffer", None) is None:
+            self._default.flush()
+
+
+class ReadWriteLock:
+    """
+    Блокировка asyncio с общим доступом для чтения и монопольным для записи.
+
+    Ожидающий писатель блокирует новых читателей, чтобы поток чтений
+    не откладывал изменения бесконечно.
+    """
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextlib.asynccontextmanager
+    async def read(self):
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: not self._writer and not self._waiting_writers
+            )
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def write(self):
+        async with self._condition:
+            self._waiting_writers += 1
+            try:
+                await self._condition.wait_for(
+                    lambda: not self._writer and not self._readers
+                )
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class DatabaseServer:
+    """Сервер, выполняющий команды клиентов над общим TableStore."""
+
+    def __init__(self, threads=SERVER_THREADS,
+                 flush_interval=FLUSH_INTERVAL_SECONDS):
+        """
+        Args:
+            threads: Размер пула потоков для выполнения команд
+            flush_interval: Интервал сброса изменений на диск в секундах
+        """
+        self.store = TableStore(
+            flush_interval=None, on_refresh=engine.clear_table_cache
+        )
+        self.flush_interval = flush_interval
+        self.executor = ThreadPoolExecutor(threads)
+        self.output = None
+        self._global_lock = ReadWriteLock()
+        self._table_locks = {}
+
+    def _table_lock(self, table_name):
+        if table_name not in self._table_locks:
+            self._table_locks[table_name] = ReadWriteLock()
+        return self._table_locks[table_name]
+
+    @contextlib.asynccontextmanager
+    async def _locked(self, command, args):
+        """Захватывает блокировки, нужные команде."""
+        if command in SERVER_GLOBAL_COMMANDS:
+            async with self._global_lock.write():
+                yield
+            return
+
+        # Таблицы берутся по алфавиту, поэтому соединения не взаимоблокируются
+        table_names = engine.command_tables(command, args)
+        async with self._global_lock.read(), contextlib.AsyncExitStack() as stack:
+            for table_name in table_names:
+                table_lock = self._table_lock(table_name)
+                if command in SERVER_WRITE_COMMANDS:
+                    await stack.enter_async_context(table_lock.write())
+                else:
+                    await stack.enter_async_context(table_lock.read())
+            yield
+
+    def _execute(self, command, args, params=()):
+        """Выполняет команду в потоке пула и возвращает ее вывод."""
+        with self.output.capture() as buffer:
+            try:
+                engine.execute_command(
+                    self.store, command, args, interactive=False,
+                    params=params,
+                )
+            except Exception as e:
+                print(UNEXPECTED_ERROR_MESSAGE.format(e))
+        return buffer.getvalue()
+
+    async def execute(self, line):
+        """
+        Выполняет строку команды с учетом блокировок.
+
+        Args:
+            line: Команда клиента
+
+        Returns:
+            str: Вывод команды или None, если клиент завершает работу
+        """
+        command, args = engine.parse_command(line)
+        if command == "exit":
+            return None
+        if command in SERVER_UNSUPPORTED_COMMANDS:
+            return f"{SERVER_TRANSACTION_ERROR}\n"
+
+        # Блокировки берутся по команде подготовленного выражения
+        command, args, params = engine.resolve_prepared(command, args)
+        loop = asyncio.get_running_loop()
+        async with self._locked(command, args):
+            return await loop.run_in_executor(
+                self.executor, self._execute, command, args, params
+            )
+
+    async def handle_client(self, reader, writer):
+        """Обслуживает одно подключение клиента."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                output = await self.execute(line.decode("utf-8").strip())
+                if output is None:
+                    break
+                writer.write(
+                    f"{output}{SERVER_RESPONSE_END}\n".encode("utf-8")
+                )
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def flush(self):
+        """Сбрасывает изменения на диск монопольно."""
+        loop = asyncio.get_running_loop()
+        async with self._global_lock.write():
+            await loop.run_in_executor(self.executor, self.store.flush)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self.store.dirty:
+                await self.flush()
+
+    async def serve(self, host=SERVER_DEFAULT_HOST, port=SERVER_DEFAULT_PORT,
+                    unix_path=None):
+        """
+        Принимает подключения, пока сервер не будет остановлен.
+
+        Args:
+            host: Адрес для TCP-подключений
+            port: Порт для TCP-подключений
+            unix_path: Путь к Unix-сокету (если задан, TCP не используется)
+        """
+        self.output = ThreadOutput(sys.stdout)
+        sys.stdout = self.output
+        set_confirmation(False)
+
+        if unix_path:
+            server = await asyncio.start_unix_server(
+                self.handle_client, path=unix_path
+            )
+            address = unix_path
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+            address = f"{host}:{port}"
+        print(SERVER_STARTED_MESSAGE.format(address), flush=True)
+
+        loop = asyncio.get_running_loop()
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(
+                signal.SIGTERM, asyncio.current_task().cancel
+            )
+
+        flusher = None
+        if self.flush_interval:
+            flusher = asyncio.create_task(self._flush_periodically())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if flusher is not None:
+                flusher.cancel()
+            await self.flush()
+            self.executor.shutdown()
+            sys.stdout = self.output._default
+
+
+def parse_server_args(argv=None):
+    """Разбирает аргументы командной строки сервера."""
+    arg_parser = argparse.ArgumentParser(description=SERVER_DESCRIPTION)
+    arg_parser.add_argument(
+        "--host", default=SERVER_DEFAULT_HOST, help=SERVER_HOST_HELP
+    )
+    arg_parser.add_argument(
+        "--port", type=int, default=SERVER_DEFAULT_PORT, help=SERVER_PORT_HELP
+    )
+    arg_parser.add_argument("--unix", metavar="PATH", help=SERVER_UNIX_HELP)
+    return arg_parser.parse_args(argv)
+
+
+def run_server(argv=None):
+    """Точка входа сервера."""
+    options = parse_server_args(argv)
+    server = DatabaseServer()
+    try:
+        asyncio.run(server.serve(options.host, options.port, options.unix))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    print(SERVER_STOPPED_MESSAGE)
+
+
+if __name__ == "__main__":
+    run_server()
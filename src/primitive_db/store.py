@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Хранилище таблиц в памяти процесса.
+
+Метаданные и каждая таблица загружаются с диска один раз, дальше все
+команды работают с копией в памяти. Изменения накапливаются как "грязные"
+и сбрасываются на диск при выходе, по интервалу или командой commit.
+Каждый сброс - атомарная транзакция по всем измененным файлам
+(utils.commit_changes). Между begin и commit/rollback автоматический
+сброс не выполняется, и изменения можно отменить.
+
+С одной директорией данных могут работать несколько процессов. Перед
+изменением таблицы (или метаданных) процесс захватывает ее блокировку
+записи и держит ее до сброса изменений на диск, так что изменения
+разных процессов не затирают друг друга. Читатели не блокируются: они
+видят последнее зафиксированное состояние. Копия таблицы в памяти
+перечитывается, только если отметка версии ее файлов изменилась,
+то есть другой процесс действительно зафиксировал изменения.
+"""
+
+import threading
+import time
+
+from . import utils
+from .constants import (
+    FLUSH_INTERVAL_SECONDS,
+    LOCK_TIMEOUT_ERROR,
+    LOCK_TIMEOUT_SECONDS,
+)
+
+
+class TableStore:
+    """
+    Кэш метаданных и таблиц с отслеживанием несохраненных изменений.
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL_SECONDS, on_refresh=None):
+        """
+        Args:
+            flush_interval: Интервал автоматического сброса в секундах
+                (None или 0 - только явный сброс)
+            on_refresh: Функция от имени таблицы, вызываемая, когда копия
+                таблицы устарела из-за изменений другого процесса
+        """
+        self.flush_interval = flush_interval
+        self.on_refresh = on_refresh
+        self._metadata = None
+        self._metadata_stamp = None
+        self._stamps = {}
+        # Захваченные блокировки записи: имя таблицы (None - метаданные)
+        self._write_locks = {}
+        self._write_locks_guard = threading.RLock()
+        self._metadata_dirty = False
+        self._tables = {}
+        self._pending_logs = {}
+        self._snapshot_dirty = set()
+        self._last_flush = time.monotonic()
+        self._in_transaction = False
+        self._recovered = False
+
+    @property
+    def metadata(self):
+        """
+        Метаданные БД (загружаются при первом обращении и перечитываются,
+        если их зафиксировал другой процесс).
+        """
+        if self._metadata is not None and None not in self._write_locks:
+            if utils.metadata_stamp() != self._metadata_stamp:
+                self._metadata = None
+        if self._metadata is None:
+            if not self._recovered:
+                utils.recover_transaction()
+                self._recovered = True
+            self._metadata, self._metadata_stamp = (
+                utils.load_metadata_versioned()
+            )
+        return self._metadata
+
+    def set_metadata(self, metadata):
+        """Заменяет метаданные и помечает их как измененные."""
+        self._ensure_write_lock(None)
+        self._metadata = metadata
+        self._metadata_dirty = True
+
+    def refresh(self, table_name):
+        """
+        Забывает копию таблицы, если другой процесс изменил ее файлы.
+
+        Пока процесс держит блокировку записи таблицы, другие процессы
+        изменить ее не могут, и проверка не нужна.
+
+        Args:
+            table_name: Имя таблицы
+        """
+        if table_name in self._write_locks or table_name not in self._tables:
+            return
+        if utils.table_stamp(table_name) != self._stamps.get(table_name):
+            self._tables.pop(table_name, None)
+            self._stamps.pop(table_name, None)
+            if self.on_refresh is not None:
+                self.on_refresh(table_name)
+
+    def get_table(self, table_name):
+        """
+        Возвращает данные и индексы таблицы, загружая их при первом обращении.
+
+        Returns:
+            tuple: (данные таблицы, индексы таблицы)
+        """
+        self.refresh(table_name)
+        if table_name not in self._tables:
+            table_data, indexes, stamp = utils.load_table_versioned(table_name)
+            self._tables[table_name] = (table_data, indexes)
+            self._stamps[table_name] = stamp
+        return self._tables[table_name]
+
+    def lock_for_write(self, table_name=None, metadata=False):
+        """
+        Захватывает блокировки записи таблицы и (или) метаданных до сброса.
+
+        Если блокировку держит другой процесс, собственные изменения
+        (вне транзакции) сначала сбрасываются на диск, чтобы процессы
+        не ждали друг друга по кругу. После захвата устаревшие копии
+        перечитываются с диска.
+
+        Args:
+            table_name: Имя таблицы или None
+            metadata: Захватить блокировку метаданных
+
+        Raises:
+            TimeoutError: Блокировку не удалось получить
+                за LOCK_TIMEOUT_SECONDS
+        """
+        names = [None] if metadata else []
+        if table_name is not None:
+            names.append(table_name)
+
+        with self._write_locks_guard:
+            missing = [name for name in names if name not in self._write_locks]
+            if not missing or self._acquire_write_locks(missing, timeout=0):
+                acquired = missing
+            else:
+                if not self._in_transaction:
+                    self.flush()
+                    missing = names
+                if not self._acquire_write_locks(missing, LOCK_TIMEOUT_SECONDS):
+                    raise TimeoutError(LOCK_TIMEOUT_ERROR.format(
+                        self._write_lock(missing[0]).path
+                    ))
+                acquired = missing
+
+        for name in acquired:
+            if name is None:
+                # Свежая версия загрузится при следующем обращении
+                if utils.metadata_stamp() != self._metadata_stamp:
+                    self._metadata = None
+            elif utils.table_stamp(name) != self._stamps.get(name):
+                self._tables.pop(name, None)
+                if self.on_refresh is not None:
+                    self.on_refresh(name)
+
+    @staticmethod
+    def _write_lock(name):
+        if name is None:
+            return utils.metadata_write_lock()
+        return utils.table_write_lock(name)
+
+    def _acquire_write_locks(self, names, timeout):
+        """Захватывает блокировки записи; при неудаче отпускает захваченные."""
+        acquired = []
+        for name in names:
+            lock = self._write_lock(name)
+            if not lock.acquire(exclusive=True, timeout=timeout):
+                for taken in acquired:
+                    self._write_locks.pop(taken).release(exclusive=True)
+                return False
+            self._write_locks[name] = lock
+            acquired.append(name)
+        return True
+
+    def _ensure_write_lock(self, name):
+        """Захватывает блокировку записи перед изменением, если ее еще нет."""
+        if name not in self._write_locks:
+            with self._write_locks_guard:
+                if name not in self._write_locks:
+                    if not self._acquire_write_locks([name], LOCK_TIMEOUT_SECONDS):
+                        raise TimeoutError(LOCK_TIMEOUT_ERROR.format(
+                            self._write_lock(name).path
+                        ))
+
+    def _release_write_locks(self):
+        """Отпускает все блокировки записи."""
+        with self._write_locks_guard:
+            for lock in self._write_locks.values():
+                lock.release(exclusive=True)
+            self._write_locks.clear()
+
+    def set_table(self, table_name, table_data):
+        """Заменяет данные таблицы в памяти, сохраняя ее индексы."""
+        _, indexes = self.get_table(table_name)
+        self._tables[table_name] = (table_data, indexes)
+
+    def log(self, table_name, entries):
+        """
+        Регистрирует изменения таблицы для записи в журнал при сбросе.
+
+        Args:
+            table_name: Имя таблицы
+            entries: Записи журнала
+        """
+        self._ensure_write_lock(table_name)
+        if table_name in self._snapshot_dirty:
+            return
+        self._pending_logs.setdefault(table_name, []).extend(entries)
+
+    def replace_table(self, table_name, table_data, indexes):
+        """
+        Заменяет таблицу целиком; при сбросе будет записан новый снимок.
+
+        Args:
+            table_name: Имя таблицы
+            table_data: Данные таблицы
+            indexes: Индексы таблицы
+        """
+        self._ensure_write_lock(table_name)
+        self._tables[table_name] = (table_data, indexes)
+        self._pending_logs.pop(table_name, None)
+        self._snapshot_dirty.add(table_name)
+
+    def evict(self, table_name):
+        """Убирает таблицу из памяти вместе с несохраненными изменениями."""
+        self._tables.pop(table_name, None)
+        self._stamps.pop(table_name, None)
+        self._pending_logs.pop(table_name, None)
+        self._snapshot_dirty.discard(table_name)
+
+    @property
+    def dirty(self):
+        """Есть ли несохраненные изменения."""
+        return bool(
+            self._metadata_dirty or self._pending_logs or self._snapshot_dirty
+        )
+
+    @property
+    def in_transaction(self):
+        """Открыта ли транзакция командой begin."""
+        return self._in_transaction
+
+    def begin(self):
+        """
+        Открывает транзакцию: сбрасывает прежние изменения на диск
+        и откладывает сброс новых до commit.
+        """
+        self.flush()
+        self._in_transaction = True
+
+    def commit(self):
+        """Фиксирует изменения (и закрывает транзакцию, если она открыта)."""
+        self.flush()
+        self._in_transaction = False
+
+    def rollback(self):
+        """
+        Отменяет изменения транзакции.
+        
+        На диске лежит состояние на момент begin, поэтому данные в памяти
+        отбрасываются и загрузятся заново при следующем обращении.
+        """
+        self._metadata = None
+        self._metadata_dirty = False
+        self._tables.clear()
+        self._stamps.clear()
+        self._pending_logs.clear()
+        self._snapshot_dirty.clear()
+        self._in_transaction = False
+        self._release_write_locks()
+
+    def flush(self):
+        """
+        Атомарно сбрасывает все несохраненные изменения на диск
+        и отпускает блокировки записи.
+        """
+        if self.dirty:
+            utils.commit_changes(
+                metadata=self._metadata if self._metadata_dirty else None,
+                snapshots={
+                    table_name: self._tables[table_name]
+                    for table_name in self._snapshot_dirty
+                },
+                logs=self._pending_logs,
+            )
+            # Свои изменения не должны вызывать перечитывание
+            if self._metadata_dirty:
+                self._metadata_stamp = utils.metadata_stamp()
+            for table_name in {*self._snapshot_dirty, *self._pending_logs}:
+                self._stamps[table_name] = utils.table_stamp(table_name)
+            self._metadata_dirty = False
+            self._snapshot_dirty.clear()
+            self._pending_logs.clear()
+
+        self._release_write_locks()
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        """
+        Сбрасывает изменения, если истек интервал автоматического сброса.
+
+        Блокировки записи, за которыми не осталось изменений (команда
+        завершилась ошибкой), отпускаются сразу.
+        """
+        if self._in_transaction:
+            return
+        if not self.dirty:
+            if self._write_locks:
+                self._release_write_locks()
+            return
+        if not self.flush_interval:
+            return
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
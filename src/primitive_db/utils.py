@@ -3,14 +3,39 @@
 Вспомогательные функции для работы с файлами.
 """
 
+import csv
 import json
 import os
 
+from . import index, metrics
+from .columnar import ColumnarTable
 from .constants import (
+    BINARY_FILE_SUFFIX,
+    CSV_EXTENSION,
     DATA_DIR,
     DEFAULT_ENCODING,
+    INDEX_FILE_SUFFIX,
+    JSONL_EXTENSION,
+    LOCK_DIR,
+    LOCK_FILE_SUFFIX,
+    LOG_FILE_SUFFIX,
+    LOG_OP_DELETE,
+    LOG_OP_INSERT,
+    LOG_OP_INSERT_MANY,
+    LOG_OP_UPDATE,
+    META_COLUMNS_KEY,
     META_FILE,
+    METRIC_BYTES_MAPPED,
+    METRIC_BYTES_READ,
+    METRIC_BYTES_WRITTEN,
+    TEMP_FILE_SUFFIX,
+    TRANSACTION_FILE_SUFFIX,
+    TRANSACTION_JOURNAL_FILE,
+    TRANSACTION_LOCK_FILE,
+    WAL_COMPACT_THRESHOLD,
+    WRITE_LOCK_FILE_SUFFIX,
 )
+from .locks import FileLock
 
 
 def load_metadata(filepath=META_FILE):
@@ -25,9 +50,116 @@ def load_metadata(filepath=META_FILE):
     """
     try:
         with open(filepath, 'r', encoding=DEFAULT_ENCODING) as f:
-            return json.load(f)
+            metadata = json.load(f)
     except FileNotFoundError:
         return {}
+    metrics.add_file_size(METRIC_BYTES_READ, filepath)
+    
+    # Старый формат: {таблица: [столбцы]} без счетчика ID
+    for table_name, table_meta in metadata.items():
+        if isinstance(table_meta, list):
+            metadata[table_name] = {META_COLUMNS_KEY: table_meta}
+    
+    return metadata
+
+
+def load_metadata_versioned(filepath=META_FILE):
+    """
+    Загружает метаданные под разделяемой блокировкой.
+    
+    Args:
+        filepath: Путь к файлу с метаданными
+        
+    Returns:
+        tuple: (метаданные, отметка версии файла metadata_stamp)
+    """
+    with metadata_lock(filepath).hold():
+        return load_metadata(filepath), metadata_stamp(filepath)
+
+
+def metadata_lock(filepath=META_FILE):
+    """Блокировка чтения (разделяемая) и фиксации (монопольная) метаданных."""
+    return FileLock.for_path(f"{filepath}{LOCK_FILE_SUFFIX}")
+
+
+def metadata_write_lock(filepath=META_FILE):
+    """Блокировка записи метаданных: держится до сброса изменений на диск."""
+    return FileLock.for_path(f"{filepath}{WRITE_LOCK_FILE_SUFFIX}")
+
+
+def _lock_path(name, data_dir=DATA_DIR):
+    """
+    Путь к файлу-замку в отдельной директории замков.
+    
+    Замки не лежат рядом с файлами таблиц: они остаются после drop_table
+    (удалять файл, на который другой процесс мог взять flock, небезопасно)
+    и не засоряют директорию данных.
+    """
+    return os.path.join(data_dir, LOCK_DIR, name)
+
+
+def table_lock(table_name, data_dir=DATA_DIR):
+    """Блокировка чтения (разделяемая) и фиксации (монопольная) таблицы."""
+    return FileLock.for_path(
+        _lock_path(f"{table_name}{LOCK_FILE_SUFFIX}", data_dir)
+    )
+
+
+def table_write_lock(table_name, data_dir=DATA_DIR):
+    """Блокировка записи таблицы: держится до сброса изменений на диск."""
+    return FileLock.for_path(
+        _lock_path(f"{table_name}{WRITE_LOCK_FILE_SUFFIX}", data_dir)
+    )
+
+
+def _transaction_lock(data_dir=DATA_DIR):
+    """Блокировка журнала транзакций: фиксации выполняются по очереди."""
+    return FileLock.for_path(_lock_path(TRANSACTION_LOCK_FILE, data_dir))
+
+
+def _file_stamp(filepath):
+    """Время изменения, размер и inode файла (None, если файла нет)."""
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def metadata_stamp(filepath=META_FILE):
+    """
+    Отметка версии метаданных: меняется при каждой фиксации изменений.
+    
+    Args:
+        filepath: Путь к файлу с метаданными
+        
+    Returns:
+        tuple: Отметка файла метаданных
+    """
+    return _file_stamp(filepath)
+
+
+def table_stamp(table_name, data_dir=DATA_DIR):
+    """
+    Отметка версии таблицы по ее снимку, индексам и журналу.
+    
+    Любая фиксация меняет хотя бы один из файлов (снимок заменяется
+    переименованием, журнал дописывается), поэтому совпадение отметок
+    означает, что таблицу никто не менял.
+    
+    Args:
+        table_name: Имя таблицы
+        data_dir: Директория с данными
+        
+    Returns:
+        tuple: Отметки файлов таблицы
+    """
+    return tuple(
+        _file_stamp(os.path.join(data_dir, f"{table_name}{suffix}"))
+        for suffix in (
+            ".json", BINARY_FILE_SUFFIX, INDEX_FILE_SUFFIX, LOG_FILE_SUFFIX,
+        )
+    )
 
 
 def save_metadata(data, filepath=META_FILE):
@@ -38,13 +170,12 @@ def save_metadata(data, filepath=META_FILE):
         data: Данные для сохранения
         filepath: Путь к файлу для сохранения
     """
-    with open(filepath, 'w', encoding=DEFAULT_ENCODING) as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    atomic_write(filepath, _json_writer(data, indent=2))
 
 
 def load_table_data(table_name, data_dir=DATA_DIR):
     """
-    Загружает данные таблицы из JSON-файла.
+    Загружает данные таблицы: снимок из JSON-файла и записи журнала.
     
     Args:
         table_name: Имя таблицы
@@ -53,29 +184,574 @@ def load_table_data(table_name, data_dir=DATA_DIR):
     Returns:
         list: Данные таблицы или пустой список
     """
-    # Создаем директорию если не существует
-    os.makedirs(data_dir, exist_ok=True)
+    table_data, _ = load_table(table_name, data_dir)
+    return table_data
+
+
+def save_table_data(table_name, data, data_dir=DATA_DIR):
+    """
+    Сохраняет снимок данных таблицы и очищает журнал.
     
-    filepath = os.path.join(data_dir, f"{table_name}.json")
+    Таблицы BinaryTable пишутся в бинарный формат, остальные - в JSON.
+    
+    Args:
+        table_name: Имя таблицы
+        data: Данные для сохранения
+        data_dir: Директория с данными
+    """
+    commit_changes(snapshots={table_name: (data, None)}, data_dir=data_dir)
+
+
+def _snapshot_writer(data):
+    """Возвращает функцию записи снимка таблицы в JSON-файл."""
+    if isinstance(data, ColumnarTable):
+        # Столбцы пишутся компактно, по строке на столбец не разбиваются
+        return _json_writer(data.to_dict(), separators=(',', ':'))
+    return _json_writer(data, indent=2)
+
+
+def _json_writer(data, **dump_options):
+    """Возвращает функцию, записывающую data в открытый файл как JSON."""
+    def write(f):
+        json.dump(data, f, ensure_ascii=False, **dump_options)
+    return write
+
+
+def write_durable(filepath, write):
+    """
+    Записывает файл и дожидается его сохранения на диск (fsync).
+    
+    Args:
+        filepath: Путь к файлу
+        write: Функция, записывающая содержимое в открытый файл
+    """
+    with open(filepath, 'w', encoding=DEFAULT_ENCODING) as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    metrics.add_file_size(METRIC_BYTES_WRITTEN, filepath)
+
+
+def atomic_write(filepath, write):
+    """
+    Атомарно заменяет файл: временный файл, fsync и переименование.
+    
+    При сбое во время записи на диске остается прежняя версия файла.
+    
+    Args:
+        filepath: Путь к файлу
+        write: Функция, записывающая содержимое в открытый файл
+    """
+    tmp_path = f"{filepath}{TEMP_FILE_SUFFIX}"
+    write_durable(tmp_path, write)
+    os.replace(tmp_path, filepath)
+    _fsync_dir(filepath)
+
+
+def _fsync_dir(filepath):
+    """Сохраняет на диск запись каталога (результат переименования)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(filepath) or ".", os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def load_indexes(table_name, data_dir=DATA_DIR):
+    """
+    Загружает хеш-индексы таблицы из JSON-файла.
+    
+    Args:
+        table_name: Имя таблицы
+        data_dir: Директория с данными
+        
+    Returns:
+        dict: Индексы {столбец: {ключ: [позиции]}} или пустой словарь
+    """
+    filepath = os.path.join(data_dir, f"{table_name}{INDEX_FILE_SUFFIX}")
     try:
         with open(filepath, 'r', encoding=DEFAULT_ENCODING) as f:
-            return json.load(f)
+            indexes = json.load(f)
     except FileNotFoundError:
-        return []
+        return {}
+    metrics.add_file_size(METRIC_BYTES_READ, filepath)
+    return indexes
 
 
-def save_table_data(table_name, data, data_dir=DATA_DIR):
+def save_indexes(table_name, indexes, data_dir=DATA_DIR):
     """
-    Сохраняет данные таблицы в JSON-файл.
+    Сохраняет хеш-индексы таблицы рядом с файлом данных.
+    
+    Индексы пишутся компактно: их не редактируют вручную.
+    
+    Args:
+        table_name: Имя таблицы
+        indexes: Индексы для сохранения
+        data_dir: Директория с данными
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    
+    filepath = os.path.join(data_dir, f"{table_name}{INDEX_FILE_SUFFIX}")
+    atomic_write(filepath, _json_writer(indexes, separators=(',', ':')))
+
+
+def load_table(table_name, data_dir=DATA_DIR):
+    """
+    Загружает снимок таблицы и ее индексы, затем проигрывает журнал.
     
     Args:
         table_name: Имя таблицы
-        data: Данные для сохранения
         data_dir: Директория с данными
+        
+    Returns:
+        tuple: (данные таблицы, индексы таблицы)
+    """
+    table_data, indexes, _ = load_table_versioned(table_name, data_dir)
+    return table_data, indexes
+
+
+def load_table_versioned(table_name, data_dir=DATA_DIR):
+    """
+    Загружает таблицу под разделяемой блокировкой вместе с отметкой версии.
+    
+    Если журнал разросся больше WAL_COMPACT_THRESHOLD записей,
+    таблица автоматически уплотняется в новый снимок - только если
+    с момента чтения ее не изменил другой процесс.
+    
+    Args:
+        table_name: Имя таблицы
+        data_dir: Директория с данными
+        
+    Returns:
+        tuple: (данные таблицы, индексы таблицы, отметка table_stamp)
     """
     # Создаем директорию если не существует
     os.makedirs(data_dir, exist_ok=True)
     
+    with table_lock(table_name, data_dir).hold():
+        stamp = table_stamp(table_name, data_dir)
+        table_data, indexes, entries = _read_table(table_name, data_dir)
+    
+    if len(entries) >= WAL_COMPACT_THRESHOLD:
+        with _transaction_lock(data_dir).hold(exclusive=True):
+            if table_stamp(table_name, data_dir) == stamp:
+                save_table(table_name, table_data, indexes, data_dir)
+                stamp = table_stamp(table_name, data_dir)
+    
+    return table_data, indexes, stamp
+
+
+def _read_table(table_name, data_dir):
+    """
+    Читает снимок, индексы и журнал таблицы и проигрывает журнал.
+    
+    Returns:
+        tuple: (данные таблицы, индексы таблицы, записи журнала)
+    """
     filepath = os.path.join(data_dir, f"{table_name}.json")
-    with open(filepath, 'w', encoding=DEFAULT_ENCODING) as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
\ No newline at end of file
+    binary_path = os.path.join(data_dir, f"{table_name}{BINARY_FILE_SUFFIX}")
+    if os.path.exists(binary_path):
+        from .binary import BinaryTable
+        
+        # Данные не читаются: столбцы отображаются на файл через mmap
+        table_data = BinaryTable.open(binary_path)
+        metrics.add_file_size(METRIC_BYTES_MAPPED, binary_path)
+    else:
+        try:
+            with open(filepath, 'r', encoding=DEFAULT_ENCODING) as f:
+                table_data = json.load(f)
+            metrics.add_file_size(METRIC_BYTES_READ, filepath)
+        except FileNotFoundError:
+            table_data = []
+    
+    if isinstance(table_data, dict):
+        table_data = ColumnarTable.from_dict(table_data)
+    
+    indexes = load_indexes(table_name, data_dir)
+    entries = read_table_log(table_name, data_dir)
+    if entries:
+        table_data = replay_log(table_data, indexes, entries)
+    
+    return table_data, indexes, entries
+
+
+def save_table(table_name, table_data, indexes, data_dir=DATA_DIR):
+    """
+    Уплотняет таблицу: пишет снимок данных и индексов, очищает журнал.
+    
+    Args:
+        table_name: Имя таблицы
+        table_data: Данные таблицы
+        indexes: Индексы таблицы
+        data_dir: Директория с данными
+    """
+    commit_changes(
+        snapshots={table_name: (table_data, indexes)}, data_dir=data_dir
+    )
+
+
+def append_table_log(table_name, entries, data_dir=DATA_DIR):
+    """
+    Дописывает записи в журнал таблицы (по одной JSON-строке на запись).
+    
+    Args:
+        table_name: Имя таблицы
+        entries: Список записей журнала
+        data_dir: Директория с данными
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    
+    log_path = os.path.join(data_dir, f"{table_name}{LOG_FILE_SUFFIX}")
+    _append_log_entries(log_path, entries)
+
+
+def _append_log_entries(log_path, entries, offset=None):
+    """
+    Дописывает записи в файл журнала и сохраняет его на диск.
+    
+    Args:
+        log_path: Путь к журналу
+        entries: Записи журнала
+        offset: Длина журнала до дописывания; более длинный журнал
+            сначала обрезается до нее (повторное применение транзакции)
+    """
+    lines = [
+        json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n"
+        for entry in entries
+    ]
+    with open(log_path, 'a', encoding=DEFAULT_ENCODING) as f:
+        if offset is not None and f.tell() > offset:
+            f.truncate(offset)
+        f.writelines(lines)
+        f.flush()
+        os.fsync(f.fileno())
+    if metrics.is_enabled():
+        metrics.add(
+            METRIC_BYTES_WRITTEN, sum(len(line.encode()) for line in lines)
+        )
+
+
+def _log_size(log_path):
+    """Текущая длина журнала в байтах (0, если журнала нет)."""
+    try:
+        return os.path.getsize(log_path)
+    except FileNotFoundError:
+        return 0
+
+
+def commit_changes(metadata=None, snapshots=None, logs=None,
+                   data_dir=DATA_DIR, meta_path=META_FILE):
+    """
+    Атомарно сохраняет изменения нескольких таблиц и метаданных.
+    
+    Новые снимки и метаданные сначала пишутся во временные файлы
+    с fsync. Затем атомарно записывается журнал транзакции со списком
+    действий: переименования, удаления и дописывания в журналы таблиц
+    (с исходной длиной журнала). Запись журнала транзакции и есть
+    момент фиксации. После применения действий он удаляется; если
+    процесс упадет раньше, recover_transaction применит его повторно.
+    
+    Фиксации разных процессов выполняются по очереди, а файлы
+    затронутых таблиц и метаданных на время применения блокируются
+    монопольно, чтобы читатели не увидели транзакцию наполовину.
+    
+    Args:
+        metadata: Метаданные для сохранения или None
+        snapshots: {таблица: (данные, индексы или None)} - полные снимки
+        logs: {таблица: [записи журнала]} - дописывание в журналы
+        data_dir: Директория с данными
+        meta_path: Путь к файлу метаданных
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    snapshots = snapshots or {}
+    logs = logs or {}
+    if metadata is None and not snapshots and not logs:
+        return
+    
+    with _transaction_lock(data_dir).hold(exclusive=True):
+        renames, removes = _stage_changes(
+            metadata, snapshots, data_dir, meta_path
+        )
+        
+        locks = [table_lock(name, data_dir) for name in sorted({*snapshots, *logs})]
+        if metadata is not None:
+            locks.append(metadata_lock(meta_path))
+        for lock in locks:
+            lock.acquire(exclusive=True)
+        try:
+            appends = []
+            for table_name, entries in logs.items():
+                log_path = os.path.join(
+                    data_dir, f"{table_name}{LOG_FILE_SUFFIX}"
+                )
+                appends.append([log_path, _log_size(log_path), entries])
+            
+            journal = {
+                "renames": renames, "removes": removes, "appends": appends,
+                "locks": [lock.path for lock in locks],
+            }
+            journal_path = os.path.join(data_dir, TRANSACTION_JOURNAL_FILE)
+            atomic_write(
+                journal_path, _json_writer(journal, separators=(',', ':'))
+            )
+            _apply_journal(journal)
+            os.remove(journal_path)
+        finally:
+            for lock in locks:
+                lock.release(exclusive=True)
+
+
+def _stage_changes(metadata, snapshots, data_dir, meta_path):
+    """
+    Пишет новые метаданные и снимки во временные файлы транзакции.
+    
+    Returns:
+        tuple: (переименования [временный, целевой], удаляемые файлы)
+    """
+    renames = []
+    removes = []
+    
+    if metadata is not None:
+        staged = f"{meta_path}{TRANSACTION_FILE_SUFFIX}"
+        write_durable(staged, _json_writer(metadata, indent=2))
+        renames.append([staged, meta_path])
+    
+    if snapshots:
+        from .binary import BinaryTable, write_table
+    
+    for table_name, (table_data, indexes) in snapshots.items():
+        json_path = os.path.join(data_dir, f"{table_name}.json")
+        binary_path = os.path.join(data_dir, f"{table_name}{BINARY_FILE_SUFFIX}")
+        
+        # Снимок хранится ровно в одном формате
+        if isinstance(table_data, BinaryTable):
+            target, stale_path = binary_path, json_path
+            write_table(f"{target}{TRANSACTION_FILE_SUFFIX}", table_data)
+            metrics.add_file_size(
+                METRIC_BYTES_WRITTEN, f"{target}{TRANSACTION_FILE_SUFFIX}"
+            )
+        else:
+            target, stale_path = json_path, binary_path
+            write_durable(
+                f"{target}{TRANSACTION_FILE_SUFFIX}",
+                _snapshot_writer(table_data),
+            )
+        renames.append([f"{target}{TRANSACTION_FILE_SUFFIX}", target])
+        
+        if indexes is not None:
+            index_path = os.path.join(
+                data_dir, f"{table_name}{INDEX_FILE_SUFFIX}"
+            )
+            write_durable(
+                f"{index_path}{TRANSACTION_FILE_SUFFIX}",
+                _json_writer(indexes, separators=(',', ':')),
+            )
+            renames.append([f"{index_path}{TRANSACTION_FILE_SUFFIX}", index_path])
+        
+        # Снимок уже содержит все изменения из журнала
+        removes.append(stale_path)
+        removes.append(
+            os.path.join(data_dir, f"{table_name}{LOG_FILE_SUFFIX}")
+        )
+    
+    return renames, removes
+
+
+def _apply_journal(journal):
+    """Применяет действия журнала транзакции (повторно - без вреда)."""
+    for staged, target in journal["renames"]:
+        if os.path.exists(staged):
+            os.replace(staged, target)
+            _fsync_dir(target)
+    
+    for path in journal["removes"]:
+        if os.path.exists(path):
+            os.remove(path)
+    
+    for log_path, offset, entries in journal["appends"]:
+        _append_log_entries(log_path, entries, offset)
+
+
+def recover_transaction(data_dir=DATA_DIR, meta_path=META_FILE):
+    """
+    Завершает транзакцию, прерванную сбоем, и убирает временные файлы.
+    
+    Если журнал транзакции записан, транзакция зафиксирована, и ее
+    действия применяются заново. Временные файлы без журнала остались
+    от незафиксированной транзакции и удаляются. Пока восстановление
+    идет, другие процессы не могут начать фиксацию.
+    
+    Args:
+        data_dir: Директория с данными
+        meta_path: Путь к файлу метаданных
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    
+    with _transaction_lock(data_dir).hold(exclusive=True):
+        journal_path = os.path.join(data_dir, TRANSACTION_JOURNAL_FILE)
+        if os.path.exists(journal_path):
+            with open(journal_path, 'r', encoding=DEFAULT_ENCODING) as f:
+                journal = json.load(f)
+            locks = [FileLock.for_path(path) for path in journal.get("locks", [])]
+            for lock in locks:
+                lock.acquire(exclusive=True)
+            try:
+                _apply_journal(journal)
+                os.remove(journal_path)
+            finally:
+                for lock in locks:
+                    lock.release(exclusive=True)
+        
+        leftovers = [f"{meta_path}{TRANSACTION_FILE_SUFFIX}"]
+        leftovers.extend(
+            os.path.join(data_dir, name) for name in os.listdir(data_dir)
+            if name.endswith((TRANSACTION_FILE_SUFFIX, TEMP_FILE_SUFFIX))
+        )
+        for path in leftovers:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def read_table_log(table_name, data_dir=DATA_DIR):
+    """
+    Читает журнал таблицы.
+    
+    Недописанная последняя строка (сбой во время записи) пропускается.
+    
+    Args:
+        table_name: Имя таблицы
+        data_dir: Директория с данными
+        
+    Returns:
+        list: Записи журнала
+    """
+    log_path = os.path.join(data_dir, f"{table_name}{LOG_FILE_SUFFIX}")
+    entries = []
+    try:
+        with open(log_path, 'r', encoding=DEFAULT_ENCODING) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+    except FileNotFoundError:
+        return entries
+    metrics.add_file_size(METRIC_BYTES_READ, log_path)
+    return entries
+
+
+def replay_log(table_data, indexes, entries):
+    """
+    Применяет записи журнала к данным таблицы и индексам.
+    
+    Args:
+        table_data: Данные снимка таблицы
+        indexes: Индексы снимка, обновляются на месте
+        entries: Записи журнала
+        
+    Returns:
+        list: Данные таблицы после применения журнала
+    """
+    positions = None
+    
+    for entry in entries:
+        op = entry.get("op")
+        
+        if op == LOG_OP_INSERT:
+            table_data.append(entry["record"])
+            if positions is not None:
+                positions[entry["record"]["ID"]] = len(table_data) - 1
+            if indexes:
+                index.add_record(indexes, entry["record"], len(table_data) - 1)
+        
+        elif op == LOG_OP_INSERT_MANY:
+            start_position = len(table_data)
+            table_data.extend(entry["records"])
+            for position in range(start_position, len(table_data)):
+                record = table_data[position]
+                if positions is not None:
+                    positions[record["ID"]] = position
+                if indexes:
+                    index.add_record(indexes, record, position)
+        
+        elif op == LOG_OP_UPDATE:
+            if positions is None:
+                positions = {
+                    record["ID"]: position
+                    for position, record in enumerate(table_data)
+                }
+            for record_id in entry["ids"]:
+                position = positions.get(record_id)
+                if position is None:
+                    continue
+                record = table_data[position]
+                for column, value in entry["set"].items():
+                    if indexes:
+                        index.move_record(
+                            indexes, column, position,
+                            record.get(column, ""), value
+                        )
+                    record[column] = value
+        
+        elif op == LOG_OP_DELETE:
+            removed = set(entry["ids"])
+            if isinstance(table_data, ColumnarTable):
+                table_data = table_data.without_positions({
+                    position
+                    for position, record_id in enumerate(table_data.columns["ID"])
+                    if record_id in removed
+                })
+            else:
+                table_data = [
+                    record for record in table_data
+                    if record["ID"] not in removed
+                ]
+            positions = None
+            if indexes:
+                index.rebuild_indexes(indexes, table_data)
+    
+    return table_data
+
+
+def load_rows_file(filepath, column_names):
+    """
+    Читает строки для массовой вставки из CSV или JSONL файла.
+    
+    В CSV первая строка пропускается, если совпадает с именами столбцов.
+    В JSONL каждая строка - JSON-массив значений или объект {столбец: значение}.
+    
+    Args:
+        filepath: Путь к файлу
+        column_names: Имена столбцов таблицы без ID
+        
+    Returns:
+        list: Строки - списки значений в порядке столбцов
+        
+    Raises:
+        ValueError: Неподдерживаемое расширение файла
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+    metrics.add_file_size(METRIC_BYTES_READ, filepath)
+    
+    if extension == CSV_EXTENSION:
+        with open(filepath, 'r', encoding=DEFAULT_ENCODING, newline='') as f:
+            rows = list(csv.reader(f))
+        if rows and [value.strip() for value in rows[0]] == column_names:
+            rows = rows[1:]
+        return rows
+    
+    if extension == JSONL_EXTENSION:
+        rows = []
+        with open(filepath, 'r', encoding=DEFAULT_ENCODING) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if isinstance(row, dict):
+                    row = [row.get(name) for name in column_names]
+                rows.append(row)
+        return rows
+    
+    raise ValueError(extension)
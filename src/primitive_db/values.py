@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Приведение значений к типам столбцов.
+"""
+
+from .constants import BOOLEAN_FALSE_VALUES, BOOLEAN_TRUE_VALUES
+
+
+def convert_int(value):
+    """Приводит значение к int."""
+    return int(value)
+
+
+def convert_str(value):
+    """Приводит значение к str, убирая обрамляющие кавычки."""
+    if isinstance(value, str) and (
+        (value.startswith('"') and value.endswith('"')) or
+        (value.startswith("'") and value.endswith("'"))
+    ):
+        return value[1:-1]
+    return str(value)
+
+
+def convert_bool(value):
+    """Приводит значение к bool или выбрасывает ValueError."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        if value.lower() in BOOLEAN_TRUE_VALUES:
+            return True
+        if value.lower() in BOOLEAN_FALSE_VALUES:
+            return False
+        raise ValueError(value)
+    if isinstance(value, int):
+        return bool(value)
+    raise TypeError(value)
+
+
+CONVERTERS = {
+    "int": convert_int,
+    "str": convert_str,
+    "bool": convert_bool,
+}
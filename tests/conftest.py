@@ -0,0 +1,33 @@
+"""
+Общие фикстуры тестов: база данных во временной директории.
+"""
+
+import pytest
+
+from src.primitive_db import engine
+from src.primitive_db.decorators import create_cacher
+
+
+@pytest.fixture
+def run_db(tmp_path, monkeypatch, capsys):
+    """
+    Выполняет команды пакетно в пустой временной директории.
+
+    Кэш запросов создается заново для каждого теста, чтобы результаты
+    одного теста не попадали в другой.
+
+    Returns:
+        callable: run(*команды) -> вывод команд
+    """
+    monkeypatch.chdir(tmp_path)
+    cache_result, clear_table_cache, cache_stats = create_cacher()
+    monkeypatch.setattr(engine, "cache_result", cache_result)
+    monkeypatch.setattr(engine, "clear_table_cache", clear_table_cache)
+    monkeypatch.setattr(engine, "cache_stats", cache_stats)
+
+    def run(*commands):
+        capsys.readouterr()
+        engine.run_script(commands)
+        return capsys.readouterr().out
+
+    return run
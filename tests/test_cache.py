@@ -0,0 +1,85 @@
+"""
+Тесты LRU-кэша результатов запросов (decorators.create_cacher).
+"""
+
+from src.primitive_db import engine
+from src.primitive_db.decorators import create_cacher
+
+
+def counted(count, produced):
+    """Генератор записей, считающий выданные записи в produced."""
+    for i in range(count):
+        produced.append(i)
+        yield {"ID": i}
+
+
+def test_small_result_is_cached():
+    cache_result, _, cache_stats = create_cacher(max_rows=10)
+    produced = []
+
+    first = list(cache_result("t", "k", lambda: counted(5, produced)))
+    second = cache_result("t", "k", lambda: counted(5, produced))
+
+    assert second == first
+    assert len(produced) == 5
+    assert cache_stats()["hits"] == 1
+    assert cache_stats()["rows"] == 5
+
+
+def test_large_result_is_streamed_and_not_cached():
+    cache_result, _, cache_stats = create_cacher(max_rows=10)
+    produced = []
+
+    result = cache_result("t", "k", lambda: counted(1000, produced))
+    # Записи читаются по мере перебора, а не собираются заранее
+    assert next(result) == {"ID": 0}
+    assert len(produced) == 1
+
+    assert len(list(result)) == 999
+    assert cache_stats()["entries"] == 0
+    assert cache_stats()["rows"] == 0
+
+    cache_result("t", "k", lambda: counted(1000, produced))
+    assert cache_stats()["hits"] == 0
+    assert cache_stats()["misses"] == 2
+
+
+def test_large_result_stops_buffering():
+    cache_result, _, _ = create_cacher(max_rows=10)
+    result = cache_result("t", "k", lambda: counted(1000, []))
+    # Буфер для кэша отбрасывается, когда записей больше max_rows
+    for _ in range(12):
+        next(result)
+    assert result.gi_frame.f_locals["rows"] is None
+
+
+def test_partially_read_result_is_not_cached():
+    cache_result, _, cache_stats = create_cacher(max_rows=10)
+    result = cache_result("t", "k", lambda: counted(5, []))
+    next(result)
+    result.close()
+    assert cache_stats()["entries"] == 0
+
+
+def test_failed_result_is_not_cached():
+    cache_result, _, cache_stats = create_cacher(max_rows=10)
+
+    class Failed(list):
+        failed = True
+
+    assert list(cache_result("t", "k", lambda: Failed([{"ID": 1}]))) == [
+        {"ID": 1}
+    ]
+    assert cache_stats()["entries"] == 0
+
+
+def test_select_where_result_is_cached(run_db):
+    run_db("create_table users x:int")
+    run_db(*(f"insert into users values ({i})" for i in range(5)))
+
+    first = run_db("select from users where x >= 3")
+    second = run_db("select from users where x >= 3")
+
+    assert first == second
+    assert engine.cache_stats()["hits"] == 1
+    assert engine.cache_stats()["rows"] == 2
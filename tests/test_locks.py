@@ -0,0 +1,30 @@
+"""
+Тесты размещения файлов-замков.
+"""
+
+import os
+
+from src.primitive_db.constants import (
+    DATA_DIR,
+    LOCK_DIR,
+    LOCK_FILE_SUFFIX,
+    WRITE_LOCK_FILE_SUFFIX,
+)
+
+
+def test_lock_files_are_kept_out_of_data_dir(run_db):
+    run_db(
+        "create_table users x:int",
+        "insert into users values (1)",
+        "update users set x = 2 where x = 1",
+        "begin",
+        "insert into users values (3)",
+        "commit",
+        "drop_table users",
+    )
+
+    lock_suffixes = (LOCK_FILE_SUFFIX, WRITE_LOCK_FILE_SUFFIX)
+    assert not [
+        name for name in os.listdir(DATA_DIR) if name.endswith(lock_suffixes)
+    ]
+    assert os.listdir(os.path.join(DATA_DIR, LOCK_DIR))
@@ -0,0 +1,55 @@
+"""
+Тесты порядка записей с равными ключами в order by.
+"""
+
+import pytest
+
+from src.primitive_db import core, index
+
+# Ключи с повторами: позиции 0..7
+AGES = [30, 20, 30, 10, 20, 30, 10, 20]
+
+
+def make_table():
+    return [{"ID": i + 1, "age": age} for i, age in enumerate(AGES)]
+
+
+def ordered_ids(table_data, indexes, descending, limit=None, where=None):
+    result = core.select(
+        table_data, where, indexes, limit=limit,
+        order_by=("age", descending),
+    )
+    return [record["ID"] for record in result]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("limit", [None, 3, 5])
+def test_index_and_heap_agree_on_ties(descending, limit):
+    table_data = make_table()
+    indexes = {"age": index.build_sorted_index(table_data, "age")}
+
+    with_index = ordered_ids(table_data, indexes, descending, limit)
+    without_index = ordered_ids(table_data, {}, descending, limit)
+
+    assert with_index == without_index
+
+
+def test_descending_ties_keep_insertion_order():
+    table_data = make_table()
+    indexes = {"age": index.build_sorted_index(table_data, "age")}
+
+    assert ordered_ids(table_data, indexes, True) == [1, 3, 6, 2, 5, 8, 4, 7]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_ties_after_update_keep_insertion_order(descending):
+    table_data = make_table()
+    indexes = {"age": index.build_sorted_index(table_data, "age")}
+    # Запись с позицией 0 переходит в группу 20 уже после 2, 5 и 8
+    index.move_record(indexes, "age", 0, 30, 20)
+    table_data[0]["age"] = 20
+
+    assert (
+        ordered_ids(table_data, indexes, descending)
+        == ordered_ids(table_data, {}, descending)
+    )
@@ -0,0 +1,34 @@
+"""
+Тесты потокового вывода select.
+"""
+
+from src.primitive_db import core, engine
+
+
+def test_select_where_is_streamed_to_printer(run_db, monkeypatch):
+    run_db("create_table users x:int")
+    run_db(*(f"insert into users values ({i})" for i in range(5)))
+
+    scanned = []
+    select = core.select
+
+    def counting_select(*args, **kwargs):
+        for record in select(*args, **kwargs):
+            scanned.append(record)
+            yield record
+
+    printed = []
+
+    def print_first(records):
+        records = iter(records)
+        next(records)
+        # Первая запись печатается до окончания сканирования
+        printed.append(len(scanned))
+        printed.extend(record["x"] for record in records)
+
+    monkeypatch.setattr(core, "select", counting_select)
+    monkeypatch.setattr(engine, "print_table_as_prettytable", print_first)
+
+    run_db("select from users where x >= 1")
+
+    assert printed == [1, 2, 3, 4]
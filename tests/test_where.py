@@ -0,0 +1,44 @@
+"""
+Тесты разбора условий WHERE в select.
+"""
+
+import pytest
+
+from src.primitive_db.constants import SELECT_USAGE
+
+USAGE_ERROR = f"Ошибка: Использование: {SELECT_USAGE}"
+MALFORMED_WHERE = ["x => 1", "x = 1 and", "x = 1 or", "x ="]
+
+
+@pytest.fixture
+def users(run_db):
+    run_db(
+        "create_table users x:int name:str",
+        "insert into users values (1, 'alice')",
+        "insert into users values (2, 'bob')",
+    )
+    return run_db
+
+
+@pytest.mark.parametrize("condition", MALFORMED_WHERE)
+def test_select_rejects_malformed_where(users, condition):
+    output = users(f"select from users where {condition}")
+    assert USAGE_ERROR in output
+    assert "alice" not in output
+
+
+@pytest.mark.parametrize("condition", MALFORMED_WHERE)
+def test_aggregate_rejects_malformed_where(users, condition):
+    output = users(f"select count(*) from users where {condition}")
+    assert USAGE_ERROR in output
+    assert "count(*)" not in output
+
+
+def test_select_rejects_empty_where(users):
+    assert USAGE_ERROR in users("select from users where")
+
+
+def test_select_with_valid_where(users):
+    output = users("select from users where x = 2")
+    assert "bob" in output
+    assert "alice" not in output